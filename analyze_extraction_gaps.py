@@ -1,6 +1,8 @@
 import pandas as pd
 from pathlib import Path
 
+from dogmarket.data import facts_columns
+
 raw_dir = Path("Input/Raw CSVs")
 
 # Map of platform -> raw file
@@ -25,9 +27,8 @@ for platform, filename in sorted(raw_files.items()):
         raw_df = pd.read_csv(path, nrows=0)
         raw_cols = set(raw_df.columns.tolist())
         
-        # Load facts to see what was extracted
-        facts = pd.read_csv('output/facts/facts.csv', nrows=0)
-        facts_cols = set(facts.columns.tolist())
+        # Facts columns, to see what was extracted
+        facts_cols = set(facts_columns())
         
         # Platforms have a 'platform' column added, so exclude that
         platform_specific = facts_cols - {'platform'}
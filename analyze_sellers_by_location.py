@@ -3,14 +3,12 @@
 Identify suspicious sellers using location + name to create unique IDs
 """
 
-import pandas as pd
+from dogmarket.data import load_facts
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+facts = load_facts(columns=['platform', 'breed', 'location', 'seller_name'])
 
 # Create unique seller ID (name + location)
 facts['seller_unique_id'] = facts['seller_name'].fillna('') + ' | ' + facts['location'].fillna('')
-derived['seller_unique_id'] = derived['seller_name'].fillna('') + ' | ' + derived['location'].fillna('')
 
 print("UNIQUE SELLERS ANALYSIS\n")
 print("=" * 100)
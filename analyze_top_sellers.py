@@ -1,7 +1,9 @@
 import pandas as pd
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived, load_facts
+
+facts = load_facts(columns=['platform', 'breed', 'seller_name'])
+derived = load_derived(columns=['seller_name', 'price_num'])
 
 # Get top sellers
 top_sellers = facts['seller_name'].value_counts().head(20)
@@ -1,7 +1,8 @@
-import pandas as pd
+from dogmarket.data import load_derived, load_facts
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+PLATFORMS = ['champdogs', 'kennel_club']
+facts = load_facts(columns=['platform', 'total_available'], platforms=PLATFORMS)
+derived = load_derived(columns=['platform', 'total_available_num', 'total_available_flag'], platforms=PLATFORMS)
 
 print("CHAMPDOGS DATA FLOW:")
 print("="*80)
@@ -1,6 +1,6 @@
-import pandas as pd
+from dogmarket.data import load_facts
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
+facts = load_facts(columns=['platform', 'location', 'seller_name'])
 
 # Check for missing seller names
 missing_names = facts[facts['seller_name'].isna() | (facts['seller_name'] == '')]
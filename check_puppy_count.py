@@ -1,6 +1,8 @@
 import pandas as pd
 
-facts = pd.read_csv('output/facts/facts.csv', dtype=str, keep_default_na=False)
+from dogmarket.data import load_facts
+
+facts = load_facts(columns=['platform', 'total_available'])
 facts['total_available_num'] = pd.to_numeric(facts['total_available'], errors='coerce')
 
 print("=" * 70)
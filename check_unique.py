@@ -1,6 +1,6 @@
-import pandas as pd
+from dogmarket.data import load_derived
 
-df = pd.read_csv('output/views/derived.csv', low_memory=False)
+df = load_derived(columns=['platform', 'breed', 'location', 'price_num'])
 df_clean = df.dropna(subset=['breed', 'location', 'price_num'])
 combos = df_clean.groupby(['breed', 'location', 'price_num']).size()
 multi = combos[combos > 1]
@@ -8,9 +8,13 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
-# Load data
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived, load_facts
+
+# Load data (all of facts: the identical-rows check compares every column)
+facts = load_facts()
+derived = load_derived(columns=[
+    'platform', 'breed', 'price_num', 'published_at_ts', 'ready_to_leave_parse_mode', 'age_days',
+])
 
 print("=" * 100)
 print("COMPREHENSIVE DATA QUALITY AUDIT")
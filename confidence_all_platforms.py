@@ -1,6 +1,11 @@
 import pandas as pd
 
-df = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived
+
+df = load_derived(columns=[
+    'platform', 'breed', 'location', 'price_num', 'total_available_num',
+    'males_available_num', 'females_available_num', 'date_of_birth_ts',
+])
 df_unique = df.drop_duplicates(subset=['breed', 'location', 'price_num'], keep='first')
 
 print("="*100)
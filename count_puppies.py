@@ -1,6 +1,9 @@
-import pandas as pd
+from dogmarket.data import load_derived
 
-df = pd.read_csv('output/views/derived.csv', low_memory=False)
+df = load_derived(columns=[
+    'url', 'platform', 'breed', 'location', 'price_num', 'total_available_num',
+    'males_available_num', 'females_available_num',
+])
 
 # Get unique listings by breed+location+price
 df_clean = df.dropna(subset=['breed', 'location', 'price_num'])
@@ -1,7 +1,12 @@
 import pandas as pd
 import re
 
-df = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived
+
+df = load_derived(columns=[
+    'platform', 'title', 'breed', 'location', 'price_num', 'total_available_num',
+    'males_available_num', 'females_available_num',
+])
 
 # Get unique listings (breed + location + price)
 df_unique = df.drop_duplicates(subset=['breed', 'location', 'price_num'], keep='first')
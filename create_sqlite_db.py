@@ -1,48 +1,333 @@
 #!/usr/bin/env python3
 """
 Export dog market data to SQLite database for SQL-based queries
+
+facts and derived become tables of the same names in output/dog_market.db,
+with column types declared from the pipeline's dtype plan (see
+dogmarket/data.py): text as TEXT, counts and availability flags (0/1) as
+INTEGER, prices and other numbers as REAL, *_ts timestamps as ISO 8601 UTC
+TEXT ("2026-10-09T20:52:24.456716Z", which SQLite's date functions read).
+
+Each table is keyed by (url, platform) and keeps a row_hash of every row's
+values. listing_id is the row's id within its table; it never changes while
+the row exists (join facts and derived on url and platform, not on it). An
+export only writes what changed since the last one: new and changed rows
+are upserted, rows that are gone are deleted, all with executemany() in one
+transaction. derived's asof-dependent columns (asof_ts, age_days, the
+parsed *_ts timestamps, ...) change on every pipeline run, so they are left
+out of its row_hash and refreshed on the unchanged rows with one UPDATE.
+The tables are dropped and reloaded when their columns change (or with
+--rebuild). Indexes are created if missing and ANALYZE refreshes the
+planner statistics afterwards.
+
+derived's title and description are indexed for full-text search
+(listing_search, see dogmarket/search.py).
+
+The database runs in WAL mode, so readers don't block the export (the -wal
+and -shm files next to it disappear when the last connection closes).
+
+Usage:
+    python create_sqlite_db.py            # bring output/dog_market.db up to date
+    python create_sqlite_db.py --rebuild  # drop and reload both tables
 """
 
-import pandas as pd
+import argparse
 import sqlite3
+import time
 from pathlib import Path
 
-print("Creating SQLite database...\n")
+import numpy as np
+import pandas as pd
+
+from dogmarket import search
+from dogmarket.data import DB_PATH, REPO_ROOT, load_derived, load_facts
+# dogmarket.data puts pipeline/ on sys.path
+from storage import ASOF_COLUMNS
+
+# Each row's identity in both tables
+KEY = ['url', 'platform']
+# Stable rowid alias, which VACUUM can't renumber (the search index links to it)
+ROW_ID = search.ROW_ID
+HASH_COLUMN = 'row_hash'
+
+# Set on every connection the export opens. cache_size is in KiB when negative.
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+}
+
+# Composite indexes lead with the column the documented queries group or
+# filter on and add the columns they aggregate, so those queries read only
+# the index (covering) and its order serves the GROUP BY; see
+# pipeline/benchmark_sqlite_queries.py. Indexes named idx_* that are no
+# longer listed are dropped on the next export.
+# Key: index name
+# Value: (table, columns)
+INDEXES = {
+    'idx_facts_platform': ('facts', ['platform']),
+    'idx_facts_breed': ('facts', ['breed']),
+    'idx_facts_location': ('facts', ['location']),
+    'idx_facts_seller_location': ('facts', ['seller_name', 'location']),
+    'idx_derived_platform_price': ('derived', ['platform', 'price_num']),
+    'idx_derived_breed_price': ('derived', ['breed', 'price_num']),
+    'idx_derived_location_price': ('derived', ['location', 'price_num']),
+    'idx_derived_platform_health': ('derived', ['platform', 'microchipped', 'vaccinated', 'health_checked']),
+    'idx_derived_microchipped_price': ('derived', ['microchipped', 'price_num']),
+    'idx_derived_platform_parse_mode': ('derived', ['platform', 'ready_to_leave_parse_mode']),
+    'idx_derived_price': ('derived', ['price_num']),
+    'idx_derived_age': ('derived', ['age_days']),
+    'idx_derived_published': ('derived', ['published_at_ts']),
+}
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_type(dtype) -> str:
+    """SQLite column type for a pandas dtype."""
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def column_types(df: pd.DataFrame) -> dict:
+    """Declared SQLite type of each column (plus the row id and hash)."""
+    types = {ROW_ID: 'INTEGER'}
+    types.update({col: sql_type(dtype) for col, dtype in df.dtypes.items()})
+    types[HASH_COLUMN] = 'INTEGER'
+    return types
+
+
+def sql_values(df: pd.DataFrame) -> list[np.ndarray]:
+    """Each column as Python values sqlite3 can bind (None where missing)."""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            # Formatting with numpy is ~50x faster than astype(str)
+            text = np.datetime_as_string(series.to_numpy(dtype="datetime64[us]"), unit="us") + "Z"
+            series = pd.Series(text, index=series.index, dtype=object).where(series.notna())
+        elif pd.api.types.is_float_dtype(series.dtype):
+            series = series.astype('float64')
+        columns.append(series.to_numpy(dtype=object, na_value=None))
+    return columns
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Per-row hash of all values, as signed 64-bit ints (SQLite INTEGER)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy().view(np.int64)
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open the database with PRAGMAS set; transactions are explicit (BEGIN/COMMIT)."""
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    for pragma, value in PRAGMAS.items():
+        conn.execute(f'PRAGMA {pragma} = {value}')
+    return conn
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> dict:
+    """Declared type of each column of an existing table ({} if there is none)."""
+    return {row[1]: row[2] for row in conn.execute(f'PRAGMA table_info({quote(table)})')}
+
+
+def create_table(conn: sqlite3.Connection, table: str, types: dict):
+    """(Re)create table with the given columns, keyed on listing_id and unique on (url, platform)."""
+    columns = [
+        f'{quote(col)} {sql_type}' + (' PRIMARY KEY' if col == ROW_ID else '')
+        for col, sql_type in types.items()
+    ]
+    key = ', '.join(quote(col) for col in KEY)
+    conn.execute(f'DROP TABLE IF EXISTS {quote(table)}')
+    conn.execute(f'CREATE TABLE {quote(table)} ({", ".join(columns)}, UNIQUE ({key}))')
 
-# Load data
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
 
-# Create database
-db_path = Path('output/dog_market.db')
-conn = sqlite3.connect(db_path)
+def check_keys(table: str, df: pd.DataFrame):
+    """Raise ValueError if a row of df has a missing or duplicate (url, platform)."""
+    keys = df[KEY]
+    missing = keys.isna().any(axis=1)
+    duplicate = keys[~missing].duplicated(keep=False)
+    if missing.any() or duplicate.any():
+        raise ValueError(
+            f"{table}: {int(missing.sum())} rows without a url or platform and "
+            f"{int(duplicate.sum())} rows sharing a (url, platform); the export is keyed on both"
+        )
 
-print(f"Exporting facts table ({len(facts)} rows)...")
-facts.to_sql('facts', conn, if_exists='replace', index=False)
 
-print(f"Exporting derived table ({len(derived)} rows)...")
-derived.to_sql('derived', conn, if_exists='replace', index=False)
+def asof_columns(table: str, df: pd.DataFrame) -> list[str]:
+    """
+    Columns of table that move with asof_ts on every step-2 run: derived's
+    ASOF_COLUMNS and its parsed *_ts timestamps, which relative dates ("3
+    days ago", "ready in 2 weeks") anchor to asof_ts.
+    """
+    if table != 'derived':
+        return []
+    return [col for col in df.columns if col in ASOF_COLUMNS or col.endswith('_ts')]
 
-# Create indexes for faster queries
-print("\nCreating indexes...")
-conn.execute('CREATE INDEX idx_facts_platform ON facts(platform)')
-conn.execute('CREATE INDEX idx_facts_breed ON facts(breed)')
-conn.execute('CREATE INDEX idx_facts_location ON facts(location)')
-conn.execute('CREATE INDEX idx_facts_seller ON facts(seller_name)')
-conn.execute('CREATE INDEX idx_derived_platform ON derived(platform)')
-conn.execute('CREATE INDEX idx_derived_breed ON derived(breed)')
 
-conn.commit()
-conn.close()
+def refresh_columns(conn: sqlite3.Connection, table: str, df: pd.DataFrame, row_ids: np.ndarray):
+    """
+    Set df's columns on the rows with the given listing_ids (one per df row)
+    with a single UPDATE ... FROM a temp table.
+    """
+    names = list(df.columns)
+    staging = quote(f'{table}_refresh')
+    conn.execute(f'DROP TABLE IF EXISTS temp.{staging}')
+    conn.execute(f'CREATE TEMP TABLE {staging} ({ROW_ID} INTEGER PRIMARY KEY, '
+                 f'{", ".join(quote(col) for col in names)})')
+    conn.executemany(
+        f'INSERT INTO temp.{staging} VALUES ({", ".join("?" for _ in range(len(names) + 1))})',
+        zip(row_ids.tolist(), *sql_values(df)),
+    )
+    updates = ', '.join(f'{quote(col)} = r.{quote(col)}' for col in names)
+    conn.execute(f'UPDATE {quote(table)} SET {updates} FROM temp.{staging} AS r '
+                 f'WHERE {quote(table)}.{ROW_ID} = r.{ROW_ID}')
+    conn.execute(f'DROP TABLE temp.{staging}')
 
-print(f"\n✓ Database created: {db_path}")
-print(f"  Size: {db_path.stat().st_size / 1024 / 1024:.1f} MB")
 
-# Show how to use it
-print("\n" + "=" * 80)
-print("HOW TO USE THE DATABASE\n")
+def upsert_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame, rebuild: bool = False,
+                 refresh=()) -> dict:
+    """
+    Bring table up to date with df inside the caller's transaction.
 
-print("""
+    Every row of df needs its own (url, platform) (check_keys); rows of the
+    table without one are deleted.
+
+    Rows are matched on (url, platform): new rows and rows whose hash changed
+    are written with one INSERT ... ON CONFLICT DO UPDATE (so an updated row
+    keeps its listing_id), rows no longer in df are deleted. The table is
+    recreated first if its columns or types differ from df's, or if rebuild
+    is set.
+
+    refresh columns are left out of the hash; on rows whose other values are
+    unchanged they are set with one UPDATE (refresh_columns), which leaves
+    the search triggers on title and description alone.
+
+    Returns:
+        dict: rows, inserted, updated, deleted, unchanged, refreshed,
+        recreated
+    """
+    check_keys(table, df)
+    types = column_types(df)
+    recreated = rebuild or table_columns(conn, table) != types
+    if recreated:
+        create_table(conn, table, types)
+
+    refresh = [col for col in refresh if col in df.columns]
+    keys = df[KEY].astype(object)
+    hashes = row_hashes(df.drop(columns=refresh))
+    existing = pd.read_sql_query(
+        f'SELECT {", ".join(quote(col) for col in [ROW_ID] + KEY + [HASH_COLUMN])} FROM {quote(table)}', conn
+    )
+    # NULL keys (from older exports) would match each other in the merges below
+    keyless = existing[KEY].isna().any(axis=1)
+    existing = existing[~keyless]
+    matched = keys.assign(**{HASH_COLUMN: hashes}).merge(
+        existing, on=KEY, how='left', suffixes=('', '_old'), indicator=True
+    )
+    is_new = (matched['_merge'] == 'left_only').to_numpy()
+    changed = is_new | (matched[HASH_COLUMN] != matched[f'{HASH_COLUMN}_old']).to_numpy()
+
+    names = list(df.columns) + [HASH_COLUMN]
+    rows = zip(*sql_values(df.loc[changed]), hashes[changed].tolist())
+    updates = ', '.join(f'{quote(col)} = excluded.{quote(col)}' for col in names if col not in KEY)
+    before = conn.execute(f'SELECT COUNT(*) FROM {quote(table)}').fetchone()[0]
+    written = conn.executemany(
+        f'INSERT INTO {quote(table)} ({", ".join(quote(col) for col in names)}) '
+        f'VALUES ({", ".join("?" for _ in names)}) '
+        f'ON CONFLICT ({", ".join(quote(col) for col in KEY)}) DO UPDATE SET {updates}',
+        rows,
+    ).rowcount
+    inserted = conn.execute(f'SELECT COUNT(*) FROM {quote(table)}').fetchone()[0] - before
+
+    unchanged = ~changed
+    if refresh and unchanged.any():
+        refresh_columns(conn, table, df.loc[unchanged, refresh],
+                        matched.loc[unchanged, ROW_ID].to_numpy(dtype=np.int64))
+
+    gone = existing.drop(columns=ROW_ID).merge(keys, on=KEY, how='left', indicator=True)
+    gone = gone.loc[gone['_merge'] == 'left_only', KEY]
+    conn.executemany(
+        f'DELETE FROM {quote(table)} WHERE {" AND ".join(f"{quote(col)} = ?" for col in KEY)}',
+        gone.itertuples(index=False, name=None),
+    )
+    if keyless.any():
+        conn.execute(f'DELETE FROM {quote(table)} WHERE {" OR ".join(f"{quote(col)} IS NULL" for col in KEY)}')
+
+    return {
+        'rows': len(df),
+        'inserted': inserted,
+        'updated': written - inserted,
+        'deleted': len(gone) + int(keyless.sum()),
+        'unchanged': int(unchanged.sum()),
+        'refreshed': int(unchanged.sum()) if refresh else 0,
+        'recreated': recreated,
+    }
+
+
+def create_indexes(conn: sqlite3.Connection, tables, indexes: dict = INDEXES):
+    """
+    Create the missing indexes (default: INDEXES) on the given tables, and
+    drop idx_* indexes on them that are no longer listed.
+    """
+    existing = conn.execute(
+        "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\'"
+    ).fetchall()
+    for name, table in existing:
+        if table in tables and name not in indexes:
+            conn.execute(f'DROP INDEX {quote(name)}')
+    for name, (table, columns) in indexes.items():
+        if table not in tables:
+            continue
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(table)} '
+            f'({", ".join(quote(col) for col in columns)})'
+        )
+
+
+def export(db_path: Path, tables: dict, rebuild: bool = False, indexes: dict = INDEXES) -> dict:
+    """
+    Upsert each table (key: table name, value: DataFrame) in one transaction,
+    create missing indexes (default: INDEXES) and the search index on derived,
+    then ANALYZE.
+
+    Returns:
+        dict: upsert_table() counts per table
+    """
+    conn = connect(db_path)
+    try:
+        conn.execute('BEGIN')
+        try:
+            counts = {
+                table: upsert_table(conn, table, df, rebuild, asof_columns(table, df))
+                for table, df in tables.items()
+            }
+            create_indexes(conn, tables, indexes)
+            if search.CONTENT_TABLE in tables:
+                counts[search.CONTENT_TABLE]['search_rebuilt'] = search.ensure_index(
+                    conn, rebuild=counts[search.CONTENT_TABLE]['recreated']
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('ANALYZE')
+    finally:
+        conn.close()
+    return counts
+
+
+def print_usage():
+    print("\n" + "=" * 80)
+    print("HOW TO USE THE DATABASE\n")
+
+    print("""
 # In Python:
 import sqlite3
 conn = sqlite3.connect('output/dog_market.db')
@@ -57,25 +342,61 @@ sqlite> SELECT location, COUNT(*) as listings FROM facts GROUP BY location ORDER
 # Common Queries:
 SELECT COUNT(*), platform FROM facts GROUP BY platform;
 SELECT DISTINCT breed FROM facts ORDER BY breed;
-SELECT location, AVG(price_num) as avg_price, COUNT(*) as listings 
+SELECT location, AVG(price_num) as avg_price, COUNT(*) as listings
   FROM derived GROUP BY location HAVING listings > 10 ORDER BY listings DESC;
-SELECT platform, microchipped, COUNT(*) 
+SELECT platform, microchipped, COUNT(*)
   FROM derived WHERE microchipped IS NOT NULL GROUP BY platform, microchipped;
+
+# Full-text search over titles and descriptions:
+from dogmarket.search import search
+search('litter of', platforms=['gumtree'])
+sqlite> SELECT d.platform, d.title FROM listing_search s JOIN derived d ON d.listing_id = s.rowid
+          WHERE listing_search MATCH '"kc registered"' ORDER BY rank LIMIT 10;
 """)
 
-print("\n" + "=" * 80)
-print("TABLE SCHEMAS\n")
 
-print("FACTS table:")
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
-cursor.execute("PRAGMA table_info(facts)")
-for row in cursor.fetchall():
-    print(f"  {row[1]}: {row[2]}")
+def print_schemas(db_path: Path):
+    print("\n" + "=" * 80)
+    print("TABLE SCHEMAS\n")
+
+    conn = sqlite3.connect(db_path)
+    for table in ['facts', 'derived']:
+        print(f"{table.upper()} table:")
+        for col, col_type in table_columns(conn, table).items():
+            print(f"  {col}: {col_type}")
+        print()
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export facts and derived to SQLite.")
+    parser.add_argument('--db', type=Path, default=DB_PATH, help=f"Database path (default: {DB_PATH.relative_to(REPO_ROOT)})")
+    parser.add_argument('--rebuild', action='store_true', help="Drop and reload the tables instead of upserting changes")
+    args = parser.parse_args(argv)
+
+    print("Updating SQLite database...\n")
+    tables = {'facts': load_facts(), 'derived': load_derived()}
+
+    start = time.perf_counter()
+    counts = export(args.db, tables, args.rebuild)
+    seconds = time.perf_counter() - start
+
+    for table, info in counts.items():
+        print(f"{table}: {info['rows']:,} rows"
+              f"{' (table recreated)' if info['recreated'] else ''} - "
+              f"{info['inserted']:,} inserted, {info['updated']:,} updated, "
+              f"{info['deleted']:,} deleted, {info['unchanged']:,} unchanged"
+              f"{' (as-of columns refreshed)' if info['refreshed'] else ''}")
+
+    if counts['derived']['search_rebuilt']:
+        print(f"derived: search index ({search.SEARCH_TABLE}) rebuilt")
+
+    print(f"\n✓ Database updated in {seconds:.1f}s: {args.db}")
+    print(f"  Size: {args.db.stat().st_size / 1024 / 1024:.1f} MB")
+
+    print_usage()
+    print_schemas(args.db)
 
-print("\nDERIVED table:")
-cursor.execute("PRAGMA table_info(derived)")
-for row in cursor.fetchall():
-    print(f"  {row[1]}: {row[2]}")
 
-conn.close()
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,14 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-# Load the derived CSV with low_memory=False to handle mixed types properly
+from dogmarket.data import load_derived
+
 print("Loading derived.csv...")
-df = pd.read_csv('/Users/kimfaura/Desktop/Dog_Market_Clean/output/views/derived.csv', low_memory=False)
+df = load_derived(columns=[
+    'platform', 'url', 'created_at', 'title', 'breed', 'price', 'price_num', 'location',
+    'seller_name', 'is_breeder', 'rating', 'views_count_num', 'ready_to_leave',
+    'ready_to_leave_parsed_ts', 'ready_to_leave_parse_mode',
+])
 print(f"✓ Loaded {len(df):,} rows\n")
 
 # ==================== 1. DUPLICATE URLs ====================
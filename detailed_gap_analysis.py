@@ -1,6 +1,8 @@
 import pandas as pd
 from pathlib import Path
 
+from dogmarket.data import facts_columns
+
 raw_dir = Path("Input/Raw CSVs")
 
 # Exact raw column names
@@ -56,8 +58,7 @@ raw_columns = {
 }
 
 # What's in facts.csv (master schema)
-facts = pd.read_csv('output/facts/facts.csv', nrows=0)
-schema_fields = set(facts.columns.tolist()) - {'platform'}
+schema_fields = set(facts_columns()) - {'platform'}
 
 print("VALUABLE FIELDS BEING LEFT BEHIND IN RAW DATA\n")
 print("=" * 100)
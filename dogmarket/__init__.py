@@ -0,0 +1 @@
+"""Shared helpers for the analysis scripts (see dogmarket.data)."""
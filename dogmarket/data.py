@@ -0,0 +1,160 @@
+"""
+Typed, projected loads of the pipeline tables for the analysis scripts.
+
+load_facts() and load_derived() return only the requested columns (and
+platforms), typed by the pipeline's dtype plan (see pipeline/storage.py):
+*_ts as UTC timestamps, counts as nullable ints, prices as float64,
+availability flags as nullable booleans. Text comes back as the Python-backed
+"string" dtype, so value_counts() orders ties as it does for object columns
+(the Arrow-backed one does not). platform, breed, location, ... are category
+in the pipeline's plan; they are text here too unless categorical=True,
+because value_counts()/groupby() on a category list every category (0 for
+those filtered out) and fillna("") would need "" to be one.
+
+- If the table's Parquet copy exists (the pipeline's default), pyarrow reads
+  just those columns and platforms from it; it is already typed.
+- Otherwise the CSV is parsed once (C engine, as text, then the dtype plan)
+  and the typed table is cached in <table dir>/.cache, keyed by the CSV's
+  sha256. Later loads of an unchanged CSV read the cache instead (projected,
+  as Parquet when pyarrow is installed, else a pickle); a changed CSV gets a
+  new entry and replaces the old one.
+
+Paths are resolved from the repo root, so scripts work from any directory.
+
+Usage:
+    from dogmarket.data import load_derived, load_facts
+
+    derived = load_derived(columns=["platform", "price_num"], platforms=["gumtree"])
+    facts = load_facts(columns=["platform", "seller_name"])
+"""
+
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PIPELINE_DIR = REPO_ROOT / "pipeline"
+FACTS_PATH = REPO_ROOT / "output" / "facts" / "facts.csv"
+DERIVED_PATH = REPO_ROOT / "output" / "views" / "derived.csv"
+# SQLite export of both tables (create_sqlite_db.py)
+DB_PATH = REPO_ROOT / "output" / "dog_market.db"
+# Text dtype handed to the scripts (see module docstring)
+TEXT = "string[python]"
+
+# The dtype plans live with the pipeline steps, which import each other as
+# sibling modules
+if str(PIPELINE_DIR) not in sys.path:
+    sys.path.insert(0, str(PIPELINE_DIR))
+
+from storage import (
+    apply_dtypes,
+    derived_dtypes,
+    facts_dtypes,
+    file_sha256,
+    load_schema,
+    parquet_available,
+    parquet_path,
+    read_parquet,
+)
+
+
+def _facts_plan(columns) -> dict:
+    return facts_dtypes(list(columns[1:]))
+
+
+def _derived_plan(columns) -> dict:
+    return derived_dtypes(columns, ["platform"] + load_schema())
+
+
+def cache_path(csv_path: Path) -> Path:
+    """Cache entry for the current contents of a CSV (see module docstring)."""
+    suffix = ".parquet" if parquet_available() else ".pkl"
+    return csv_path.parent / ".cache" / f"{csv_path.stem}-{file_sha256(csv_path)[:16]}{suffix}"
+
+
+def _parse_csv(csv_path: Path, plan) -> pd.DataFrame:
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=True, low_memory=False)
+    return apply_dtypes(df, plan(df.columns))
+
+
+def _cached(csv_path: Path, plan) -> Path:
+    """Path of the typed cache entry for csv_path, parsing and writing it if missing."""
+    entry = cache_path(csv_path)
+    if entry.exists():
+        return entry
+    df = _parse_csv(csv_path, plan)
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    for old in entry.parent.glob(f"{csv_path.stem}-*{entry.suffix}"):
+        old.unlink()
+    if entry.suffix == ".parquet":
+        df.to_parquet(entry, index=False)
+    else:
+        df.to_pickle(entry)
+    return entry
+
+
+def _load(csv_path: Path, plan, columns, platforms, cache: bool, categorical: bool) -> pd.DataFrame:
+    columns = list(columns) if columns is not None else None
+    platforms = list(platforms) if platforms is not None else None
+    wanted = columns
+    if columns is not None and platforms is not None and "platform" not in columns:
+        wanted = columns + ["platform"]
+
+    source = parquet_path(csv_path)
+    if not (source.exists() and parquet_available()):
+        if not csv_path.exists():
+            raise FileNotFoundError(f"Table not found: {csv_path}\nRun pipeline/run_pipeline.py first.")
+        source = _cached(csv_path, plan) if cache else None
+
+    if source is not None and source.suffix == ".parquet":
+        filters = [("platform", "in", platforms)] if platforms is not None else None
+        df = read_parquet(source, wanted, filters)
+    else:
+        df = pd.read_pickle(source) if source is not None else _parse_csv(csv_path, plan)
+        if wanted is not None:
+            df = df[wanted]
+        if platforms is not None:
+            df = df[df["platform"].isin(platforms)].reset_index(drop=True)
+
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            if not categorical:
+                df[col] = df[col].astype(TEXT)
+            elif platforms is not None:
+                # Categories of the platforms filtered out would show up as empty groups
+                df[col] = df[col].cat.remove_unused_categories()
+        elif isinstance(df[col].dtype, pd.StringDtype):
+            df[col] = df[col].astype(TEXT)
+    return df[columns] if columns is not None else df
+
+
+def facts_columns() -> list[str]:
+    """Column names of facts, read from the Parquet schema or the CSV header."""
+    path = parquet_path(FACTS_PATH)
+    if path.exists() and parquet_available():
+        import pyarrow.parquet as pq
+        return pq.read_schema(path).names
+    return list(pd.read_csv(FACTS_PATH, nrows=0).columns)
+
+
+def load_facts(columns=None, platforms=None, cache: bool = True, categorical: bool = False) -> pd.DataFrame:
+    """
+    Load facts (output/facts/facts.csv): every schema field is text.
+
+    Args:
+        columns: Columns to load, in this order (default: all)
+        platforms: Only rows of these platforms (default: all)
+        cache: Cache the typed parse of a CSV-only table (see module docstring)
+        categorical: Keep platform, breed, location, ... as category
+    """
+    return _load(FACTS_PATH, _facts_plan, columns, platforms, cache, categorical)
+
+
+def load_derived(columns=None, platforms=None, cache: bool = True, categorical: bool = False) -> pd.DataFrame:
+    """
+    Load derived (output/views/derived.csv) with parsed columns typed:
+    *_ts timestamps, *_num/age_days/days_until_ready numbers, availability
+    flags as booleans (arguments as for load_facts).
+    """
+    return _load(DERIVED_PATH, _derived_plan, columns, platforms, cache, categorical)
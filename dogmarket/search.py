@@ -0,0 +1,146 @@
+"""
+Full-text search over listing titles and descriptions in the SQLite export.
+
+create_sqlite_db.py keeps an FTS5 index, listing_search, over the title and
+description columns of derived. It is an external-content index: it stores
+only the index, and its rowid is derived's listing_id, so every match joins
+straight back to its listing. Triggers on derived keep it in step with each
+upsert; it is rebuilt when derived is reloaded.
+
+Queries are plain text by default: every word must occur, and punctuation
+and operators are taken literally (kc-registered, "5*"). With raw=True they
+use FTS5 syntax: words, "quoted phrases", OR, NOT, prefix* and NEAR(a b, 5).
+Words are stemmed (porter), so puppy also matches puppies, and case and
+accents are ignored.
+
+Usage:
+    from dogmarket.search import count, phrase, search
+
+    search('litter of')
+    search('kc-registered', platforms=['gumtree'])
+    search(phrase('XL bully') + ' NOT rescue', raw=True, columns=['platform', 'url', 'price_num'])
+    count('microchip*', raw=True)
+"""
+
+import sqlite3
+
+import pandas as pd
+
+from dogmarket.data import DB_PATH
+
+SEARCH_TABLE = "listing_search"
+CONTENT_TABLE = "derived"
+ROW_ID = "listing_id"
+SEARCH_COLUMNS = ["title", "description"]
+TOKENIZE = "porter unicode61 remove_diacritics 2"
+
+# derived columns search() returns by default
+DEFAULT_COLUMNS = ["platform", "url", "breed", "location", "price_num", "title"]
+
+
+def phrase(text: str) -> str:
+    """text as one FTS5 phrase, so punctuation and operators in it are taken literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _plain(text: str) -> str:
+    """Plain text as an FTS5 query: each word quoted with phrase(), all must occur."""
+    words = text.split()
+    if not words:
+        raise ValueError("Empty search query")
+    return " ".join(phrase(word) for word in words)
+
+
+def _triggers() -> dict:
+    """Triggers that mirror derived's inserts, deletes and updates into the index."""
+    columns = ", ".join(SEARCH_COLUMNS)
+    new = ", ".join(f"new.{col}" for col in SEARCH_COLUMNS)
+    old = ", ".join(f"old.{col}" for col in SEARCH_COLUMNS)
+    insert = f"INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (new.{ROW_ID}, {new});"
+    delete = (f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) "
+              f"VALUES ('delete', old.{ROW_ID}, {old});")
+    return {
+        f"{CONTENT_TABLE}_search_insert": f"AFTER INSERT ON {CONTENT_TABLE} BEGIN {insert} END",
+        f"{CONTENT_TABLE}_search_delete": f"AFTER DELETE ON {CONTENT_TABLE} BEGIN {delete} END",
+        f"{CONTENT_TABLE}_search_update": (
+            f"AFTER UPDATE OF {columns} ON {CONTENT_TABLE} BEGIN {delete} {insert} END"
+        ),
+    }
+
+
+def ensure_index(conn: sqlite3.Connection, rebuild: bool = False) -> bool:
+    """
+    Create the search index and its triggers on derived if missing.
+
+    The index is rebuilt from derived when it is new or rebuild is set (derived
+    was reloaded without the triggers).
+
+    Returns:
+        bool: True if the index was rebuilt
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).fetchone()
+    if not exists:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5({', '.join(SEARCH_COLUMNS)}, "
+            f"content='{CONTENT_TABLE}', content_rowid='{ROW_ID}', tokenize='{TOKENIZE}')"
+        )
+    for name, body in _triggers().items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    if rebuild or not exists:
+        conn.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+        return True
+    return False
+
+
+def _matches(query: str, platforms, raw: bool) -> tuple[str, list]:
+    """FROM/WHERE clause (and its parameters) for the listings matching query."""
+    sql = (f"FROM {SEARCH_TABLE} JOIN {CONTENT_TABLE} AS d ON d.{ROW_ID} = {SEARCH_TABLE}.rowid "
+           f"WHERE {SEARCH_TABLE} MATCH ?")
+    params = [query if raw else _plain(query)]
+    if platforms is not None:
+        platforms = list(platforms)
+        sql += f" AND d.platform IN ({', '.join('?' for _ in platforms)})"
+        params += platforms
+    return sql, params
+
+
+def search(query: str, columns=DEFAULT_COLUMNS, platforms=None, limit: int | None = 50,
+           raw: bool = False, db_path=DB_PATH) -> pd.DataFrame:
+    """
+    Listings whose title or description match query, best first.
+
+    Args:
+        query: Words that must all occur (see module docstring)
+        columns: derived columns to return
+        platforms: Only listings of these platforms (default: all)
+        limit: Most rows to return (None: every match)
+        raw: query is FTS5 syntax, passed as is (phrase() quotes literal text)
+
+    Returns:
+        DataFrame: columns + snippet (matched text, hits in [brackets]) + rank
+        (bm25, lower is better)
+    """
+    matches, params = _matches(query, platforms, raw)
+    selected = ", ".join(f'd."{col}"' for col in columns)
+    sql = (f"SELECT {selected}, snippet({SEARCH_TABLE}, -1, '[', ']', '…', 12) AS snippet, "
+           f"{SEARCH_TABLE}.rank AS rank {matches} ORDER BY rank")
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    conn = sqlite3.connect(db_path)
+    try:
+        return pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+
+def count(query: str, platforms=None, raw: bool = False, db_path=DB_PATH) -> int:
+    """Number of listings matching query (FTS5 syntax if raw is set)."""
+    matches, params = _matches(query, platforms, raw)
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) {matches}", params).fetchone()[0]
+    finally:
+        conn.close()
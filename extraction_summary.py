@@ -1,6 +1,6 @@
-import pandas as pd
+from dogmarket.data import load_facts
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
+facts = load_facts()
 
 print('✓ SCHEMA EXPANSION COMPLETE\n')
 print('=' * 80)
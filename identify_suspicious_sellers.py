@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
-import pandas as pd
+from dogmarket.data import load_facts
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
+facts = load_facts(columns=['platform', 'seller_name'])
 
 # Generic first names appearing across multiple platforms = likely fake sellers
 suspicious = ['Sarah', 'Emma', 'Lisa', 'John', 'Michelle', 'Laura', 'Charlotte', 'Kelly', 'Amy', 'Chloe', 'Kirsty', 'Sam', 'Gemma', 'Louise']
@@ -6,7 +6,10 @@ Better puppy count extraction using titles, descriptions, and gender data.
 import pandas as pd
 import re
 
-df = pd.read_csv('output/facts/facts.csv', low_memory=False)
+from dogmarket.data import load_facts
+
+df = load_facts(columns=['platform', 'breed', 'location', 'price', 'title',
+                         'total_available', 'males_available', 'females_available'])
 
 def extract_puppy_count(row):
     """
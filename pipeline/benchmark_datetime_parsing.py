@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: row-wise vs memoized datetime parsing
+
+Checks that to_datetime_safe in pipeline_02_build_derived.py gives the same
+timestamps as the original implementation (whole-column pd.to_datetime, then
+dateutil row by row for every failure) on each DT_FIELDS column of facts and
+on a set of awkward strings, then times both.
+
+Usage:
+    python pipeline/benchmark_datetime_parsing.py [--repeat 3] [--scale 10]
+"""
+
+import argparse
+import time
+import warnings
+
+import pandas as pd
+from dateutil import parser as dateutil_parser
+
+from pipeline_02_build_derived import DT_FIELDS, FACTS_PATH, to_datetime_safe
+from storage import read_table
+
+EDGE_CASES = [
+    "18th December 2025", "1st Jan 2026", "3rd March 2026", "December 18, 2025",
+    "2025-12-18", "18/12/2025", "12/18/2025", "November 2024", "December",
+    "8 days ago", "yesterday", "Now", "", "  22nd  February 2026 ", "31st February 2026",
+    "2026-01-22T10:05:51Z", "2026-01-22 10:05:51+01:00", "Sept 5 2025", "not a date",
+]
+
+
+def rowwise_to_datetime(series: pd.Series) -> pd.Series:
+    """The original to_datetime_safe: dateutil in a loop over failed rows."""
+    result = pd.to_datetime(series, errors="coerce", utc=True)
+    failed_mask = result.isna() & series.notna() & (series != "")
+    if failed_mask.any():
+        for idx in series.index[failed_mask]:
+            val = series.loc[idx]
+            try:
+                parsed = dateutil_parser.parse(str(val))
+                result.loc[idx] = pd.Timestamp(parsed, tz="UTC")
+            except Exception:
+                pass
+    return result
+
+
+def mismatches(old: pd.Series, new: pd.Series) -> pd.Series:
+    same = (old == new) | (old.isna() & new.isna())
+    # "now" parses to the wall clock, so the two runs differ by microseconds
+    now = pd.Timestamp.now(tz="UTC")
+    wall_clock = ((old - now).abs() < pd.Timedelta(minutes=1)) & ((new - now).abs() < pd.Timedelta(minutes=1))
+    return ~(same | wall_clock)
+
+
+def best_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the facts rows this many times for timing")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", UserWarning)  # pandas "could not infer format" noise
+
+    facts = read_table(FACTS_PATH, dtype=str, keep_default_na=True, low_memory=False)
+    columns = {col: facts[col] for col in DT_FIELDS if col in facts.columns}
+    # Edge cases behind a typical first value, and on their own
+    columns["edge_cases"] = pd.Series(["01 November 2025"] + EDGE_CASES * 3, dtype=object)
+    columns["edge_cases_first"] = pd.Series(EDGE_CASES, dtype=object)
+
+    print("=" * 60)
+    print("Parity: row-wise vs memoized")
+    print("=" * 60)
+    total_bad = 0
+    for col, series in columns.items():
+        bad = mismatches(rowwise_to_datetime(series), to_datetime_safe(series))
+        total_bad += int(bad.sum())
+        print(f"  {col:<18} rows={len(series):>7}  distinct={series.nunique():>6}  mismatches={int(bad.sum())}")
+        if bad.any():
+            print(f"    e.g. {series[bad].unique()[:5].tolist()}")
+
+    print("\n" + "=" * 60)
+    print(f"Timing (best of {args.repeat}, facts x{args.scale})")
+    print("=" * 60)
+    old_total = new_total = 0.0
+    for col in DT_FIELDS:
+        if col not in facts.columns:
+            continue
+        series = pd.concat([facts[col]] * args.scale, ignore_index=True)
+        old = best_time(lambda: rowwise_to_datetime(series), args.repeat)
+        new = best_time(lambda: to_datetime_safe(series), args.repeat)
+        old_total += old
+        new_total += new
+        print(f"  {col:<18} row-wise={old:.3f}s  memoized={new:.3f}s")
+    print(f"  {'all DT_FIELDS':<18} row-wise={old_total:.3f}s  memoized={new_total:.3f}s  "
+          f"speedup={old_total / new_total:.1f}x")
+
+    if total_bad:
+        raise SystemExit(f"\n{total_bad} mismatches between row-wise and memoized parsing")
+    print("\n✓ Memoized parsing matches row-wise results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak memory of step 2, copy per stage vs one working frame
+
+Runs the step 2 stages on the facts two ways, each in a fresh process:
+- copy: every stage returns a copy of the frame it is given (copy=True,
+  how build_derived used to chain them)
+- in-place: build_derived, where the stages add columns to one frame
+
+For each it reports the peak memory allocated while building (tracemalloc,
+which sees the numpy buffers), the process peak RSS, and the size of the
+finished derived frame for reference. It also checks both give the same
+derived table.
+
+Usage:
+    python pipeline/benchmark_derived_memory.py [--scale 10]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+import pipeline_02_build_derived as step2
+
+MB = 1024 * 1024
+# Both variants run "now" at the same instant, so their tables compare exactly
+ASOF = datetime(2026, 1, 22, 12, 0, tzinfo=timezone.utc)
+
+
+class FixedClock(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return ASOF
+
+
+def chained_with_copies(facts: pd.DataFrame) -> pd.DataFrame:
+    """The stages as build_derived chained them before: a copy per stage."""
+    df = step2.add_typed_columns(step2.prepare_facts(facts))
+    df = step2.validate_puppy_counts(df)
+    df = step2.add_age_days(df)
+    df = step2.parse_ready_to_leave(df)
+    return step2.add_availability_flags(df)
+
+
+def differing_columns(left: pd.DataFrame, right: pd.DataFrame) -> list[str]:
+    """
+    Columns whose values differ. pd.to_datetime reads "now" as the wall
+    clock, so timestamps within a minute of each other count as equal.
+    """
+    differing = []
+    for col in left.columns:
+        a, b = left[col], right[col]
+        same = (a == b) | (a.isna() & b.isna())
+        if pd.api.types.is_datetime64_any_dtype(a):
+            same |= (a - b).abs() < pd.Timedelta(minutes=1)
+        if not same.all():
+            differing.append(col)
+    return differing
+
+
+def peak_rss_bytes() -> int:
+    """Process peak RSS (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure(variant: str, scale: int) -> dict:
+    """Build derived in this (fresh) process and report its memory use."""
+    step2.datetime = FixedClock
+    facts = step2.load_facts()
+    facts = pd.concat([facts] * scale, ignore_index=True)
+    build = chained_with_copies if variant == "copy" else step2.build_derived
+
+    rss_before = peak_rss_bytes()
+    tracemalloc.start()
+    start = time.perf_counter()
+    derived = build(facts)
+    seconds = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "variant": variant,
+        "seconds": seconds,
+        "traced_peak": traced_peak,
+        "rss_peak": peak_rss_bytes(),
+        "rss_before": rss_before,
+        "derived_size": int(derived.memory_usage(deep=True).sum()),
+        "derived": derived,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the facts rows this many times")
+    args = parser.parse_args()
+
+    # spawn: each variant starts from a clean process, so peak RSS is its own
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for variant in ["copy", "in-place"]:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results.append(pool.submit(measure, variant, args.scale).result())
+
+    print("\n" + "=" * 72)
+    print(f"Step 2 peak memory (facts x{args.scale})")
+    print("=" * 72)
+    print(f"  {'variant':<10} {'time':>8} {'alloc peak':>12} {'peak RSS':>10} {'RSS at start':>13} {'derived':>9}")
+    for r in results:
+        print(f"  {r['variant']:<10} {r['seconds']:>7.2f}s {r['traced_peak'] / MB:>10.0f}MB "
+              f"{r['rss_peak'] / MB:>8.0f}MB {r['rss_before'] / MB:>11.0f}MB {r['derived_size'] / MB:>7.0f}MB")
+    copy, inplace = results
+    print(f"\n  Allocation peak: {copy['traced_peak'] / inplace['traced_peak']:.1f}x lower in-place, "
+          f"{inplace['traced_peak'] / inplace['derived_size']:.1f}x the derived frame")
+
+    if list(copy["derived"].columns) != list(inplace["derived"].columns):
+        raise SystemExit("\nThe variants produce different columns")
+    differing = differing_columns(copy["derived"], inplace["derived"])
+    if differing:
+        raise SystemExit(f"\nThe variants differ in: {', '.join(differing)}")
+    print("\n✓ Both variants build the same derived table")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark: raw-row groupbys vs market cube rollups
+
+Checks that rollups from the cube built by pipeline_04_build_cube.py give
+the same answers as grouping the derived rows directly: counts and sums
+exactly, price mean/std to float rounding, and price, age_days and
+days_until_ready quantiles within sketch.ACCURACY of the exact ("lower")
+quantile. Checks that cubes built from separate batches of listings merge
+into the cube of all of them, and prints per-platform medians from the
+sketches next to the exact (interpolated) ones step 3 reports. Then times
+raw rows and cube on derived repeated --scale times (the cube keeps the
+same cells, only its counts grow).
+
+Usage:
+    python pipeline/benchmark_market_cube.py [--scale 20] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline_04_build_cube import (
+    SKETCH_MEASURES,
+    build_cube,
+    load_derived,
+    merge_cubes,
+    query,
+    region_of,
+    week_of,
+)
+from sketch import ACCURACY
+
+ROLLUPS = [[], ["platform"], ["breed"], ["region"], ["week"], ["platform", "week"], ["platform", "breed"]]
+WHERE = [None, {"platform": ["gumtree", "puppies"]}]
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+EXACT = ["listings", "puppies_known", "puppies", "price_count", "ready_now", "waiting_list", "availability_known"]
+CLOSE = ["price_sum", "price_mean", "price_std", "price_min", "price_max"]
+
+
+def raw_query(df: pd.DataFrame, by: list[str], where: dict | None) -> pd.DataFrame:
+    """The same answers as query(), grouping derived rows directly."""
+    rows = pd.DataFrame({
+        "platform": df["platform"].astype(object),
+        "breed": df["breed"].astype(object).where(df["breed"].notna()),
+        "region": region_of(df["location"]),
+        "week": week_of(df["published_at_ts"]),
+        "price": pd.to_numeric(df["price_num"], errors="coerce"),
+        "puppies": pd.to_numeric(df["total_available_num"], errors="coerce"),
+        "ready_now": df["is_ready_now"].fillna(False).astype(bool),
+        "waiting_list": df["is_waiting_list"].fillna(False).astype(bool),
+        "availability_known": df["availability_known"].fillna(False).astype(bool),
+        **{measure: pd.to_numeric(df[col], errors="coerce") for measure, col in SKETCH_MEASURES.items() if measure != "price"},
+    })
+    for col, values in (where or {}).items():
+        rows = rows[rows[col].isin(values)]
+    groups = rows.groupby(by, dropna=False, sort=True) if by else rows.groupby(lambda _: 0)
+    out = groups.agg(
+        listings=("price", "size"),
+        puppies_known=("puppies", "count"),
+        puppies=("puppies", "sum"),
+        price_count=("price", "count"),
+        price_sum=("price", "sum"),
+        price_mean=("price", "mean"),
+        price_std=("price", "std"),
+        price_min=("price", "min"),
+        price_max=("price", "max"),
+        ready_now=("ready_now", "sum"),
+        waiting_list=("waiting_list", "sum"),
+        availability_known=("availability_known", "sum"),
+    )
+    for measure in SKETCH_MEASURES:
+        for q in QUANTILES:
+            out[f"{measure}_p{round(q * 100):02d}"] = groups[measure].quantile(q, interpolation="lower")
+    return out.reset_index() if by else out.reset_index(drop=True)
+
+
+def compare(label: str, exact: pd.DataFrame, cube: pd.DataFrame, by: list[str]) -> int:
+    """Print one rollup's parity line; return the number of bad values."""
+    if by:
+        exact, cube = exact.set_index(by), cube.set_index(by)
+        cube = cube.reindex(exact.index)
+    bad = {}
+    for col in EXACT:
+        bad[col] = int((exact[col].to_numpy() != cube[col].astype(float).to_numpy()).sum())
+    for col in CLOSE:
+        a, b = exact[col].to_numpy(dtype=float), cube[col].to_numpy(dtype=float)
+        bad[col] = int((~(np.isclose(a, b, rtol=1e-9, equal_nan=True))).sum())
+    worst = 0.0
+    for col in [f"{m}_p{round(q * 100):02d}" for m in SKETCH_MEASURES for q in QUANTILES]:
+        a, b = exact[col].to_numpy(dtype=float), cube[col].to_numpy(dtype=float)
+        # Values in (-1, 1) share one bucket standing for 0
+        size = np.abs(a)
+        error = np.where(size >= 1, np.abs(b - a) / np.where(size >= 1, size, 1), np.where(b == 0, 0, np.inf))
+        error = np.where(np.isnan(a) & np.isnan(b), 0, error)
+        worst = max(worst, float(np.nanmax(error, initial=0)))
+        bad[col] = int((error > ACCURACY * (1 + 1e-9)).sum())
+    total = sum(bad.values())
+    print(f"  {label:<60} groups={len(exact):>5}  worst quantile error={worst:.4%}  mismatches={total}")
+    if total:
+        print(f"    {', '.join(f'{col}={n}' for col, n in bad.items() if n)}")
+    return total
+
+
+def check_merge(derived: pd.DataFrame, cube: pd.DataFrame, sketches: pd.DataFrame, batches: int) -> int:
+    """Build one cube per batch of rows, merge them and compare with the full cube."""
+    regions = set(cube["region"].dropna())
+    parts = [build_cube(derived.iloc[rows], regions) for rows in np.array_split(np.arange(len(derived)), batches)]
+    merged_cube, merged_sketches = merge_cubes(parts)
+    bad = len(merged_cube) != len(cube) or len(merged_sketches) != len(sketches)
+    if not bad:
+        for col in merged_cube.columns:
+            a, b = merged_cube[col], cube[col]
+            if col in ["price_sum", "price_sumsq", "price_min", "price_max"]:
+                bad |= not np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), rtol=1e-9, equal_nan=True)
+            else:
+                bad |= not a.equals(b)
+        bad |= not merged_sketches.equals(sketches)
+    print(f"  {batches} batches merged: {len(merged_cube):,} cells, {len(merged_sketches):,} sketch rows  "
+          f"{'identical to the full cube' if not bad else 'DIFFERENT from the full cube'}")
+    return int(bad)
+
+
+def median(values: pd.Series) -> float:
+    values = pd.to_numeric(values, errors="coerce").dropna()
+    return float(values.median()) if len(values) else np.nan
+
+
+def platform_medians(derived: pd.DataFrame, cube: pd.DataFrame, sketches: pd.DataFrame):
+    """Per-platform medians: exact (pandas, interpolated as in step 3) vs sketch."""
+    merged = query(cube, sketches, ["platform"]).set_index("platform")
+    exact = derived.assign(platform=derived["platform"].astype(object)).groupby("platform")
+    print(f"  {'platform':<14} {'median price':>12} {'sketch':>9} {'median age':>11} {'sketch':>9}")
+    for platform, row in merged.iterrows():
+        group = exact.get_group(platform)
+        price, age = (median(group[col]) for col in ["price_num", "age_days"])
+        print(f"  {platform:<14} {price:>12.1f} {row['price_p50']:>9.1f} {age:>11.1f} {row['age_days_p50']:>9.1f}")
+
+
+def best_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=20, help="Repeat the derived rows this many times for timing")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    derived = load_derived()
+    cube, sketches = build_cube(derived)
+
+    print("=" * 60)
+    print(f"Parity: raw rows vs cube ({len(cube):,} cells)")
+    print("=" * 60)
+    bad = 0
+    for where in WHERE:
+        for by in ROLLUPS:
+            label = f"by {'×'.join(by) or '(total)'}" + (f" where {where}" if where else "")
+            bad += compare(label, raw_query(derived, by, where), query(cube, sketches, by, where, QUANTILES), by)
+
+    print("\n" + "=" * 60)
+    print("Merging cubes built from batches of listings")
+    print("=" * 60)
+    for batches in [2, 7]:
+        bad += check_merge(derived, cube, sketches, batches)
+
+    print("\n" + "=" * 60)
+    print("Per-platform medians: exact vs merged sketches")
+    print("=" * 60)
+    platform_medians(derived, cube, sketches)
+
+    big = pd.concat([derived] * args.scale, ignore_index=True)
+    start = time.perf_counter()
+    big_cube, big_sketches = build_cube(big)
+    build_seconds = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print(f"Timing (best of {args.repeat}, derived x{args.scale} = {len(big):,} rows, "
+          f"{len(big_cube):,} cells; cube build {build_seconds:.3f}s)")
+    print("=" * 60)
+    for by in ROLLUPS[1:]:
+        raw = best_time(lambda: raw_query(big, by, None), args.repeat)
+        rolled = best_time(lambda: query(big_cube, big_sketches, by, None, QUANTILES), args.repeat)
+        print(f"  by {'×'.join(by):<20} raw rows={raw * 1000:>8.1f}ms  cube={rolled * 1000:>7.1f}ms  "
+              f"speedup={raw / rolled:.1f}x")
+
+    if bad:
+        raise SystemExit(f"\n{bad} mismatches between raw-row and cube rollups")
+    print("\n✓ Cube rollups match raw-row results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: row-wise vs vectorized puppy-count parsing
+
+Checks that the vectorized extractors in pipeline_01_build_facts.py give the
+same results as the original row-wise functions on every raw CSV, then times
+both on the gumtree and puppies description columns (the slowest inputs).
+
+Usage:
+    python pipeline/benchmark_puppy_counts.py [--repeat 3]
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from pipeline_01_build_facts import (
+    PLATFORM_CONFIG,
+    combine_gender_counts,
+    extract_puppy_counts,
+    find_platform_file,
+    gender_count_totals,
+    litter_size_totals,
+    parse_kennel_club_litter_size,
+    parse_title_for_puppies,
+    read_raw_csv,
+)
+
+TEXT_COLUMNS = ["title", "description"]
+BENCH_COLUMNS = [("gumtree", "description"), ("puppies", "description")]
+
+
+def load_raw(platform: str) -> pd.DataFrame:
+    file_path = find_platform_file(platform, PLATFORM_CONFIG[platform])
+    return pd.DataFrame() if file_path is None else read_raw_csv(file_path)
+
+
+def rowwise_counts(series: pd.Series) -> pd.Series:
+    return series.apply(lambda x: parse_title_for_puppies(x, clamp=12)).astype(float)
+
+
+def check_parity(raw: dict) -> int:
+    """Compare old and new parsers on every available column; return mismatches."""
+    mismatches = 0
+
+    def report(label: str, old: pd.Series, new: pd.Series):
+        nonlocal mismatches
+        same = (old == new) | (old.isna() & new.isna())
+        bad = int((~same).sum())
+        mismatches += bad
+        print(f"  {label:<40} rows={len(old):>6}  parsed={int(new.notna().sum()):>6}  mismatches={bad}")
+
+    for platform, df in raw.items():
+        for col in TEXT_COLUMNS:
+            if col in df.columns:
+                report(f"{platform}.{col}", rowwise_counts(df[col]), extract_puppy_counts(df[col])["count"])
+        if platform == "kennel_club" and "litter_size" in df.columns:
+            old = df["litter_size"].apply(parse_kennel_club_litter_size).astype(float)
+            report(f"{platform}.litter_size", old, litter_size_totals(df["litter_size"]))
+        if "males_available" in df.columns and "females_available" in df.columns:
+            old = df.apply(
+                lambda row: combine_gender_counts(row["males_available"], row["females_available"]),
+                axis=1,
+            ).astype(float)
+            report(f"{platform}.males+females", old, gender_count_totals(df["males_available"], df["females_available"]))
+    return mismatches
+
+
+def best_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    raw = {platform: load_raw(platform) for platform in PLATFORM_CONFIG}
+    raw = {platform: df for platform, df in raw.items() if not df.empty}
+
+    print("=" * 60)
+    print("Parity: row-wise vs vectorized")
+    print("=" * 60)
+    mismatches = check_parity(raw)
+
+    print("\n" + "=" * 60)
+    print(f"Timing (best of {args.repeat})")
+    print("=" * 60)
+    for platform, col in BENCH_COLUMNS:
+        if platform not in raw or col not in raw[platform].columns:
+            print(f"  {platform}.{col}: not available")
+            continue
+        series = raw[platform][col]
+        old = best_time(lambda: rowwise_counts(series), args.repeat)
+        new = best_time(lambda: extract_puppy_counts(series), args.repeat)
+        print(f"  {platform}.{col:<14} rows={len(series):>6}  row-wise={old:.3f}s  vectorized={new:.3f}s  speedup={old / new:.1f}x")
+
+    rules = pd.concat(
+        [extract_puppy_counts(df[col])["rule"] for df in raw.values() for col in TEXT_COLUMNS if col in df.columns]
+    )
+    print("\nRule hits (all text columns):")
+    print(rules.value_counts().to_string())
+
+    if mismatches:
+        raise SystemExit(f"\n{mismatches} mismatches between row-wise and vectorized parsers")
+    print("\n✓ Vectorized parsers match row-wise results")
+
+
+if __name__ == "__main__":
+    main()
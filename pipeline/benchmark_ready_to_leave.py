@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Benchmark: row-wise vs rule-table ready_to_leave parsing
+
+Checks that parse_ready_to_leave in pipeline_02_build_derived.py (the
+compiled READY_TO_LEAVE_RULES) gives exactly the output (parsed ts and
+parse mode) of the original row-by-row loops, then times both:
+
+- freeads: the current scrape has no freeads file, so this builds synthetic
+  freeads rows ("7th February"-style dates around year ends, the ±180-day
+  boundaries, leap days, invalid dates, "Now", "N weeks")
+- the other platforms (preloved, kennel_club, ...): the real facts, taken
+  through the earlier step 2 stages, plus --scale copies with
+  ready_to_leave and date_of_birth shuffled across rows to mix the cases
+
+Usage:
+    python pipeline/benchmark_ready_to_leave.py [--rows 50000] [--scale 10] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline_02_build_derived import (
+    DATE_RE,
+    NOW_RE,
+    ORDINAL_RE,
+    OTHER_PLATFORMS,
+    WEEKS_RE,
+    add_age_days,
+    add_typed_columns,
+    load_facts,
+    parse_ready_to_leave,
+    prepare_facts,
+    validate_puppy_counts,
+)
+
+MONTHS = ["Jan", "February", "mar", "April", "May", "june", "Jul", "august",
+          "Sep", "Sept", "september", "Oct", "November", "dec"]
+OTHER_VALUES = ["Now", "now ", "8 weeks", "in 2 weeks", "ready soon", "", None, "31st of feb", "0th June", "45 May"]
+
+
+def synthetic_freeads(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Freeads-like rows with anchors spread over two years."""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(1, 32, rows)
+    months = rng.choice(MONTHS, rows)
+    suffix = rng.choice(["", "st", "nd", "rd", "th"], rows)
+    of = rng.choice(["", " of"], rows)
+    dates = [f"{d}{s}{o} {m}" for d, s, o, m in zip(days, suffix, of, months)]
+    other = rng.choice(np.array(OTHER_VALUES, dtype=object), rows)
+    ready = np.where(rng.random(rows) < 0.7, np.array(dates, dtype=object), other)
+
+    start = pd.Timestamp("2024-01-01", tz="UTC")
+    offsets = pd.to_timedelta(rng.integers(0, 2 * 365 * 24 * 3600, rows), unit="s")
+    published = pd.Series(start + offsets).where(rng.random(rows) < 0.6)
+    return pd.DataFrame({
+        "platform": "freeads",
+        "ready_to_leave": ready,
+        "published_at_ts": published.astype("datetime64[ns, UTC]"),
+        "asof_ts": pd.Timestamp("2026-01-22 12:00", tz="UTC"),
+        "ready_to_leave_ts": pd.Series(pd.NaT, index=range(rows), dtype="datetime64[ns, UTC]"),
+        "date_of_birth_ts": pd.Series(pd.NaT, index=range(rows), dtype="datetime64[ns, UTC]"),
+        "ready_to_leave_parsed_ts": pd.Series(pd.NaT, index=range(rows), dtype="datetime64[ns, UTC]"),
+        "ready_to_leave_parse_mode": "unknown",
+    })
+
+
+def rowwise_freeads(df: pd.DataFrame) -> pd.DataFrame:
+    """The original parse_ready_to_leave_freeads date branch: one row at a time."""
+    out = df.copy()
+    f = out.copy()
+    rtl = f["ready_to_leave"].astype("string").fillna("").str.strip()
+    anchor = f["published_at_ts"].where(f["published_at_ts"].notna(), f["asof_ts"])
+
+    f["ready_to_leave_parsed_ts"] = pd.Series(pd.NaT, index=f.index, dtype="datetime64[ns, UTC]")
+    f["ready_to_leave_parse_mode"] = "unknown"
+
+    is_now = rtl.str.match(NOW_RE)
+    f.loc[is_now, "ready_to_leave_parsed_ts"] = anchor[is_now]
+    f.loc[is_now, "ready_to_leave_parse_mode"] = "now"
+
+    wk_extract = rtl.str.extract(WEEKS_RE)
+    has_weeks = wk_extract[0].notna() & ~is_now
+    days = pd.to_numeric(wk_extract[0], errors="coerce") * 7
+    f.loc[has_weeks, "ready_to_leave_parsed_ts"] = anchor[has_weeks] + pd.to_timedelta(days[has_weeks], unit="D")
+    f.loc[has_weeks, "ready_to_leave_parse_mode"] = "in_weeks"
+
+    normalized = (rtl
+        .str.replace(ORDINAL_RE, r"\1", regex=True)
+        .str.replace(r"\bof\b", " ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip())
+    date_match = normalized.str.extract(DATE_RE)
+    has_date = date_match[0].notna() & ~is_now & ~has_weeks
+
+    for idx in f.index[has_date]:
+        day = date_match.loc[idx, 0]
+        month = date_match.loc[idx, 1]
+        date_str = f"{day} {month} {anchor.loc[idx].year}"
+        try:
+            parsed = pd.to_datetime(date_str, utc=True)
+            if (parsed - anchor.loc[idx]).days < -180:
+                parsed = parsed + pd.DateOffset(years=1)
+            if (parsed - anchor.loc[idx]).days > 180:
+                f.loc[idx, "ready_to_leave_parse_mode"] = "date_suspicious"
+            else:
+                f.loc[idx, "ready_to_leave_parsed_ts"] = parsed
+                f.loc[idx, "ready_to_leave_parse_mode"] = "date_anchored"
+        except Exception:
+            pass
+
+    out["ready_to_leave_parsed_ts"] = f["ready_to_leave_parsed_ts"]
+    out["ready_to_leave_parse_mode"] = f["ready_to_leave_parse_mode"]
+    return out
+
+
+def other_platforms_input(scale: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Real facts as parse_ready_to_leave receives them, plus scale - 1 copies
+    with ready_to_leave and date_of_birth shuffled across rows.
+    """
+    df = add_age_days(validate_puppy_counts(add_typed_columns(prepare_facts(load_facts()))))
+    # Unparsed, as the original loop expects
+    df["ready_to_leave_parsed_ts"] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+    df["ready_to_leave_parse_mode"] = "unknown"
+
+    rng = np.random.default_rng(seed)
+    copies = [df]
+    for _ in range(scale - 1):
+        copy = df.copy()
+        for cols in (["ready_to_leave", "ready_to_leave_ts"], ["date_of_birth", "date_of_birth_ts"]):
+            order = rng.permutation(len(copy))
+            copy[cols] = copy[cols].iloc[order].to_numpy()
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def rowwise_other(df: pd.DataFrame) -> pd.DataFrame:
+    """The original parse_ready_to_leave_other: six .loc reads/writes per row."""
+    out = df.copy()
+    mask = out["platform"].isin(OTHER_PLATFORMS)
+    unset = mask & out["ready_to_leave_parsed_ts"].isna()
+
+    for idx in out.index[unset]:
+        rtl = out.loc[idx, "ready_to_leave"]
+        if pd.isna(rtl) or str(rtl).strip() == "":
+            dob_ts = out.loc[idx, "date_of_birth_ts"]
+            if pd.notna(dob_ts):
+                out.loc[idx, "ready_to_leave_parsed_ts"] = dob_ts + pd.Timedelta(weeks=8)
+                out.loc[idx, "ready_to_leave_parse_mode"] = "dob_plus_8wks"
+            else:
+                out.loc[idx, "ready_to_leave_parse_mode"] = "missing"
+            continue
+
+        if NOW_RE.match(str(rtl).lower().strip()):
+            out.loc[idx, "ready_to_leave_parsed_ts"] = out.loc[idx, "asof_ts"]
+            out.loc[idx, "ready_to_leave_parse_mode"] = "now"
+            continue
+
+        ts = out.loc[idx, "ready_to_leave_ts"]
+        if pd.notna(ts):
+            out.loc[idx, "ready_to_leave_parsed_ts"] = ts
+            out.loc[idx, "ready_to_leave_parse_mode"] = "date"
+        else:
+            dob_ts = out.loc[idx, "date_of_birth_ts"]
+            if pd.notna(dob_ts):
+                out.loc[idx, "ready_to_leave_parsed_ts"] = dob_ts + pd.Timedelta(weeks=8)
+                out.loc[idx, "ready_to_leave_parse_mode"] = "dob_plus_8wks"
+            else:
+                out.loc[idx, "ready_to_leave_parse_mode"] = "unknown"
+    return out
+
+
+def compare(label: str, old: pd.DataFrame, new: pd.DataFrame, platforms: list[str]) -> int:
+    """
+    Print rule hits and per-column mismatches on the platforms' rows;
+    return the mismatch count.
+    """
+    rows = new["platform"].isin(platforms)
+    old, new = old[rows], new[rows]
+    print("=" * 60)
+    print(f"Parity: {label}, {len(new):,} rows")
+    print("=" * 60)
+    print(new.groupby(["ready_to_leave_rule", "ready_to_leave_parse_mode"], dropna=False).size().to_string())
+    bad = 0
+    for col in ["ready_to_leave_parsed_ts", "ready_to_leave_parse_mode"]:
+        same = (old[col] == new[col]) | (old[col].isna() & new[col].isna())
+        bad += int((~same).sum())
+        print(f"  {col:<28} mismatches={int((~same).sum())}")
+        if not same.all():
+            print(new.loc[~same, ["platform", "ready_to_leave", col]].assign(old=old.loc[~same, col]).head())
+    return bad
+
+
+def best_time(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic freeads rows")
+    parser.add_argument("--scale", type=int, default=10, help="Copies of the facts for the other-platforms check")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    cases = [
+        ("freeads (synthetic)", synthetic_freeads(args.rows), rowwise_freeads, ["freeads"]),
+        (f"other platforms (facts x{args.scale})", other_platforms_input(args.scale), rowwise_other,
+         OTHER_PLATFORMS),
+    ]
+    bad = 0
+    timings = []
+    for label, df, old_func, platforms in cases:
+        bad += compare(label, old_func(df), parse_ready_to_leave(df), platforms)
+        print()
+        timings.append((
+            label,
+            best_time(lambda: old_func(df), args.repeat),
+            best_time(lambda: parse_ready_to_leave(df), args.repeat),
+        ))
+
+    print("=" * 60)
+    print(f"Timing (best of {args.repeat})")
+    print("=" * 60)
+    for label, old_time, new_time in timings:
+        print(f"  {label:<32} row-wise={old_time:.3f}s  rules={new_time:.3f}s  "
+              f"speedup={old_time / new_time:.1f}x")
+
+    if bad:
+        raise SystemExit(f"\n{bad} mismatches between row-wise and rule-table parsing")
+    print("\n✓ Rule-table parsing matches row-wise results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark: documented SQLite queries with the old single-column indexes vs
+the exporter's composite/covering indexes
+
+Exports facts and derived (repeated --scale times, urls made unique) into two
+databases with create_sqlite_db.export(): one with the six single-column
+indexes the exporter used to create (BASELINE_INDEXES), one with its current
+INDEXES. Then runs every query the exporter and QUICK_START.md document, and
+the SQL equivalents of query_templates.py, against both. For each it prints
+EXPLAIN QUERY PLAN and the best latency, and checks both return the same rows
+(queries whose LIMIT cuts through ties may pick different rows).
+
+Usage:
+    python pipeline/benchmark_sqlite_queries.py [--scale 20] [--repeat 5] [--plans]
+"""
+
+from pathlib import Path
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# The exporter and the loader live in the repo root
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from create_sqlite_db import INDEXES, connect, export
+from dogmarket.data import load_derived, load_facts
+
+# The indexes create_sqlite_db.py created before the composite ones
+BASELINE_INDEXES = {
+    'idx_facts_platform': ('facts', ['platform']),
+    'idx_facts_breed': ('facts', ['breed']),
+    'idx_facts_location': ('facts', ['location']),
+    'idx_facts_seller': ('facts', ['seller_name']),
+    'idx_derived_platform': ('derived', ['platform']),
+    'idx_derived_breed': ('derived', ['breed']),
+}
+
+# Queries from create_sqlite_db.py's usage notes and QUICK_START.md
+DOCUMENTED = {
+    "derived of one platform": "SELECT * FROM derived WHERE platform = 'gumtree' LIMIT 10",
+    "facts per platform": "SELECT COUNT(*), platform FROM facts GROUP BY platform",
+    "top breeds by avg price": (
+        "SELECT breed, AVG(price_num) as avg_price FROM derived GROUP BY breed ORDER BY avg_price DESC LIMIT 10"
+    ),
+    "top facts locations": (
+        "SELECT location, COUNT(*) as listings FROM facts GROUP BY location ORDER BY listings DESC LIMIT 10"
+    ),
+    "distinct breeds": "SELECT DISTINCT breed FROM facts ORDER BY breed",
+    "avg price by location": (
+        "SELECT location, AVG(price_num) as avg_price, COUNT(*) as listings "
+        "FROM derived GROUP BY location HAVING listings > 10 ORDER BY listings DESC"
+    ),
+    "microchipped by platform": (
+        "SELECT platform, microchipped, COUNT(*) "
+        "FROM derived WHERE microchipped IS NOT NULL GROUP BY platform, microchipped"
+    ),
+    "breed price and count": (
+        "SELECT breed, AVG(price_num) as avg_price, COUNT(*) as count "
+        "FROM derived GROUP BY breed ORDER BY avg_price DESC LIMIT 10"
+    ),
+    "platform listings and price": (
+        "SELECT platform, COUNT(*) as listings, AVG(price_num) as avg_price "
+        "FROM derived GROUP BY platform ORDER BY listings DESC"
+    ),
+}
+
+# query_templates.py sections as SQL (medians have no SQLite aggregate; sellers
+# are grouped on both columns rather than their concatenation, which is the
+# same groups since facts has no empty strings)
+TEMPLATES = {
+    "1 breed analysis": (
+        "SELECT breed, COUNT(price_num) AS priced, AVG(price_num) AS avg_price, COUNT(*) AS listings "
+        "FROM derived GROUP BY breed HAVING listings > 10 ORDER BY listings DESC LIMIT 10"
+    ),
+    "2 platform price": (
+        "SELECT platform, COUNT(price_num) AS listings, AVG(price_num) AS avg_price "
+        "FROM derived GROUP BY platform ORDER BY listings DESC"
+    ),
+    "3 location price": (
+        "SELECT location, COUNT(price_num) AS listings, AVG(price_num) AS avg_price "
+        "FROM derived GROUP BY location HAVING listings > 5 ORDER BY listings DESC LIMIT 10"
+    ),
+    "4 health coverage": (
+        "SELECT platform, 100.0 * COUNT(microchipped) / COUNT(*), 100.0 * COUNT(vaccinated) / COUNT(*), "
+        "100.0 * COUNT(health_checked) / COUNT(*) FROM derived GROUP BY platform"
+    ),
+    "5 availability modes": (
+        "SELECT platform, ready_to_leave_parse_mode, COUNT(*) "
+        "FROM derived GROUP BY platform, ready_to_leave_parse_mode"
+    ),
+    "6 top sellers": (
+        "SELECT COALESCE(seller_name, '') || ' | ' || COALESCE(location, '') AS seller_id, COUNT(*) AS n "
+        "FROM facts GROUP BY seller_name, location ORDER BY n DESC LIMIT 10"
+    ),
+    "7 price quartiles": (
+        "SELECT (SELECT price_num FROM derived WHERE price_num IS NOT NULL ORDER BY price_num "
+        "LIMIT 1 OFFSET (SELECT COUNT(price_num) FROM derived) / 4), "
+        "(SELECT price_num FROM derived WHERE price_num IS NOT NULL ORDER BY price_num "
+        "LIMIT 1 OFFSET (SELECT COUNT(price_num) FROM derived) * 3 / 4)"
+    ),
+    "8 microchipped vs price": (
+        "SELECT microchipped, COUNT(price_num), AVG(price_num) "
+        "FROM derived WHERE microchipped IS NOT NULL GROUP BY microchipped"
+    ),
+    "9 age distribution": "SELECT COUNT(age_days), AVG(age_days), MIN(age_days), MAX(age_days) FROM derived",
+    "10 listings by date": (
+        "SELECT date(published_at_ts) AS day, COUNT(*) FROM derived "
+        "WHERE published_at_ts IS NOT NULL GROUP BY day ORDER BY day DESC LIMIT 10"
+    ),
+}
+
+
+def scaled(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """df repeated scale times, with the copy number added to each url."""
+    big = pd.concat([df] * scale, ignore_index=True)
+    copy = pd.Series(big.index // len(df), index=big.index).astype(str)
+    big['url'] = big['url'] + ('#' + copy).where(copy != '0', '')
+    return big
+
+
+def plan(conn: sqlite3.Connection, sql: str) -> list[str]:
+    """EXPLAIN QUERY PLAN as indented lines."""
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+    depth = {0: 0}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, 0) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def best_time(conn: sqlite3.Connection, sql: str, repeat: int) -> tuple[float, list]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        times.append(time.perf_counter() - start)
+    return min(times), rows
+
+
+def same_rows(a: list, b: list) -> bool:
+    """Same rows in any order; floats compared to 10 significant digits (sums depend on row order)."""
+    def normal(row):
+        return tuple((value is None, float(f"{value:.10g}") if isinstance(value, float) else value) for value in row)
+    return sorted(map(normal, a)) == sorted(map(normal, b))
+
+
+def run(label: str, queries: dict, before: sqlite3.Connection, after: sqlite3.Connection,
+        repeat: int, show_plans: bool) -> int:
+    """Time and explain each query on both databases; return the number of result mismatches."""
+    print("\n" + "=" * 60)
+    print(label)
+    print("=" * 60)
+    bad = 0
+    for name, sql in queries.items():
+        old_seconds, old_rows = best_time(before, sql, repeat)
+        new_seconds, new_rows = best_time(after, sql, repeat)
+        old_plan, new_plan = plan(before, sql), plan(after, sql)
+        match = same_rows(old_rows, new_rows)
+        if not match and 'LIMIT' not in sql:
+            bad += 1
+        note = '' if match else ('  (rows differ: LIMIT ties)' if 'LIMIT' in sql else '  ROWS DIFFER')
+        print(f"  {name:<28} before={old_seconds * 1000:>8.2f}ms  after={new_seconds * 1000:>8.2f}ms  "
+              f"speedup={old_seconds / new_seconds:>5.1f}x{note}")
+        if show_plans or old_plan != new_plan:
+            print("    before:")
+            print("\n".join(f"    {line}" for line in old_plan))
+            print("    after:")
+            print("\n".join(f"    {line}" for line in new_plan))
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=20, help="Repeat facts and derived rows this many times")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    parser.add_argument("--plans", action="store_true", help="Print every query plan, not only those that changed")
+    args = parser.parse_args()
+
+    tables = {'facts': scaled(load_facts(), args.scale), 'derived': scaled(load_derived(), args.scale)}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {'before': Path(tmp) / 'before.db', 'after': Path(tmp) / 'after.db'}
+        for (label, path), indexes in zip(paths.items(), [BASELINE_INDEXES, INDEXES]):
+            start = time.perf_counter()
+            export(path, tables, indexes=indexes)
+            print(f"{label}: {len(indexes)} indexes, exported {len(tables['derived']):,} derived rows "
+                  f"in {time.perf_counter() - start:.1f}s, {path.stat().st_size / 1024 / 1024:.0f} MB")
+
+        before, after = connect(paths['before']), connect(paths['after'])
+        try:
+            bad = run("Documented queries", DOCUMENTED, before, after, args.repeat, args.plans)
+            bad += run("query_templates.py equivalents", TEMPLATES, before, after, args.repeat, args.plans)
+        finally:
+            before.close()
+            after.close()
+
+    if bad:
+        raise SystemExit(f"\n{bad} queries returned different rows with the new indexes")
+    print("\n✓ Same results with both index sets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Dependency-aware pipeline runner
+
+Runs the pipeline steps and the downstream analysis scripts as a DAG of
+nodes. Each node declares:
+- inputs: raw files, the schema CSV, upstream artifacts (paths or globs)
+- code: the source files that shape its outputs
+- outputs: the artifacts it writes
+
+A node's fingerprint hashes the content of its inputs and code plus its
+arguments (and the date, for nodes whose outputs depend on it). A node is skipped when its fingerprint matches the last
+successful run and all its outputs exist, so after a small change only the
+affected nodes rerun. Dependencies are inferred: a node depends on every
+node whose outputs it reads. Independent nodes run concurrently (--jobs).
+
+Every node runs its script in its own process from the repo root; stdout
+and stderr go to output/logs/<node>.log. For the analysis scripts that log
+is their report, so it is also their output.
+
+Usage:
+    python dag.py                     # bring every artifact up to date
+    python dag.py --jobs 4            # up to 4 nodes at once
+    python dag.py --dry-run           # show what would run
+    python dag.py --force derived     # rerun derived even if unchanged
+    python dag.py sqlite_db           # only sqlite_db and its upstream nodes
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+
+from storage import file_sha256
+
+PIPELINE_DIR = Path(__file__).resolve().parent
+REPO_ROOT = PIPELINE_DIR.parent
+STATE_PATH = REPO_ROOT / "output" / ".dag_state.json"
+LOG_DIR = REPO_ROOT / "output" / "logs"
+
+RAW_CSVS = REPO_ROOT / "Input" / "Raw CSVs" / "*.csv"
+SCHEMA_CSV = REPO_ROOT / "schema" / "pets4homes_master_schema.csv"
+FACTS = [REPO_ROOT / "output" / "facts" / "facts.csv", REPO_ROOT / "output" / "facts" / "facts.parquet"]
+DERIVED = [REPO_ROOT / "output" / "views" / "derived.csv", REPO_ROOT / "output" / "views" / "derived.parquet"]
+SUMMARY = REPO_ROOT / "output" / "views" / "platform_supply_summary.csv"
+CUBE = [
+    REPO_ROOT / "output" / "views" / name
+    for name in ["market_cube.csv", "market_cube.parquet", "market_cube_sketches.csv", "market_cube_sketches.parquet"]
+]
+STORAGE = PIPELINE_DIR / "storage.py"
+RUN_REPORT = PIPELINE_DIR / "run_report.py"
+# Loader the analysis scripts (and the SQLite export) read tables through
+DATA_LOADER = [REPO_ROOT / "dogmarket" / "data.py", STORAGE]
+
+# Key: node name
+# Value: dict with 'script', 'args', 'inputs', 'code', 'outputs' (see register_node)
+NODES = {}
+
+
+def register_node(name: str, script: Path, inputs=(), outputs=(), code=(), args=(), daily: bool = False):
+    """
+    Add a node to the DAG.
+
+    Args:
+        name: Node name (also its log file name)
+        script: Python script the node runs, from the repo root
+        inputs: Files or glob patterns it reads (upstream outputs included)
+        outputs: Files it writes; its log is used if none are given
+        code: Source files besides script whose changes should rerun it
+        args: Command-line arguments for script
+        daily: Outputs depend on the run date, so rerun once a (UTC) day
+            even if nothing else changed
+    """
+    if name in NODES:
+        raise ValueError(f"Node already registered: {name}")
+    log = LOG_DIR / f"{name}.log"
+    NODES[name] = {
+        "script": Path(script),
+        "args": list(args),
+        "daily": daily,
+        "inputs": [Path(path) for path in inputs],
+        "code": [Path(script)] + [Path(path) for path in code],
+        "outputs": [Path(path) for path in outputs] or [log],
+        "log": log,
+    }
+
+
+# Pipeline steps, each with every local module it imports. Steps 1 and 2 run
+# incrementally, so a changed raw file only rebuilds its own platform and
+# only changed listings are re-derived. derived's ASOF_COLUMNS (age_days,
+# days_until_ready, ...) depend on the run date, so it reruns once a day even
+# when facts are unchanged; its asof probe keeps that rerun cheap, and the
+# nodes downstream follow from its changed outputs.
+register_node(
+    "facts", PIPELINE_DIR / "pipeline_01_build_facts.py",
+    inputs=[RAW_CSVS, SCHEMA_CSV], outputs=FACTS, code=[STORAGE, RUN_REPORT], args=["--incremental"],
+)
+register_node(
+    "derived", PIPELINE_DIR / "pipeline_02_build_derived.py",
+    inputs=FACTS, outputs=DERIVED, code=[STORAGE, RUN_REPORT], args=["--incremental"], daily=True,
+)
+register_node(
+    "summary", PIPELINE_DIR / "pipeline_03_build_summary.py",
+    inputs=DERIVED, outputs=[SUMMARY], code=[STORAGE, RUN_REPORT],
+)
+register_node(
+    "market_cube", PIPELINE_DIR / "pipeline_04_build_cube.py",
+    inputs=DERIVED, outputs=CUBE, code=[STORAGE, RUN_REPORT, PIPELINE_DIR / "sketch.py"],
+)
+register_node(
+    "sqlite_db", REPO_ROOT / "create_sqlite_db.py",
+    inputs=FACTS + DERIVED, outputs=[REPO_ROOT / "output" / "dog_market.db"],
+    code=DATA_LOADER + [REPO_ROOT / "dogmarket" / "search.py"],
+)
+
+# Downstream analysis scripts (report = their log). Key: node name,
+# Value: script in the repo root
+ANALYSIS_SCRIPTS = {
+    "qa_audit": "comprehensive_qa_audit.py",
+    "sanity_checks": "sanity_checks.py",
+    "quality_issues": "quality_issues_only.py",
+    "seller_analysis": "seller_analysis.py",
+    "top_sellers": "analyze_top_sellers.py",
+    "sellers_by_location": "analyze_sellers_by_location.py",
+    "suspicious_sellers": "identify_suspicious_sellers.py",
+}
+for _name, _script in ANALYSIS_SCRIPTS.items():
+    register_node(_name, REPO_ROOT / _script, inputs=FACTS + DERIVED, code=DATA_LOADER)
+
+
+def expand(pattern: Path) -> list[Path]:
+    """Files matching a path or glob pattern, sorted."""
+    if any(ch in pattern.name for ch in "*?["):
+        return sorted(pattern.parent.glob(pattern.name))
+    return [pattern]
+
+
+def dependencies(name: str) -> set[str]:
+    """Nodes whose outputs this node reads."""
+    inputs = set(NODES[name]["inputs"])
+    return {other for other, node in NODES.items() if other != name and inputs & set(node["outputs"])}
+
+
+def upstream(targets) -> list[str]:
+    """targets and everything they depend on, in registration order."""
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(dependencies(name))
+    return [name for name in NODES if name in needed]
+
+
+def _relative(path: Path) -> str:
+    return str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+
+
+def file_hash(path: Path, previous: dict, current: dict) -> str | None:
+    """
+    sha256 of a file (None if missing), recorded in current. The hash from
+    the previous run is reused when size and mtime are unchanged, so
+    untouched raw files are not re-read.
+    """
+    key = _relative(path)
+    if key in current:
+        return current[key]["sha256"]
+    if not path.exists():
+        return None
+    stat = path.stat()
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    old = previous.get(key)
+    if old and all(old.get(k) == v for k, v in entry.items()):
+        entry["sha256"] = old["sha256"]
+    else:
+        entry["sha256"] = file_sha256(path)
+    current[key] = entry
+    return entry["sha256"]
+
+
+def fingerprint(node: dict, previous: dict, current: dict) -> str:
+    """
+    Hash of a node's input and code contents and its arguments (file_hash
+    args), plus today's date for daily nodes.
+    """
+    payload = {
+        "args": node["args"],
+        "day": datetime.now(timezone.utc).date().isoformat() if node["daily"] else None,
+        "inputs": {
+            _relative(path): file_hash(path, previous, current)
+            for pattern in node["inputs"] for path in expand(pattern)
+        },
+        "code": {_relative(path): file_hash(path, previous, current) for path in node["code"]},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def run_node(name: str) -> tuple[int, float]:
+    """Run a node's script from the repo root; return (exit code, seconds)."""
+    node = NODES[name]
+    node["log"].parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with open(node["log"], "w") as log:
+        result = subprocess.run(
+            [sys.executable, str(node["script"])] + node["args"],
+            cwd=str(REPO_ROOT), stdout=log, stderr=subprocess.STDOUT,
+        )
+    return result.returncode, time.perf_counter() - start
+
+
+def _load_state() -> dict:
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text())
+    return {"nodes": {}, "files": {}}
+
+
+def _save_state(state: dict, current: dict):
+    state["files"] = {**state["files"], **current}
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATE_PATH.write_text(json.dumps(state, indent=2, sort_keys=True))
+
+
+def run_dag(targets=None, jobs: int = 1, force=(), dry_run: bool = False) -> bool:
+    """
+    Bring targets (default: every node) and their upstream nodes up to date.
+
+    A node is checked once all its dependencies have finished, so it sees
+    their fresh outputs. Nodes downstream of a failure are not run.
+
+    Args:
+        force: Node names to rerun even if their fingerprint is unchanged
+        dry_run: Report stale nodes without running anything (a stale
+            node's dependents are assumed stale too)
+
+    Returns:
+        bool: True if every node succeeded or was up to date
+    """
+    names = upstream(targets or list(NODES))
+    state = _load_state()
+    previous, current = state["files"], {}
+    deps = {name: dependencies(name) & set(names) for name in names}
+    done, failed, reran = set(), set(), set()
+    running = {}  # future -> node name
+    fingerprints = {}  # node name -> fingerprint it is running with
+    ok = True
+
+    def is_stale(name: str) -> bool:
+        node = NODES[name]
+        fingerprints[name] = fingerprint(node, previous, current)
+        return (
+            name in force
+            or fingerprints[name] != state["nodes"].get(name, {}).get("fingerprint")
+            or not all(path.exists() for path in node["outputs"])
+            or (dry_run and bool(deps[name] & reran))
+        )
+
+    print(f"DAG: {len(names)} nodes, up to {jobs} at once")
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while len(done) + len(failed) < len(names):
+            for name in names:
+                if name in done or name in failed or name in running.values():
+                    continue
+                if deps[name] & failed:
+                    print(f"  ✗ {name}: skipped (upstream failed)")
+                    failed.add(name)
+                    continue
+                if not deps[name] <= done or len(running) >= max(1, jobs):
+                    continue
+                if not is_stale(name):
+                    print(f"  · {name}: up to date")
+                    done.add(name)
+                elif dry_run:
+                    print(f"  → {name}: would run")
+                    reran.add(name)
+                    done.add(name)
+                else:
+                    print(f"  → {name}: running")
+                    running[pool.submit(run_node, name)] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                code, seconds = future.result()
+                for path in NODES[name]["outputs"]:
+                    current.pop(_relative(path), None)
+                if code == 0:
+                    print(f"  ✓ {name}: done in {seconds:.1f}s")
+                    state["nodes"][name] = {"fingerprint": fingerprints[name]}
+                    reran.add(name)
+                    done.add(name)
+                else:
+                    print(f"  ❌ {name}: failed (exit {code}), see {_relative(NODES[name]['log'])}")
+                    failed.add(name)
+                    ok = False
+            if not dry_run:
+                _save_state(state, current)
+
+    if not dry_run:
+        _save_state(state, current)
+    print(f"DAG: {len(reran)} ran, {len(done) - len(reran)} up to date, {len(failed)} failed")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring pipeline and analysis outputs up to date.")
+    parser.add_argument("targets", nargs="*", help=f"Nodes to update (default: all). Known: {', '.join(NODES)}")
+    parser.add_argument("--jobs", type=int, default=1, help="Run up to this many independent nodes at once")
+    parser.add_argument("--force", action="append", default=[], metavar="NODE", help="Rerun this node even if unchanged (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would run, without running it")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.targets + args.force if name not in NODES]
+    if unknown:
+        parser.error(f"unknown node(s): {', '.join(unknown)}")
+
+    if not run_dag(args.targets, args.jobs, set(args.force), args.dry_run):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,47 @@ conforming strictly to schema/pets4homes_master_schema.csv + platform column.
 
 No derivations, no heuristics - just field mapping.
 
-Output: output/facts/facts.csv (single authoritative file, no timestamps)
+Output: output/facts/facts.csv and/or facts.parquet (see storage.py; single
+authoritative table, no timestamps)
+
+Usage:
+    python pipeline_01_build_facts.py                    # whole-file load
+    python pipeline_01_build_facts.py --chunksize 50000  # bounded-memory streaming
+    python pipeline_01_build_facts.py --workers 8        # platforms in parallel
+    python pipeline_01_build_facts.py --incremental      # rebuild changed platforms only
+    python pipeline_01_build_facts.py --all-snapshots    # every scrape drop, deduplicated
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import shutil
+import tempfile
 import pandas as pd
 import re
 
+import run_report
+from run_report import stage
+from storage import (
+    DEFAULT_FORMAT,
+    FORMATS,
+    apply_dtypes,
+    csv_to_parquet,
+    facts_dtypes,
+    file_sha256,
+    load_schema,
+    print_memory_report,
+    remove_stale,
+    resolve_format,
+    write_table,
+)
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 RAW_DIR = REPO_ROOT / "Input" / "Raw CSVs"
-SCHEMA_PATH = REPO_ROOT / "schema" / "pets4homes_master_schema.csv"
 OUTPUT_PATH = REPO_ROOT / "output" / "facts" / "facts.csv"
 
 # Ensure output directory exists
@@ -104,11 +135,83 @@ def combine_gender_counts(males_val, females_val):
     except (ValueError, TypeError):
         return None
 
-def load_schema() -> list[str]:
-    """Load schema field names from master schema CSV."""
-    df = pd.read_csv(SCHEMA_PATH)
-    fields = df['field_name'].str.strip().tolist()
-    return fields
+# Vectorized (column-at-a-time) equivalents of the parsers above.
+# Same results; one regex pass per column instead of several per row.
+
+NUMBER_WORDS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+    "seven": "7", "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+}
+NUMBER_WORD_RE = re.compile(r"\b(" + "|".join(NUMBER_WORDS) + r")\b")
+
+# The four parse_title_for_puppies patterns as one anchored alternation of
+# lookaheads: alternatives are tried in priority order and each one searches
+# the whole text, exactly like the sequential re.search calls.
+PUPPY_COUNT_RE = re.compile(
+    r"\A(?:"
+    r"(?=.*?(?P<puppies>\d+)\s*(?:puppies?|pups?)\b)"
+    r"|(?=.*?litter\s+(?:of|with)?\s*(?P<litter>\d+))"
+    r"|(?=.*?(?P<boys>\d+)\s*(?:boys?|males?)\s+(?:and\s+)?(?P<girls>\d+)\s*(?:girls?|females?))"
+    r"|(?=.*?(?P<male>\d+)\s*male[,\s]+(?P<female>\d+)\s*female)"
+    r")",
+    re.DOTALL,
+)
+PUPPY_COUNT_RULES = {
+    "puppies": ["puppies"],
+    "litter": ["litter"],
+    "boys_girls": ["boys", "girls"],
+    "male_female": ["male", "female"],
+}
+
+
+def extract_puppy_counts(series: pd.Series, clamp: int = 12) -> pd.DataFrame:
+    """
+    Vectorized parse_title_for_puppies over a whole text column.
+    
+    Args:
+        series: Title or description strings
+        clamp: Upper bound for counts (0/None disables)
+    
+    Returns:
+        DataFrame: 'count' (float, NaN if no match) and 'rule'
+        (which PUPPY_COUNT_RULES pattern matched, NA if none)
+    """
+    text = series.astype("string").str.strip().str.lower()
+    text = text.str.replace(NUMBER_WORD_RE, lambda m: NUMBER_WORDS[m.group(1)], regex=True)
+    groups = text.str.extract(PUPPY_COUNT_RE)
+    
+    count = pd.Series(float("nan"), index=series.index)
+    rule = pd.Series(pd.NA, index=series.index, dtype="string")
+    for name, cols in PUPPY_COUNT_RULES.items():
+        hit = groups[cols[0]].notna()
+        count[hit] = sum(pd.to_numeric(groups.loc[hit, col]) for col in cols)
+        rule[hit] = name
+    if clamp:
+        count = count.clip(upper=clamp)
+    return pd.DataFrame({"count": count, "rule": rule})
+
+
+def litter_size_totals(series: pd.Series) -> pd.Series:
+    """Vectorized parse_kennel_club_litter_size; float, NaN when no total."""
+    text = series.astype("string").str.strip().str.lower()
+    bitches = pd.to_numeric(text.str.extract(r"(\d+)\s*bitch", expand=False)).fillna(0)
+    dogs = pd.to_numeric(text.str.extract(r"(\d+)\s*dog", expand=False)).fillna(0)
+    total = (bitches + dogs).astype(float)
+    return total.where(total > 0)
+
+
+def gender_count_totals(males: pd.Series, females: pd.Series) -> pd.Series:
+    """Vectorized combine_gender_counts; float, NaN when unparseable or zero."""
+    def as_int(col: pd.Series) -> tuple[pd.Series, pd.Series]:
+        text = col.astype("string").str.strip()
+        blank = text.isna() | (text == "")
+        valid = blank | text.str.fullmatch(r"[+-]?\d+").fillna(False)
+        return pd.to_numeric(text.where(~blank & valid), errors="coerce").fillna(0), valid
+    
+    m, m_valid = as_int(males)
+    f, f_valid = as_int(females)
+    total = (m + f).astype(float)
+    return total.where(m_valid & f_valid & (total > 0))
 
 
 # Platform-specific file patterns and column mappings
@@ -171,7 +274,7 @@ PLATFORM_CONFIG = {
             "health_checked": "health_checked",
             "neutered": "wormed",
             "deflead": "flea_treated",
-            "description": "title",  # Use as secondary title source
+            "description": "description",
             "total_available": "total_available",  # Filled by title/description parsing
         }
     },
@@ -182,6 +285,7 @@ PLATFORM_CONFIG = {
             "ad_id": "ad_id",
             "date_posted": "published_at",
             "title": "title",
+            "description": "description",
             "breed": "breed",
             "sex": "sex",
             "color": "color",
@@ -242,6 +346,7 @@ PLATFORM_CONFIG = {
             "url": "url",
             "breed": "breed",
             "puppy_name": "title",
+            "about": "description",
             "date_of_birth": "date_of_birth",
             "born": "ready_to_leave",
             "sex": "sex",
@@ -295,6 +400,7 @@ PLATFORM_CONFIG = {
             "location": "location",
             "seller_type": "user_type",
             "member_since": "member_since",
+            "posted_ago": "published_at",
             "males_available": "males_available",
             "females_available": "females_available",
             "views": "views_count",
@@ -311,6 +417,7 @@ PLATFORM_CONFIG = {
             "ad_reference": "ad_id",
             "posted_date": "published_at",
             "title": "title",
+            "description": "description",
             "breed": "breed",
             "ready_to_leave": "ready_to_leave",
             "date_of_birth": "date_of_birth",
@@ -336,6 +443,7 @@ PLATFORM_CONFIG = {
         "mapping": {
             "url": "url",
             "listing_id": "ad_id",
+            "description": "description",
             "date_available": "ready_to_leave",
             "date_born": "date_of_birth",
             "breed": "breed",
@@ -364,78 +472,172 @@ PLATFORM_CONFIG = {
 }
 
 
-def load_platform_data(platform: str, config: dict) -> pd.DataFrame:
-    """Load raw CSV for a platform and map columns to schema."""
+# Date stamp in a snapshot file name, e.g. gumtree_final_2026-01-22.csv
+SNAPSHOT_DATE_RE = re.compile(r"(20\d{2})-?(\d{2})-?(\d{2})")
+
+# Raw columns whose whole-file emptiness decides where a platform's
+# total_available comes from. Value: True if the column is numeric-coerced
+# before the check. Chunked loads pre-scan these so every chunk makes the
+# same choice a whole-file load would.
+SOURCE_PROBE_COLUMNS = {
+    "freeads": {"litter_size": True, "puppies_in_litter": True, "total_available": False},
+    "foreverpuppy": {"available": True, "litter_size": True, "total_available": False},
+    "gumtree": {"total_available": False},
+    "puppies": {"total_available": False},
+}
+
+
+def find_platform_file(platform: str, config: dict) -> Path | None:
+    """Return the raw CSV to load for a platform (most recent match), or None."""
     pattern = config["file_pattern"]
     files = list(RAW_DIR.glob(pattern))
     
     if not files:
         print(f"  WARNING: No files found for {platform} with pattern {pattern}")
-        return pd.DataFrame()
+        return None
     
     # Use most recent if multiple files
-    file_path = sorted(files)[-1]
-    print(f"  Loading: {file_path.name}")
+    return sorted(files)[-1]
+
+
+def find_platform_files(platform: str, config: dict) -> list[Path]:
+    """Return every raw CSV matching a platform's pattern, oldest snapshot first."""
+    pattern = config["file_pattern"]
+    files = sorted(RAW_DIR.glob(pattern), key=lambda path: (snapshot_time(path), path.name))
+    
+    if not files:
+        print(f"  WARNING: No files found for {platform} with pattern {pattern}")
+    return files
+
+
+def snapshot_time(file_path: Path) -> pd.Timestamp:
+    """
+    When a scrape drop was taken: a date in the file name (2026-01-22,
+    20260122) if there is one, else the file's modification time.
+    """
+    match = SNAPSHOT_DATE_RE.search(file_path.stem)
+    if match:
+        stamp = pd.to_datetime("-".join(match.groups()), format="%Y-%m-%d", errors="coerce", utc=True)
+        if pd.notna(stamp):
+            return stamp
+    return pd.Timestamp(file_path.stat().st_mtime, unit="s", tz="UTC").floor("s")
+
+
+def read_raw_csv(file_path: Path, **kwargs):
+    """Read a raw platform CSV as untouched strings (empty cells stay '')."""
+    return pd.read_csv(file_path, dtype=str, keep_default_na=False, **kwargs)
+
+
+def scan_blank_columns(file_path: Path, platform: str, chunksize: int) -> dict:
+    """
+    Check, over the whole file, which SOURCE_PROBE_COLUMNS are entirely empty.
+    
+    Reads only the probe columns, one chunk at a time.
+    
+    Returns:
+        dict: raw column -> True if every value is missing
+    """
+    probes = SOURCE_PROBE_COLUMNS.get(platform, {})
+    header = read_raw_csv(file_path, nrows=0).columns
+    present = [col for col in probes if col in header]
+    blank = {col: True for col in present}
+    if not present:
+        return blank
+    
+    for chunk in read_raw_csv(file_path, usecols=present, chunksize=chunksize):
+        for col in present:
+            values = pd.to_numeric(chunk[col], errors="coerce") if probes[col] else chunk[col]
+            blank[col] = blank[col] and bool(values.isna().all())
+    return blank
+
+
+def _column_is_blank(df: pd.DataFrame, col: str, blank_columns: dict | None) -> bool:
+    """True if col has no values - from the whole-file scan when one is given."""
+    if blank_columns is not None and col in blank_columns:
+        return blank_columns[col]
+    return bool(df[col].isna().all())
+
+
+def _parse_counts(series: pd.Series) -> pd.Series:
+    """Puppy counts parsed from a text column, always as float64."""
+    return extract_puppy_counts(series, clamp=12)["count"]
+
+
+def parse_platform_data(platform: str, df: pd.DataFrame, blank_columns: dict | None = None) -> pd.DataFrame:
+    """
+    Apply platform-specific parsing to raw rows (whole file or a chunk).
+    
+    Args:
+        platform: Platform name
+        df: Raw rows as read by read_raw_csv
+        blank_columns: Whole-file result of scan_blank_columns when df is a chunk
+    
+    Returns:
+        DataFrame: df with puppy-count columns filled in
+    """
+    def is_blank(col: str) -> bool:
+        return _column_is_blank(df, col, blank_columns)
     
-    df = pd.read_csv(file_path, dtype=str, keep_default_na=False, low_memory=False)
-    print(f"    Raw rows: {len(df)}")
-    # Apply platform-specific parsing
     if platform == "kennel_club" and "litter_size" in df.columns:
-        df["litter_size"] = df["litter_size"].apply(parse_kennel_club_litter_size)
+        df["litter_size"] = litter_size_totals(df["litter_size"])
 
     elif platform == "freeads":
         # Prefer numeric litter_size/puppies_in_litter, else parse text fields
         for src in ["litter_size", "puppies_in_litter"]:
             if src in df.columns:
-                df[src] = pd.to_numeric(df[src], errors="coerce")
+                df[src] = pd.to_numeric(df[src], errors="coerce").astype(float)
+        # source: raw column currently held in total_available
+        source = "total_available" if "total_available" in df.columns else None
         if "litter_size" in df.columns:
             df["total_available"] = df["litter_size"]
-        if "total_available" in df.columns and df["total_available"].isna().all():
+            source = "litter_size"
+        if source is not None and is_blank(source):
             if "puppies_in_litter" in df.columns:
                 df["total_available"] = df["puppies_in_litter"]
-        if "total_available" not in df.columns or df["total_available"].isna().all():
-            df["total_available"] = df["title"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
+                source = "puppies_in_litter"
+        if source is None or is_blank(source):
+            df["total_available"] = _parse_counts(df["title"])
             if "description" in df.columns:
                 mask_missing = df["total_available"].isna()
-                df.loc[mask_missing, "total_available"] = df.loc[mask_missing, "description"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
+                df.loc[mask_missing, "total_available"] = _parse_counts(df.loc[mask_missing, "description"])
 
     elif platform == "champdogs" and ("males_available" in df.columns and "females_available" in df.columns):
-        df["puppies_available"] = df.apply(
-            lambda row: combine_gender_counts(row.get("males_available"), row.get("females_available")),
-            axis=1,
-        )
+        df["puppies_available"] = gender_count_totals(df["males_available"], df["females_available"])
 
     elif platform == "foreverpuppy":
         # Prefer explicit available/litter_size fields, else fall back to parsing title
         for src in ["available", "litter_size"]:
             if src in df.columns:
-                df[src] = pd.to_numeric(df[src], errors="coerce")
+                df[src] = pd.to_numeric(df[src], errors="coerce").astype(float)
+        source = "total_available" if "total_available" in df.columns else None
         if "available" in df.columns:
             df["total_available"] = df["available"]
-        if ("total_available" not in df.columns or df["total_available"].isna().all()) and "litter_size" in df.columns:
+            source = "available"
+        if (source is None or is_blank(source)) and "litter_size" in df.columns:
             df["total_available"] = df["litter_size"]
-        if ("total_available" not in df.columns or df["total_available"].isna().all()) and "title" in df.columns:
-            df["total_available"] = df["title"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
+            source = "litter_size"
+        if (source is None or is_blank(source)) and "title" in df.columns:
+            df["total_available"] = _parse_counts(df["title"])
         if "total_available" in df.columns:
             df["available"] = df["total_available"]
 
     elif platform in ["gumtree", "preloved"] and "title" in df.columns:
         if platform == "gumtree" and "description" in df.columns:
-            df["_puppy_count"] = df["title"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
+            df["_puppy_count"] = _parse_counts(df["title"])
             mask_missing = df["_puppy_count"].isna()
-            df.loc[mask_missing, "_puppy_count"] = df.loc[mask_missing, "description"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
-            if "total_available" not in df.columns or df["total_available"].isna().all():
+            df.loc[mask_missing, "_puppy_count"] = _parse_counts(df.loc[mask_missing, "description"])
+            if "total_available" not in df.columns or is_blank("total_available"):
                 df["total_available"] = df["_puppy_count"]
             df.drop(columns=["_puppy_count"], inplace=True)
         else:
-            df["total_available"] = df["title"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
+            df["total_available"] = _parse_counts(df["title"])
 
     elif platform == "puppies" and "title" in df.columns:
-        df["_puppy_count"] = df["title"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
+        df["_puppy_count"] = _parse_counts(df["title"])
         if "description" in df.columns:
             mask_missing = df["_puppy_count"].isna()
-            df.loc[mask_missing, "_puppy_count"] = df.loc[mask_missing, "description"].apply(lambda x: parse_title_for_puppies(x, clamp=12))
-        if "total_available" not in df.columns or df["total_available"].isna().all():
+            df.loc[mask_missing, "_puppy_count"] = _parse_counts(df.loc[mask_missing, "description"])
+        if "total_available" not in df.columns or is_blank("total_available"):
             df["total_available"] = df["_puppy_count"]
         df.drop(columns=["_puppy_count"], inplace=True)
 
@@ -449,6 +651,102 @@ def load_platform_data(platform: str, config: dict) -> pd.DataFrame:
     return df
 
 
+def load_platform_data(platform: str, config: dict) -> pd.DataFrame:
+    """Load raw CSV for a platform and map columns to schema."""
+    file_path = find_platform_file(platform, config)
+    if file_path is None:
+        return pd.DataFrame()
+    print(f"  Loading: {file_path.name}")
+    
+    with stage("read_csv") as record:
+        df = read_raw_csv(file_path, low_memory=False)
+        record["rows_out"] = len(df)
+    print(f"    Raw rows: {len(df)}")
+    with stage("parse_platform_data", len(df)) as record:
+        df = parse_platform_data(platform, df)
+        record["rows_out"] = len(df)
+    return df
+
+
+def load_platform_snapshots(platform: str, config: dict, threads: int = 4) -> pd.DataFrame:
+    """
+    Multi-snapshot variant of load_platform_data: read every matching file
+    for a platform concurrently and tag each row with its snapshot.
+    
+    Each file is parsed on its own (it is a complete scrape drop). Rows are
+    returned newest snapshot first, with private _snapshot (file name) and
+    _snapshot_ts (snapshot time, ISO) columns for dedup_snapshots.
+    """
+    files = find_platform_files(platform, config)
+    if not files:
+        return pd.DataFrame()
+    
+    def load(file_path: Path) -> pd.DataFrame:
+        df = parse_platform_data(platform, read_raw_csv(file_path, low_memory=False))
+        df["_snapshot"] = file_path.name
+        df["_snapshot_ts"] = snapshot_time(file_path).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return df
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(threads, len(files)))) as pool:
+        frames = list(pool.map(load, files))
+    
+    for file_path, df in zip(files, frames):
+        print(f"  Loading: {file_path.name}")
+        print(f"    Raw rows: {len(df)}")
+    return pd.concat(frames[::-1], ignore_index=True)
+
+
+def dedup_snapshots(facts: pd.DataFrame, raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Collapse a listing seen in several snapshots to its newest row.
+    
+    Listings are keyed on url, else ad_id; rows with neither are kept as-is.
+    Adds SNAPSHOT_COLUMNS: the snapshot the row came from and the first and
+    last snapshot times the listing was seen in.
+    
+    Args:
+        facts: Schema-mapped rows, newest snapshot first
+        raw: The load_platform_snapshots frame facts was mapped from
+    """
+    facts = facts.copy()
+    key = facts["url"].fillna("ad_id:" + facts["ad_id"])
+    seen = raw["_snapshot_ts"]
+    facts["snapshot"] = raw["_snapshot"]
+    facts["first_seen"] = seen.groupby(key).transform("min").fillna(seen)
+    facts["last_seen"] = seen.groupby(key).transform("max").fillna(seen)
+    
+    duplicate = key.duplicated(keep="first") & key.notna()
+    return facts[~duplicate].reset_index(drop=True)
+
+
+def iter_platform_chunks(platform: str, config: dict, chunksize: int):
+    """
+    Chunked variant of load_platform_data: yield parsed chunks of at most
+    chunksize raw rows, so memory depends on chunksize rather than file size.
+    """
+    file_path = find_platform_file(platform, config)
+    if file_path is None:
+        return
+    print(f"  Loading: {file_path.name} (chunks of {chunksize:,})")
+    
+    with stage("scan_blank_columns"):
+        blank_columns = scan_blank_columns(file_path, platform, chunksize)
+    raw_rows = 0
+    chunks = read_raw_csv(file_path, chunksize=chunksize)
+    while True:
+        with stage("read_csv") as record:
+            chunk = next(chunks, None)
+            record["rows_out"] = 0 if chunk is None else len(chunk)
+        if chunk is None:
+            break
+        raw_rows += len(chunk)
+        with stage("parse_platform_data", len(chunk)) as record:
+            parsed = parse_platform_data(platform, chunk, blank_columns)
+            record["rows_out"] = len(parsed)
+        yield parsed
+    print(f"    Raw rows: {raw_rows}")
+
+
 
 def map_to_schema(df: pd.DataFrame, platform: str, mapping: dict, schema_fields: list[str]) -> pd.DataFrame:
     """Map raw DataFrame columns to schema columns."""
@@ -472,49 +770,433 @@ def map_to_schema(df: pd.DataFrame, platform: str, mapping: dict, schema_fields:
     return result
 
 
-def main():
-    print("=" * 60)
-    print("Pipeline Step 1: Build Facts Table")
-    print("=" * 60)
+# Added after the schema fields when every snapshot is ingested
+SNAPSHOT_COLUMNS = ["snapshot", "first_seen", "last_seen"]
+
+COVERAGE_FIELDS = ["url", "breed", "price", "ready_to_leave", "date_of_birth", "published_at"]
+
+
+def print_facts_report(total_rows: int, n_columns: int, platform_counts: pd.Series, coverage: dict, outputs: list[Path]):
+    """Print row totals, platform breakdown and key field coverage."""
+    print(f"Total rows: {total_rows}")
+    print(f"Columns: {n_columns}")
+    for path in outputs:
+        print(f"Output: {path}")
     
-    schema_fields = load_schema()
-    print(f"Schema fields: {len(schema_fields)}")
+    # Platform breakdown
+    print("\nPlatform breakdown:")
+    print(platform_counts.to_string())
     
-    all_facts = []
+    # Coverage stats for key fields
+    print("\nKey field coverage:")
+    for col, pct in coverage.items():
+        print(f"  {col}: {pct:.1f}%")
+
+
+def _run_captured(func, *args):
+    """Run func in a worker process, capturing its progress output and stage records."""
+    run_report.start("facts")
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        result = func(*args)
+    return result, buf.getvalue(), run_report.collect()
+
+
+def run_per_platform(func, workers: int, *args, platforms=None):
+    """
+    Call func(platform, *args) for every platform, in PLATFORM_CONFIG order.
     
-    for platform, config in PLATFORM_CONFIG.items():
-        print(f"\n[{platform}]")
+    With workers > 1 the calls run in a process pool. Results and each
+    platform's progress output are still yielded in PLATFORM_CONFIG order,
+    so the build stays deterministic; the workers' stages are merged into
+    this process's run report.
+    
+    Args:
+        platforms: Subset of platforms to run (default: all)
+    
+    Yields:
+        tuple: (platform, result)
+    """
+    platforms = list(PLATFORM_CONFIG) if platforms is None else list(platforms)
+    if workers <= 1:
+        for platform in platforms:
+            print(f"\n[{platform}]")
+            yield platform, func(platform, *args)
+        return
+    
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(platforms)))) as pool:
+        futures = [pool.submit(_run_captured, func, platform, *args) for platform in platforms]
+        for platform, future in zip(platforms, futures):
+            result, log, records = future.result()
+            run_report.merge(records)
+            print(f"\n[{platform}]")
+            print(log, end="")
+            yield platform, result
+
+
+def build_platform_facts(platform: str, schema_fields: list[str], all_snapshots: bool = False) -> pd.DataFrame | None:
+    """Load, parse and map one platform; None if it has no rows."""
+    config = PLATFORM_CONFIG[platform]
+    if all_snapshots:
+        with stage("load_platform_snapshots") as record:
+            df = load_platform_snapshots(platform, config)
+            record["rows_out"] = len(df)
+    else:
         df = load_platform_data(platform, config)
-        
-        if not df.empty:
-            facts = map_to_schema(df, platform, config["mapping"], schema_fields)
-            all_facts.append(facts)
-            print(f"    Mapped rows: {len(facts)}")
+    if df.empty:
+        return None
+    
+    with stage("map_to_schema", len(df)) as record:
+        facts = map_to_schema(df, platform, config["mapping"], schema_fields)
+        record["rows_out"] = len(facts)
+    print(f"    Mapped rows: {len(facts)}")
+    if all_snapshots:
+        with stage("dedup_snapshots", len(facts)) as record:
+            facts = dedup_snapshots(facts, df)
+            record["rows_out"] = len(facts)
+        print(f"    Unique listings: {len(facts)}")
+    return facts
+
+
+def build_facts(schema_fields: list[str], workers: int = 1, all_snapshots: bool = False) -> pd.DataFrame:
+    """Build every platform in memory; return the combined facts."""
+    with stage("build_platforms") as record:
+        all_facts = [
+            facts for _, facts in run_per_platform(build_platform_facts, workers, schema_fields, all_snapshots)
+            if facts is not None
+        ]
+        record["rows_out"] = sum(len(facts) for facts in all_facts)
     
     # Combine all platforms
+    with stage("concat", record["rows_out"]) as record:
+        combined = pd.concat(all_facts, ignore_index=True)
+        
+        # Ensure column order: platform first, then schema fields (then snapshot columns)
+        extra = SNAPSHOT_COLUMNS if all_snapshots else []
+        combined = combined[["platform"] + schema_fields + extra]
+        record["rows_out"] = len(combined)
+    return combined
+
+
+def stream_platform_facts(platform: str, schema_fields: list[str], chunksize: int, out_path: Path):
+    """
+    Append one platform's mapped facts to out_path, chunk by chunk.
+    
+    Returns:
+        tuple: (mapped_rows, non-null counts per COVERAGE_FIELDS)
+    """
+    config = PLATFORM_CONFIG[platform]
+    columns = ["platform"] + schema_fields
+    mapped_rows = 0
+    notna_counts = {col: 0 for col in COVERAGE_FIELDS if col in columns}
+    
+    for df in iter_platform_chunks(platform, config, chunksize):
+        with stage("map_to_schema", len(df)) as record:
+            facts = map_to_schema(df, platform, config["mapping"], schema_fields)[columns]
+            record["rows_out"] = len(facts)
+        with stage("to_csv", len(facts)) as record:
+            facts.to_csv(out_path, mode="a", header=False, index=False)
+            record["rows_out"] = len(facts)
+        mapped_rows += len(facts)
+        for col in notna_counts:
+            notna_counts[col] += int(facts[col].notna().sum())
+    if mapped_rows:
+        print(f"    Mapped rows: {mapped_rows}")
+    return mapped_rows, notna_counts
+
+
+def part_path(part_dir: Path, platform: str) -> Path:
+    """Headerless per-platform facts file inside part_dir."""
+    return part_dir / f"{platform}.csv"
+
+
+def write_platform_part(platform: str, schema_fields: list[str], chunksize: int | None, part_dir: Path):
+    """
+    Write one platform's mapped facts (no header) to part_path(part_dir, platform).
+    
+    Streams when chunksize is set, else loads the whole raw file.
+    
+    Returns:
+        tuple: (mapped_rows, non-null counts per COVERAGE_FIELDS)
+    """
+    part = part_path(part_dir, platform)
+    part.unlink(missing_ok=True)
+    part.touch()
+    if chunksize:
+        return stream_platform_facts(platform, schema_fields, chunksize, part)
+    
+    columns = ["platform"] + schema_fields
+    facts = build_platform_facts(platform, schema_fields)
+    if facts is None:
+        return 0, {col: 0 for col in COVERAGE_FIELDS if col in columns}
+    facts = facts[columns]
+    with stage("to_csv", len(facts)) as record:
+        facts.to_csv(part, header=False, index=False)
+        record["rows_out"] = len(facts)
+    return len(facts), {col: int(facts[col].notna().sum()) for col in COVERAGE_FIELDS if col in columns}
+
+
+def _append_file(out_path: Path, part: Path):
+    with open(out_path, "ab") as out, open(part, "rb") as src:
+        shutil.copyfileobj(src, out)
+
+
+def _tally(results) -> tuple[int, pd.Series, dict]:
+    """Sum (platform, (mapped_rows, notna_counts)) pairs into report totals."""
+    total_rows = 0
+    platform_counts = {}
+    notna_counts = {col: 0 for col in COVERAGE_FIELDS}
+    for platform, (mapped_rows, platform_notna) in results:
+        if mapped_rows:
+            platform_counts[platform] = mapped_rows
+            total_rows += mapped_rows
+            for col, n in platform_notna.items():
+                notna_counts[col] += n
+    
+    counts = pd.Series(platform_counts, name="count", dtype="int64").sort_values(ascending=False, kind="stable")
+    counts.index.name = "platform"
+    return total_rows, counts, notna_counts
+
+
+def write_facts_chunked(schema_fields: list[str], chunksize: int, workers: int = 1):
+    """
+    Stream every platform to OUTPUT_PATH chunk by chunk.
+    
+    Produces the same file as build_facts + to_csv while holding at most
+    one chunk of raw and mapped rows in memory per worker. With workers > 1,
+    each platform streams to its own part file and the parts are appended
+    to OUTPUT_PATH in PLATFORM_CONFIG order.
+    
+    Returns:
+        tuple: (total_rows, platform_counts, non-null counts per COVERAGE_FIELDS)
+    """
+    columns = ["platform"] + schema_fields
+    pd.DataFrame(columns=columns).to_csv(OUTPUT_PATH, index=False)
+    
+    if workers <= 1:
+        with stage("build_platforms") as record:
+            totals = _tally(run_per_platform(stream_platform_facts, workers, schema_fields, chunksize, OUTPUT_PATH))
+            record["rows_out"] = totals[0]
+        return totals
+    
+    with tempfile.TemporaryDirectory(dir=OUTPUT_PATH.parent) as part_dir:
+        part_dir = Path(part_dir)
+        with stage("build_platforms") as record:
+            results = list(run_per_platform(write_platform_part, workers, schema_fields, chunksize, part_dir))
+            record["rows_out"] = sum(rows for _, (rows, _notna) in results)
+        with stage("append_parts", record["rows_out"]) as record:
+            for platform, _ in results:
+                _append_file(OUTPUT_PATH, part_path(part_dir, platform))
+            record["rows_out"] = record["rows_in"]
+    return _tally(results)
+
+
+# Incremental builds: each platform's mapped facts are cached as a headerless
+# CSV part and only rebuilt when its raw file or mapping changes.
+CACHE_DIR = OUTPUT_PATH.parent / ".cache"
+MANIFEST_PATH = CACHE_DIR / "manifest.json"
+
+
+def config_sha256(platform: str, schema_fields: list[str]) -> str:
+    """
+    Hash of everything besides the raw file that shapes a platform's facts:
+    its PLATFORM_CONFIG entry, the schema fields and this module's code.
+    """
+    payload = json.dumps(
+        {
+            "config": PLATFORM_CONFIG[platform],
+            "schema": schema_fields,
+            "code": hashlib.sha256(Path(__file__).read_bytes()).hexdigest(),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def source_fingerprint(platform: str, previous: dict | None) -> dict | None:
+    """
+    Fingerprint the raw file a platform would load (path, size, mtime, sha256).
+    
+    The content hash is reused from the previous manifest entry when path,
+    size and mtime are unchanged, so untouched files are not re-read.
+    """
+    file_path = find_platform_file(platform, PLATFORM_CONFIG[platform])
+    if file_path is None:
+        return None
+    
+    stat = file_path.stat()
+    source = {
+        "path": str(file_path.relative_to(REPO_ROOT)),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+    if previous and all(previous.get(key) == value for key, value in source.items()):
+        source["sha256"] = previous["sha256"]
+    else:
+        source["sha256"] = file_sha256(file_path)
+    return source
+
+
+def _same_content(old: dict | None, new: dict | None) -> bool:
+    """Same raw file and bytes (a touched but unchanged file still matches)."""
+    if old is None or new is None:
+        return old is new
+    return old["path"] == new["path"] and old["sha256"] == new["sha256"]
+
+
+def _load_manifest() -> dict:
+    if not MANIFEST_PATH.exists():
+        return {"platforms": {}}
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def write_facts_incremental(schema_fields: list[str], chunksize: int | None = None, workers: int = 1):
+    """
+    Rebuild only platforms whose raw file or mapping changed, reuse the
+    cached parts for the rest, and assemble OUTPUT_PATH from the parts.
+    
+    Returns:
+        tuple: (total_rows, platform_counts, non-null counts per COVERAGE_FIELDS)
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    previous = _load_manifest()["platforms"]
+    
+    entries = {}
+    stale = []
+    for platform in PLATFORM_CONFIG:
+        old = previous.get(platform, {})
+        entry = {
+            "source": source_fingerprint(platform, old.get("source")),
+            "config_sha256": config_sha256(platform, schema_fields),
+        }
+        fresh = (
+            _same_content(old.get("source"), entry["source"])
+            and old.get("config_sha256") == entry["config_sha256"]
+            and part_path(CACHE_DIR, platform).exists()
+        )
+        if fresh:
+            entry["rows"], entry["notna"] = old["rows"], old["notna"]
+        else:
+            stale.append(platform)
+        entries[platform] = entry
+    
+    reused = [platform for platform in PLATFORM_CONFIG if platform not in stale]
+    print(f"Incremental: rebuilding {len(stale)} platform(s), reusing {len(reused)} cached")
+    if reused:
+        print(f"  Cached: {', '.join(reused)}")
+    
+    with stage("build_platforms") as record:
+        for platform, (rows, notna) in run_per_platform(
+            write_platform_part, workers, schema_fields, chunksize, CACHE_DIR, platforms=stale,
+        ):
+            entries[platform]["rows"], entries[platform]["notna"] = rows, notna
+        record["rows_out"] = sum(entries[platform]["rows"] for platform in stale)
+    
+    columns = ["platform"] + schema_fields
+    with stage("append_parts") as record:
+        pd.DataFrame(columns=columns).to_csv(OUTPUT_PATH, index=False)
+        for platform in PLATFORM_CONFIG:
+            _append_file(OUTPUT_PATH, part_path(CACHE_DIR, platform))
+        record["rows_out"] = sum(entry["rows"] for entry in entries.values())
+    
+    MANIFEST_PATH.write_text(json.dumps({"platforms": entries}, indent=2))
+    return _tally((platform, (entry["rows"], entry["notna"])) for platform, entry in entries.items())
+
+
+def build_facts_table(schema_fields: list[str], workers: int = 1, all_snapshots: bool = False,
+                      memory_report: bool = False) -> pd.DataFrame:
+    """
+    Whole-file build held in the memory-optimized dtype plan (categoricals,
+    Arrow strings). This is the frame write_facts writes and that
+    run_pipeline.py hands to step 2 in memory.
+    """
+    raw = build_facts(schema_fields, workers, all_snapshots)
+    with stage("apply_dtypes", len(raw)) as record:
+        combined = apply_dtypes(raw, facts_dtypes(list(raw.columns[1:])))
+        record["rows_out"] = len(combined)
+    if memory_report:
+        print_memory_report(raw, combined)
+    return combined
+
+
+def write_facts(combined: pd.DataFrame, fmt: str = DEFAULT_FORMAT) -> list[Path]:
+    """Write facts from build_facts_table and print the run report."""
     print("\n" + "=" * 60)
-    combined = pd.concat(all_facts, ignore_index=True)
+    with stage("write", len(combined)) as record:
+        outputs = write_table(combined, OUTPUT_PATH, fmt, facts_dtypes(list(combined.columns[1:])))
+        record["rows_out"] = len(combined)
     
-    # Ensure column order: platform first, then schema fields
-    combined = combined[["platform"] + schema_fields]
+    coverage = {col: combined[col].notna().mean() * 100 for col in COVERAGE_FIELDS if col in combined.columns}
+    print_facts_report(len(combined), len(combined.columns), combined["platform"].value_counts(), coverage, outputs)
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the facts table from raw platform CSVs.")
+    parser.add_argument(
+        "--chunksize", type=int, default=None,
+        help="Stream each raw CSV in chunks of this many rows (bounded memory, identical output)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Build platforms in parallel across this many processes (output order unchanged)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only rebuild platforms whose raw file or mapping changed since the last run",
+    )
+    parser.add_argument(
+        "--all-snapshots", action="store_true",
+        help="Ingest every matching raw file per platform (not just the newest), "
+             "deduplicated on url/ad_id with first_seen/last_seen",
+    )
+    parser.add_argument(
+        "--format", choices=FORMATS, default=DEFAULT_FORMAT,
+        help="Output format: typed Parquet, CSV, or both (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--memory-report", action="store_true",
+        help="Print per-column memory before/after the dtype plan (whole-file mode)",
+    )
+    args = parser.parse_args(argv)
+    if args.all_snapshots and (args.incremental or args.chunksize):
+        parser.error("--all-snapshots builds in memory; it cannot be combined with --chunksize or --incremental")
     
-    # Write output
-    combined.to_csv(OUTPUT_PATH, index=False)
+    print("=" * 60)
+    print("Pipeline Step 1: Build Facts Table")
+    print("=" * 60)
     
-    print(f"Total rows: {len(combined)}")
-    print(f"Columns: {len(combined.columns)}")
-    print(f"Output: {OUTPUT_PATH}")
+    run_report.start("facts")
+    schema_fields = load_schema()
+    print(f"Schema fields: {len(schema_fields)}")
     
-    # Platform breakdown
-    print("\nPlatform breakdown:")
-    print(combined["platform"].value_counts().to_string())
+    if args.incremental or args.chunksize:
+        if args.incremental:
+            totals = write_facts_incremental(schema_fields, args.chunksize, args.workers)
+        else:
+            totals = write_facts_chunked(schema_fields, args.chunksize, args.workers)
+        total_rows, platform_counts, notna_counts = totals
+        print("\n" + "=" * 60)
+        
+        # Streamed modes write CSV; convert it chunk by chunk if Parquet was requested
+        fmt = resolve_format(args.format)
+        outputs = [OUTPUT_PATH]
+        if fmt != "csv":
+            with stage("csv_to_parquet", total_rows) as record:
+                outputs.append(csv_to_parquet(OUTPUT_PATH, facts_dtypes(schema_fields), args.chunksize or 100_000))
+                record["rows_out"] = total_rows
+        if fmt == "parquet":
+            outputs.remove(OUTPUT_PATH)
+        remove_stale(OUTPUT_PATH, fmt)
+        
+        coverage = {col: (n / total_rows * 100 if total_rows else float("nan")) for col, n in notna_counts.items()}
+        print_facts_report(total_rows, len(schema_fields) + 1, platform_counts, coverage, outputs)
+        run_report.finish(run_report.report_path(OUTPUT_PATH))
+        return
     
-    # Coverage stats for key fields
-    print("\nKey field coverage:")
-    for col in ["url", "breed", "price", "ready_to_leave", "date_of_birth", "published_at"]:
-        if col in combined.columns:
-            coverage = combined[col].notna().mean() * 100
-            print(f"  {col}: {coverage:.1f}%")
+    combined = build_facts_table(schema_fields, args.workers, args.all_snapshots, args.memory_report)
+    write_facts(combined, args.format)
+    run_report.finish(run_report.report_path(OUTPUT_PATH))
 
 
 if __name__ == "__main__":
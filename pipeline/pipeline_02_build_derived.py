@@ -9,20 +9,57 @@ This is where ALL derivations live:
 - Numeric parsing (*_num columns)
 - asof_ts anchor
 - age_days calculation
-- ready_to_leave parsing (platform-specific)
+- ready_to_leave parsing (platform-specific rules, READY_TO_LEAVE_RULES)
 - is_ready_now / is_waiting_list flags
 
-Output: output/views/derived.csv (single authoritative file)
+Each stage function returns a new frame by default; build_derived runs them
+with copy=False so they all add columns to one working frame.
+
+Every row is derived from that row alone, so with --workers N the facts are
+split by platform (large platforms further by hash of url) and the stages run
+on each partition in a process pool; results are put back in facts order.
+For the same reason --incremental only derives rows that are new or changed
+since the last run and reuses the rest (see build_derived_incremental).
+
+Output: output/views/derived.csv and/or derived.parquet (see storage.py)
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import argparse
+import contextlib
+import hashlib
+import io
+import json
 import re
+import warnings
+import numpy as np
 import pandas as pd
 from datetime import datetime, timezone
+from dateutil import parser as dateutil_parser
+
+import run_report
+import storage
+from run_report import stage
+from storage import (
+    ASOF_COLUMNS,
+    DEFAULT_FORMAT,
+    FORMATS,
+    apply_dtypes,
+    as_text,
+    derived_dtypes,
+    parquet_path,
+    print_memory_report,
+    read_table,
+    write_table,
+)
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 FACTS_PATH = REPO_ROOT / "output" / "facts" / "facts.csv"
 OUTPUT_PATH = REPO_ROOT / "output" / "views" / "derived.csv"
+CACHE_DIR = OUTPUT_PATH.parent / ".cache"
+ROW_CACHE_PATH = CACHE_DIR / "derived_rows.pkl"
+ROW_MANIFEST_PATH = CACHE_DIR / "derived_manifest.json"
 
 # Ensure output directory exists
 OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -32,102 +69,230 @@ NOW_RE = re.compile(r"^\s*now\s*$", re.IGNORECASE)
 WEEKS_RE = re.compile(r"(?:in\s*)?(\d+)\s*week[s]?\b", re.IGNORECASE)
 ORDINAL_RE = re.compile(r"\b(\d+)(st|nd|rd|th)\b", re.IGNORECASE)
 MONTH_NAMES = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+# Relative dates, as (unit, pattern) in priority order: the first rule found
+# anywhere in the string wins. The first three are the original freeads rules.
+RELATIVE_DATE_RULES = [
+    ("days", r"(\d+)\s*day[s]?\s*ago"),
+    ("weeks", r"(\d+)\s*week[s]?\s*ago"),
+    ("months", r"(\d+)\s*month[s]?\s*ago"),
+    ("years", r"(\d+)\s*(?:year|yr)[s]?\s*ago"),
+    ("hours", r"\b(\d+|an?|one)\s*(?:hour|hr)[s]?\s*ago"),
+    ("minutes", r"\b(\d+|an?|one)\s*min(?:ute)?[s]?\s*ago"),
+    ("days", r"\b(an?|one)\s*day\s*ago"),
+    ("weeks", r"\b(an?|one)\s*week\s*ago"),
+    ("months", r"\b(an?|one)\s*month\s*ago"),
+    ("years", r"\b(an?|one)\s*year\s*ago"),
+    ("days", r"\b(yesterday)\b"),
+    ("days", r"\b(today|just now)\b"),
+]
+RELATIVE_DATE_RE = re.compile("|".join(f"^(?=.*?{pattern})" for _, pattern in RELATIVE_DATE_RULES), re.DOTALL)
+RELATIVE_WORD_AMOUNTS = {"a": "1", "an": "1", "one": "1", "yesterday": "1", "today": "0", "just now": "0"}
+UNIT_SECONDS = {
+    "minutes": 60, "hours": 3600, "days": 86400, "weeks": 7 * 86400,
+    "months": 30 * 86400, "years": 365 * 86400,
+}
+# Listing/activity dates that platforms often give relative to the scrape
+RELATIVE_DT_FIELDS = ["created_at", "published_at", "refreshed_at", "last_active"]
+
+# Full-date shapes to_datetime_safe parses vectorized (after stripping
+# ordinals) when the column's inferred format misses them. Only complete
+# dates: dateutil fills a missing day or year from today, these would not.
+FALLBACK_DATE_FORMATS = ["%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y", "%Y-%m-%d", "%d %B, %Y", "%B %d, %Y"]
+MONTH_NUMBERS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
 DATE_RE = re.compile(rf"(\d{{1,2}})\s*(?:st|nd|rd|th)?\s*(?:of\s*)?({MONTH_NAMES})", re.IGNORECASE)
-
-
-def parse_relative_date(text: str, anchor: pd.Timestamp) -> pd.Timestamp | None:
+BLANK_RE = re.compile(r"^\s*$")
+
+OTHER_PLATFORMS = ["preloved", "kennel_club", "foreverpuppy", "petify", "puppies", "champdogs"]
+# ready_to_leave rules in priority order. Each row takes the first rule whose
+# platforms include it, whose pattern (if any) is found in its ready_to_leave
+# text and whose required column (if any) is set. The rule's anchor ("published"
+# is published_at_ts, else asof_ts; otherwise a column) plus its offset gives
+# ready_to_leave_parsed_ts, and mode gives ready_to_leave_parse_mode. Rows no
+# rule takes stay NaT / "unknown". Offsets:
+# - "weeks": the number the pattern captured, in weeks
+# - "8_weeks": typical weaning age, for estimates from date_of_birth
+# - "day_month": "7th February" in the anchor's year; a year later if that is
+#   over 180 days before the anchor, "date_suspicious" if over 180 days after
+READY_TO_LEAVE_RULES = [
+    {"name": "pets4homes_date", "platforms": ["pets4homes"], "requires": "ready_to_leave_ts",
+     "anchor": "ready_to_leave_ts", "mode": "date"},
+    {"name": "now", "platforms": ["gumtree", "freeads"], "pattern": NOW_RE,
+     "anchor": "published", "mode": "now"},
+    {"name": "in_weeks", "platforms": ["gumtree", "freeads"], "pattern": WEEKS_RE,
+     "anchor": "published", "offset": "weeks", "mode": "in_weeks"},
+    {"name": "day_month", "platforms": ["freeads"], "pattern": DATE_RE,
+     "anchor": "published", "offset": "day_month", "mode": "date_anchored"},
+    {"name": "blank_dob", "platforms": OTHER_PLATFORMS, "pattern": BLANK_RE, "requires": "date_of_birth_ts",
+     "anchor": "date_of_birth_ts", "offset": "8_weeks", "mode": "dob_plus_8wks"},
+    {"name": "blank", "platforms": OTHER_PLATFORMS, "pattern": BLANK_RE, "mode": "missing"},
+    {"name": "other_now", "platforms": OTHER_PLATFORMS, "pattern": NOW_RE,
+     "anchor": "asof_ts", "mode": "now"},
+    {"name": "other_date", "platforms": OTHER_PLATFORMS, "requires": "ready_to_leave_ts",
+     "anchor": "ready_to_leave_ts", "mode": "date"},
+    {"name": "other_dob", "platforms": OTHER_PLATFORMS, "requires": "date_of_birth_ts",
+     "anchor": "date_of_birth_ts", "offset": "8_weeks", "mode": "dob_plus_8wks"},
+]
+
+# Facts columns parsed by add_typed_columns
+DT_FIELDS = [
+    "created_at", "published_at", "refreshed_at",
+    "date_of_birth", "ready_to_leave",
+    "member_since", "last_active", "license_valid",
+]
+NUM_FIELDS = [
+    "price", "males_available", "females_available", "total_available",
+    "response_hours", "reviews", "rating", "views_count",
+    "active_listings", "active_pets",
+]
+# Distinct values of each DT_FIELDS column that partitions parse ahead of
+# their own (see to_datetime_safe), enough to get past "", "now", ...
+LEADING_VALUES = 10
+# Incremental builds derive new rows a second time this much later, to find
+# the values computed from asof_ts (see probe_derive)
+ASOF_PROBE = pd.Timedelta(days=400)
+# Facts columns read by the stages below; everything else passes through
+# untouched and is held in its compact dtype from load time
+PARSED_FIELDS = ["platform"] + DT_FIELDS + NUM_FIELDS
+
+
+def parse_relative_dates(text: pd.Series, anchor) -> pd.Series:
     """
-    Parse relative date strings like '6 days ago', '2 weeks ago'.
-    Returns absolute timestamp anchored to given anchor date.
-    """
-    if pd.isna(text) or not text:
-        return None
-    
-    text = str(text).lower().strip()
-    
-    # Days ago
-    m = re.search(r"(\d+)\s*day[s]?\s*ago", text)
-    if m:
-        days = int(m.group(1))
-        return anchor - pd.Timedelta(days=days)
-    
-    # Weeks ago
-    m = re.search(r"(\d+)\s*week[s]?\s*ago", text)
-    if m:
-        weeks = int(m.group(1))
-        return anchor - pd.Timedelta(weeks=weeks)
+    Vectorized relative-date parser for any platform: '6 days ago',
+    '2 weeks ago', '3 months ago', '21 hours ago', 'an hour ago',
+    'yesterday', 'today', ...
     
-    # Months ago
-    m = re.search(r"(\d+)\s*month[s]?\s*ago", text)
-    if m:
-        months = int(m.group(1))
-        return anchor - pd.Timedelta(days=months * 30)
+    Args:
+        text: Strings to parse (case-insensitive, matched anywhere)
+        anchor: Timestamp or per-row Series the strings are relative to
     
-    return None
+    Returns:
+        Series: anchor minus the parsed offset (datetime64[ns, UTC]); NaT
+        where no RELATIVE_DATE_RULES rule matches
+    """
+    lowered = text.astype("string").str.lower().str.strip()
+    groups = lowered.str.extract(RELATIVE_DATE_RE)
+    # At most one group matches per row: the first rule in priority order
+    matched = groups.notna()
+    rule = matched.to_numpy().argmax(axis=1)
+    amount = groups.bfill(axis=1).iloc[:, 0].replace(RELATIVE_WORD_AMOUNTS)
+    seconds = pd.to_numeric(amount, errors="coerce") * pd.Series(
+        [UNIT_SECONDS[RELATIVE_DATE_RULES[i][0]] for i in rule], index=text.index
+    )
+    offset = pd.to_timedelta(seconds.where(matched.any(axis=1)), unit="s")
+    if not isinstance(anchor, pd.Series):
+        anchor = pd.Series(anchor, index=text.index)
+    return (pd.to_datetime(anchor, utc=True) - offset).astype("datetime64[ns, UTC]")
+
+
+def _parse_date_fallback(value) -> pd.Timestamp:
+    """dateutil parse of one value the vectorized passes missed; NaT if it fails."""
+    try:
+        # dateutil handles most formats including "18th December 2025"
+        return pd.Timestamp(dateutil_parser.parse(str(value)), tz="UTC")
+    except (ValueError, OverflowError):
+        return pd.NaT
 
 
-def to_datetime_safe(series: pd.Series) -> pd.Series:
+def to_datetime_safe(series: pd.Series, leading=(), now=None) -> pd.Series:
     """
     Parse datetime with coercion, UTC-aware.
-    Handles multiple formats by falling back to individual parsing.
-    """
-    # First try standard parsing
-    result = pd.to_datetime(series, errors="coerce", utc=True)
     
-    # For any that failed, try individual parsing (handles UK date formats)
-    failed_mask = result.isna() & series.notna() & (series != "")
-    if failed_mask.any():
-        for idx in series.index[failed_mask]:
-            val = series.loc[idx]
-            try:
-                # dateutil handles most formats including "18th December 2025"
-                from dateutil import parser as dateutil_parser
-                parsed = dateutil_parser.parse(str(val))
-                result.loc[idx] = pd.Timestamp(parsed, tz="UTC")
-            except:
-                pass
+    Each distinct string is parsed once and mapped back over the column:
+    1. pd.to_datetime on the distinct values (format inferred from the first
+       one, exactly as for the whole column)
+    2. values still unparsed that are a full date in a FALLBACK_DATE_FORMATS
+       shape (ordinal suffixes stripped), parsed vectorized per format
+    3. dateutil, only for what is left
+    
+    Args:
+        leading: Values parsed ahead of the column's own. When series is
+            part of a larger column, pass that column's first distinct
+            values so the inferred format is the same as for the whole.
+        now: Timestamp for "now" and "today", which pd.to_datetime reads as
+            the wall clock (default: leave them so)
+    """
+    codes, uniques = pd.factorize(series)
+    values = pd.Series(list(leading) + list(uniques), dtype=object)
+    with warnings.catch_warnings():
+        # Mixed-format columns fall back to per-value dateutil parsing on
+        # purpose (pass 1 above); pandas warns about it for every column and
+        # partition, flooding the step's log
+        warnings.filterwarnings("ignore", message="Could not infer format", category=UserWarning)
+        parsed = pd.to_datetime(values, errors="coerce", utc=True)
+    if now is not None:
+        parsed[values.isin(["now", "today"])] = pd.Timestamp(now)
+    
+    pending = parsed.isna() & (values != "")
+    if pending.any():
+        cleaned = values[pending].astype(str).str.replace(ORDINAL_RE, r"\1", regex=True).str.strip()
+        for fmt in FALLBACK_DATE_FORMATS:
+            hits = pd.to_datetime(cleaned, format=fmt, errors="coerce", utc=True).dropna()
+            parsed.loc[hits.index] = hits
+            cleaned = cleaned.drop(hits.index)
+            if cleaned.empty:
+                break
+        for idx in cleaned.index:
+            parsed.loc[idx] = _parse_date_fallback(values.loc[idx])
+    
+    # factorize codes missing values as -1, which take() fills with NaT
+    codes = np.where(codes >= 0, codes + len(leading), -1)
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=series.index, name=series.name)
+
+
+def add_typed_columns(df: pd.DataFrame, copy: bool = True, asof: datetime | None = None,
+                      leading: dict | None = None) -> pd.DataFrame:
+    """
+    Add parsed timestamp and numeric columns (to df itself if copy=False).
     
-    return result
-
-
-def add_typed_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Add parsed timestamp and numeric columns."""
-    out = df.copy()
+    asof is the run timestamp stored as asof_ts (default: now). leading maps
+    DT_FIELDS columns to to_datetime_safe leading values, for partitions.
+    """
+    leading = leading or {}
+    out = df.copy() if copy else df
     
     # Pipeline run timestamp (UTC) — stable anchor for relative strings
-    out["asof_ts"] = datetime.now(timezone.utc)
+    asof = asof or datetime.now(timezone.utc)
+    out["asof_ts"] = asof
     
     # Datetime columns (mechanical parsing)
-    dt_fields = [
-        "created_at", "published_at", "refreshed_at",
-        "date_of_birth", "ready_to_leave",
-        "member_since", "last_active", "license_valid",
-    ]
-    for col in dt_fields:
-        if col in out.columns:
-            out[f"{col}_ts"] = to_datetime_safe(out[col])
+    with stage("to_datetime_safe", len(out)) as record:
+        for col in DT_FIELDS:
+            if col in out.columns:
+                out[f"{col}_ts"] = to_datetime_safe(out[col], leading.get(col, ()), now=asof)
+        record["rows_out"] = len(out)
+    
+    # Relative listing dates ("6 days ago", "yesterday"), anchored to asof_ts
+    with stage("parse_relative_dates") as record:
+        record["rows_in"] = 0
+        for col in RELATIVE_DT_FIELDS:
+            if col in out.columns:
+                todo = out[f"{col}_ts"].isna() & out[col].notna()
+                if todo.any():
+                    out.loc[todo, f"{col}_ts"] = parse_relative_dates(out.loc[todo, col], out.loc[todo, "asof_ts"])
+                record["rows_in"] += int(todo.sum())
+        record["rows_out"] = record["rows_in"]
     
     # Numeric columns (mechanical parsing)
-    num_fields = [
-        "price", "males_available", "females_available", "total_available",
-        "response_hours", "reviews", "rating", "views_count",
-        "active_listings", "active_pets",
-    ]
-    for col in num_fields:
-        if col in out.columns:
-            # Strip currency symbols and commas for price
-            if col == "price":
-                cleaned = out[col].astype(str).str.replace(r"[£$,]", "", regex=True)
-                out[f"{col}_num"] = pd.to_numeric(cleaned, errors="coerce")
-            else:
-                out[f"{col}_num"] = pd.to_numeric(out[col], errors="coerce")
+    with stage("to_numeric", len(out)) as record:
+        for col in NUM_FIELDS:
+            if col in out.columns:
+                # Strip currency symbols and commas for price
+                if col == "price":
+                    cleaned = out[col].astype(str).str.replace(r"[£$,]", "", regex=True)
+                    out[f"{col}_num"] = pd.to_numeric(cleaned, errors="coerce")
+                else:
+                    out[f"{col}_num"] = pd.to_numeric(out[col], errors="coerce")
+        record["rows_out"] = len(out)
     
     return out
 
 
-def add_age_days(df: pd.DataFrame) -> pd.DataFrame:
-    """Calculate age in days from date_of_birth and asof_ts."""
-    out = df.copy()
+def add_age_days(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+    """Calculate age in days from date_of_birth and asof_ts (in df itself if copy=False)."""
+    out = df.copy() if copy else df
     
     if "date_of_birth_ts" in out.columns:
         out["age_days"] = (out["asof_ts"] - out["date_of_birth_ts"]).dt.days
@@ -137,225 +302,128 @@ def add_age_days(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def parse_ready_to_leave_pets4homes(df: pd.DataFrame) -> pd.DataFrame:
+def compile_rules(rules: list[dict]) -> tuple[re.Pattern, dict]:
     """
-    Pets4Homes: ready_to_leave is typically a proper date string.
-    High confidence - direct date parsing.
-    """
-    out = df.copy()
-    mask = out["platform"] == "pets4homes"
-    
-    if not mask.any():
-        return out
+    Combine the distinct patterns of rules into one regex.
     
-    # ready_to_leave_ts already parsed in add_typed_columns
-    # Calculate days until ready
-    out.loc[mask, "ready_to_leave_parsed_ts"] = out.loc[mask, "ready_to_leave_ts"]
-    out.loc[mask, "ready_to_leave_parse_mode"] = out.loc[mask, "ready_to_leave_ts"].apply(
-        lambda x: "date" if pd.notna(x) else "unknown"
-    )
+    Each pattern becomes an optional lookahead at the start of the text, so
+    a single search per row tells which of them occur anywhere in it, with
+    their own capture groups.
     
-    return out
-
-
-def parse_ready_to_leave_gumtree(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Gumtree: Strings like 'Now', 'in 2 weeks'.
-    High confidence for these patterns.
+    Returns:
+        tuple: (combined regex, {pattern: column of its match in
+        str.extract output; its own groups follow})
     """
-    out = df.copy()
-    mask = out["platform"] == "gumtree"
-    
-    if not mask.any():
-        return out
-    
-    g = out.loc[mask].copy()
-    rtl = g["ready_to_leave"].astype("string").fillna("")
-    
-    # Anchor: use published_at_ts if available, else asof_ts
-    anchor = g["published_at_ts"].where(g["published_at_ts"].notna(), g["asof_ts"])
-    
-    # Initialize columns with proper types
-    g["ready_to_leave_parsed_ts"] = pd.Series(pd.NaT, index=g.index, dtype="datetime64[ns, UTC]")
-    g["ready_to_leave_parse_mode"] = "unknown"
-    
-    # "Now" pattern
-    is_now = rtl.str.match(NOW_RE)
-    g.loc[is_now, "ready_to_leave_parsed_ts"] = anchor[is_now]
-    g.loc[is_now, "ready_to_leave_parse_mode"] = "now"
-    
-    # "in N weeks" pattern
-    extracted = rtl.str.extract(WEEKS_RE)
-    has_weeks = extracted[0].notna()
-    weeks = pd.to_numeric(extracted[0], errors="coerce")
-    days = weeks * 7
-    
-    g.loc[has_weeks, "ready_to_leave_parsed_ts"] = anchor[has_weeks] + pd.to_timedelta(days[has_weeks], unit="D")
-    g.loc[has_weeks, "ready_to_leave_parse_mode"] = "in_weeks"
-    
-    # Write back
-    out.loc[mask, "ready_to_leave_parsed_ts"] = g["ready_to_leave_parsed_ts"]
-    out.loc[mask, "ready_to_leave_parse_mode"] = g["ready_to_leave_parse_mode"]
-    
-    return out
+    columns = {}
+    parts = []
+    for rule in rules:
+        pattern = rule.get("pattern")
+        if pattern is None or pattern.pattern in columns:
+            continue
+        columns[pattern.pattern] = sum(1 + re.compile(p).groups for p in columns)
+        parts.append(f"(?=(?:.*?({pattern.pattern}))?)")
+    return re.compile("^" + "".join(parts), re.IGNORECASE | re.DOTALL), columns
 
 
-def parse_ready_to_leave_freeads(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Freeads: Mixed formats - 'Now', '8 weeks', '7th February'.
-    
-    For date strings like '7th February':
-    - Anchor to asof_ts year
-    - Choose nearest future date
-    - If >180 days ahead, treat as unknown
-    """
-    out = df.copy()
-    mask = out["platform"] == "freeads"
-    
-    if not mask.any():
-        return out
-    
-    f = out.loc[mask].copy()
-    rtl = f["ready_to_leave"].astype("string").fillna("").str.strip()
-    
-    # Anchor: use published_at_ts if available, else asof_ts
-    # Note: Freeads published_at may be relative text like "6 days ago"
-    # Try to parse it first
-    anchor = f["asof_ts"].copy()
-    for idx in f.index:
-        pub = f.loc[idx, "published_at"]
-        pub_ts = f.loc[idx, "published_at_ts"]
-        if pd.notna(pub_ts):
-            anchor.loc[idx] = pub_ts
-        elif pd.notna(pub):
-            # Try parsing relative date
-            parsed = parse_relative_date(pub, f.loc[idx, "asof_ts"])
-            if parsed:
-                anchor.loc[idx] = parsed
-    
-    # Initialize columns with proper types
-    f["ready_to_leave_parsed_ts"] = pd.Series(pd.NaT, index=f.index, dtype="datetime64[ns, UTC]")
-    f["ready_to_leave_parse_mode"] = "unknown"
-    
-    # "Now" pattern
-    is_now = rtl.str.match(NOW_RE)
-    f.loc[is_now, "ready_to_leave_parsed_ts"] = anchor[is_now]
-    f.loc[is_now, "ready_to_leave_parse_mode"] = "now"
-    
-    # "N weeks" pattern (with or without "in")
-    wk_extract = rtl.str.extract(WEEKS_RE)
-    has_weeks = wk_extract[0].notna() & ~is_now
-    weeks = pd.to_numeric(wk_extract[0], errors="coerce")
-    days = weeks * 7
-    
-    f.loc[has_weeks, "ready_to_leave_parsed_ts"] = anchor[has_weeks] + pd.to_timedelta(days[has_weeks], unit="D")
-    f.loc[has_weeks, "ready_to_leave_parse_mode"] = "in_weeks"
-    
-    # Date strings like "7th February", "22nd November"
-    # Normalize: remove ordinal suffixes, 'of' word
-    normalized = (rtl
-        .str.replace(ORDINAL_RE, r"\1", regex=True)
-        .str.replace(r"\bof\b", " ", regex=True)
-        .str.replace(r"\s+", " ", regex=True)
-        .str.strip())
-    
-    # Extract day and month
-    date_match = normalized.str.extract(DATE_RE)
-    has_date = date_match[0].notna() & ~is_now & ~has_weeks
-    
-    # Build full date string with anchor year
-    for idx in f.index[has_date]:
-        day = date_match.loc[idx, 0]
-        month = date_match.loc[idx, 1]
-        anchor_year = anchor.loc[idx].year
-        
-        # Try parsing with anchor year
-        date_str = f"{day} {month} {anchor_year}"
-        try:
-            parsed = pd.to_datetime(date_str, utc=True)
-            
-            # If parsed date is in the past by >180 days, bump to next year
-            delta = (parsed - anchor.loc[idx]).days
-            if delta < -180:
-                parsed = parsed + pd.DateOffset(years=1)
-            
-            # If >180 days in future, mark as unknown (suspicious)
-            delta_future = (parsed - anchor.loc[idx]).days
-            if delta_future > 180:
-                f.loc[idx, "ready_to_leave_parse_mode"] = "date_suspicious"
-            else:
-                f.loc[idx, "ready_to_leave_parsed_ts"] = parsed
-                f.loc[idx, "ready_to_leave_parse_mode"] = "date_anchored"
-        except:
-            pass
-    
-    # Write back
-    out.loc[mask, "ready_to_leave_parsed_ts"] = f["ready_to_leave_parsed_ts"]
-    out.loc[mask, "ready_to_leave_parse_mode"] = f["ready_to_leave_parse_mode"]
-    
-    return out
+READY_TO_LEAVE_MATCHER, READY_TO_LEAVE_COLUMNS = compile_rules(READY_TO_LEAVE_RULES)
 
 
-def parse_ready_to_leave_other(df: pd.DataFrame) -> pd.DataFrame:
+def anchor_day_month(day: pd.Series, month: pd.Series, anchor: pd.Series) -> tuple[pd.Series, pd.Series]:
     """
-    Other platforms: Try direct date parsing, else mark unknown.
-    
-    For platforms with date_of_birth but no ready_to_leave,
-    estimate ready_to_leave as date_of_birth + 8 weeks (typical weaning age).
+    Dates like '7th February' (day and month name captured separately),
+    placed relative to anchor: in the anchor's year, bumped a year if over
+    180 days before it.
+    
+    Returns:
+        tuple: (parsed ts, NaT unless date_anchored; parse mode:
+        "date_anchored", "date_suspicious" if over 180 days after the
+        anchor, "unknown" if not a valid date)
+    """
+    # Build the date from day, month and anchor year (invalid dates -> NaT)
+    parts = pd.DataFrame({
+        "year": anchor.dt.year,
+        "month": month.str.lower().str[:3].map(MONTH_NUMBERS),
+        "day": pd.to_numeric(day, errors="coerce"),
+    })
+    parsed = pd.to_datetime(parts, errors="coerce", utc=True)
+    
+    # If parsed date is in the past by >180 days, bump to next year
+    bump = ((parsed - anchor).dt.days < -180).to_numpy()
+    if bump.any():
+        parsed[bump] = parsed[bump] + pd.DateOffset(years=1)
+    
+    # If >180 days in future, mark as unknown (suspicious)
+    valid = parsed.notna()
+    suspicious = (parsed - anchor).dt.days > 180
+    mode = pd.Series("unknown", index=parsed.index, dtype=object)
+    mode[valid & suspicious] = "date_suspicious"
+    mode[valid & ~suspicious] = "date_anchored"
+    return parsed.where(valid & ~suspicious), mode
+
+
+def parse_ready_to_leave(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
-    out = df.copy()
-    other_platforms = ["preloved", "kennel_club", "foreverpuppy", "petify", "puppies", "champdogs"]
-    mask = out["platform"].isin(other_platforms)
+    Apply READY_TO_LEAVE_RULES to every row.
     
-    if not mask.any():
-        return out
+    The ready_to_leave text goes through READY_TO_LEAVE_MATCHER once, for
+    all platforms and patterns; each rule is then a boolean mask over that
+    result and the required columns. Rules are taken in priority order, each
+    only on rows no earlier rule took.
     
-    # For rows where ready_to_leave_parsed_ts isn't set yet
-    unset = mask & out["ready_to_leave_parsed_ts"].isna()
+    Adds ready_to_leave_parsed_ts, ready_to_leave_parse_mode and
+    ready_to_leave_rule (name of the rule that fired, missing if none; its
+    value counts are the per-rule hit counts).
+    """
+    out = df.copy() if copy else df
     
-    for idx in out.index[unset]:
-        rtl = out.loc[idx, "ready_to_leave"]
-        platform = out.loc[idx, "platform"]
-        
-        if pd.isna(rtl) or str(rtl).strip() == "":
-            # Check if we have date_of_birth as fallback
-            dob_ts = out.loc[idx, "date_of_birth_ts"]
-            if pd.notna(dob_ts):
-                # Estimate ready_to_leave as DOB + 8 weeks
-                estimated = dob_ts + pd.Timedelta(weeks=8)
-                out.loc[idx, "ready_to_leave_parsed_ts"] = estimated
-                out.loc[idx, "ready_to_leave_parse_mode"] = "dob_plus_8wks"
-            else:
-                out.loc[idx, "ready_to_leave_parse_mode"] = "missing"
+    text = out["ready_to_leave"].astype("string").fillna("")
+    found = text.str.extract(READY_TO_LEAVE_MATCHER)
+    # Anchor: use published_at_ts if available, else asof_ts
+    # (relative published_at like "6 days ago" is parsed in add_typed_columns)
+    published = out["published_at_ts"].where(out["published_at_ts"].notna(), out["asof_ts"])
+    
+    parsed_ts = pd.Series(pd.NaT, index=out.index, dtype="datetime64[ns, UTC]")
+    parse_mode = pd.Series("unknown", index=out.index, dtype=object)
+    rule_name = pd.Series(np.nan, index=out.index, dtype=object)
+    taken = np.zeros(len(out), dtype=bool)
+    
+    for rule in READY_TO_LEAVE_RULES:
+        hit = ~taken & out["platform"].isin(rule["platforms"]).to_numpy()
+        if "pattern" in rule:
+            match_col = READY_TO_LEAVE_COLUMNS[rule["pattern"].pattern]
+            hit &= found[match_col].notna().to_numpy()
+        if "requires" in rule:
+            hit &= out[rule["requires"]].notna().to_numpy()
+        if not hit.any():
             continue
-        
-        rtl_str = str(rtl).lower().strip()
-        
-        # Check for "now"
-        if NOW_RE.match(rtl_str):
-            out.loc[idx, "ready_to_leave_parsed_ts"] = out.loc[idx, "asof_ts"]
-            out.loc[idx, "ready_to_leave_parse_mode"] = "now"
+        taken |= hit
+        rows = out.index[hit]
+        rule_name[rows] = rule["name"]
+        parse_mode[rows] = rule["mode"]
+        if "anchor" not in rule:
             continue
         
-        # Try direct date parsing
-        ts = out.loc[idx, "ready_to_leave_ts"]
-        if pd.notna(ts):
-            out.loc[idx, "ready_to_leave_parsed_ts"] = ts
-            out.loc[idx, "ready_to_leave_parse_mode"] = "date"
+        anchor = (published if rule["anchor"] == "published" else out[rule["anchor"]])[rows]
+        offset = rule.get("offset")
+        if offset == "weeks":
+            days = pd.to_numeric(found.loc[rows, match_col + 1], errors="coerce") * 7
+            parsed_ts[rows] = anchor + pd.to_timedelta(days, unit="D")
+        elif offset == "8_weeks":
+            parsed_ts[rows] = anchor + pd.Timedelta(weeks=8)
+        elif offset == "day_month":
+            parsed, mode = anchor_day_month(found.loc[rows, match_col + 1], found.loc[rows, match_col + 2], anchor)
+            parsed_ts[rows] = parsed
+            parse_mode[rows] = mode
         else:
-            # Fallback to DOB + 8 weeks if available
-            dob_ts = out.loc[idx, "date_of_birth_ts"]
-            if pd.notna(dob_ts):
-                estimated = dob_ts + pd.Timedelta(weeks=8)
-                out.loc[idx, "ready_to_leave_parsed_ts"] = estimated
-                out.loc[idx, "ready_to_leave_parse_mode"] = "dob_plus_8wks"
-            else:
-                out.loc[idx, "ready_to_leave_parse_mode"] = "unknown"
+            parsed_ts[rows] = anchor
     
+    out["ready_to_leave_parsed_ts"] = parsed_ts
+    out["ready_to_leave_parse_mode"] = parse_mode
+    out["ready_to_leave_rule"] = rule_name
     return out
 
 
-def validate_puppy_counts(df: pd.DataFrame) -> pd.DataFrame:
+def validate_puppy_counts(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Validate total_available_num to catch parsing errors.
     
@@ -367,7 +435,7 @@ def validate_puppy_counts(df: pd.DataFrame) -> pd.DataFrame:
     Action: Flag suspicious values with new column 'total_available_flag'
     and set total_available_num to NULL for investigation.
     """
-    out = df.copy()
+    out = df.copy() if copy else df
     
     if "total_available_num" not in out.columns:
         return out
@@ -403,7 +471,7 @@ def validate_puppy_counts(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def add_availability_flags(df: pd.DataFrame) -> pd.DataFrame:
+def add_availability_flags(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Add final availability flags based on parsed ready_to_leave.
     
@@ -412,7 +480,7 @@ def add_availability_flags(df: pd.DataFrame) -> pd.DataFrame:
     - is_waiting_list: days_until_ready > 0
     - availability_known: ready_to_leave_parse_mode not in ['unknown', 'missing', 'date_suspicious']
     """
-    out = df.copy()
+    out = df.copy() if copy else df
     
     # Ensure datetime columns are proper datetime types
     out["ready_to_leave_parsed_ts"] = pd.to_datetime(out["ready_to_leave_parsed_ts"], errors="coerce", utc=True)
@@ -429,50 +497,300 @@ def add_availability_flags(df: pd.DataFrame) -> pd.DataFrame:
     return out
 
 
-def main():
-    print("=" * 60)
-    print("Pipeline Step 2: Build Derived Views")
-    print("=" * 60)
-    
-    if not FACTS_PATH.exists():
+def load_facts() -> pd.DataFrame:
+    """Read facts as plain strings (NaN for missing), the form build_derived expects."""
+    if not FACTS_PATH.exists() and not parquet_path(FACTS_PATH).exists():
         raise FileNotFoundError(f"Facts file not found: {FACTS_PATH}\nRun pipeline_01_build_facts.py first.")
     
-    df = pd.read_csv(FACTS_PATH, dtype=str, keep_default_na=True, low_memory=False)
+    df = read_table(FACTS_PATH, dtype=str, keep_default_na=True, low_memory=False)
     print(f"Loaded facts: {len(df)} rows")
+    return df
+
+
+def prepare_facts(facts: pd.DataFrame) -> pd.DataFrame:
+    """
+    facts as the stages expect it: parsed columns as plain strings (NaN for
+    missing), pass-through columns in their compact dtypes.
+    
+    facts is either load_facts() output or step 1's in-memory table (as
+    handed over by run_pipeline.py); typed frames are brought to the
+    load_facts form first, so both give the same result. The returned frame
+    is new, so running the stages on it never modifies facts.
+    """
+    df = as_text(facts)
+    plan = derived_dtypes(df.columns, df.columns)
+    passthrough = {col: plan[col] for col in df.columns if col not in PARSED_FIELDS}
+    return apply_dtypes(df, passthrough)
+
+
+def run_stages(df: pd.DataFrame, asof: datetime | None = None, leading: dict | None = None) -> pd.DataFrame:
+    """
+    Run every derivation on a prepare_facts() frame, adding the derived
+    columns to it (the stages run with copy=False, so peak memory stays close
+    to the size of the derived table; see benchmark_derived_memory.py).
+    asof and leading are passed to add_typed_columns.
+    """
+    rows = len(df)
     
     # Step 1: Add typed columns (timestamps, numerics)
     print("\nAdding typed columns...")
-    df = add_typed_columns(df)
-        # Step 1b: Validate puppy counts (catch parsing errors)
+    with stage("add_typed_columns", rows) as record:
+        add_typed_columns(df, copy=False, asof=asof, leading=leading)
+        record["rows_out"] = rows
+    
+    # Step 1b: Validate puppy counts (catch parsing errors)
     print("Validating puppy counts...")
-    df = validate_puppy_counts(df)
-        # Step 2: Add age_days
+    with stage("validate_puppy_counts", rows) as record:
+        validate_puppy_counts(df, copy=False)
+        record["rows_out"] = rows
+    
+    # Step 2: Add age_days
     print("Calculating age_days...")
-    df = add_age_days(df)
+    with stage("add_age_days", rows) as record:
+        add_age_days(df, copy=False)
+        record["rows_out"] = rows
     
-    # Step 3: Parse ready_to_leave (platform-specific)
+    # Step 3: Parse ready_to_leave (platform-specific rules)
     print("Parsing ready_to_leave...")
-    
-    # Initialize columns with proper types
-    df["ready_to_leave_parsed_ts"] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
-    df["ready_to_leave_parse_mode"] = "unknown"
-    
-    df = parse_ready_to_leave_pets4homes(df)
-    df = parse_ready_to_leave_gumtree(df)
-    df = parse_ready_to_leave_freeads(df)
-    df = parse_ready_to_leave_other(df)
+    with stage("parse_ready_to_leave", rows) as record:
+        parse_ready_to_leave(df, copy=False)
+        record["rows_out"] = rows
     
     # Step 4: Add availability flags
     print("Adding availability flags...")
-    df = add_availability_flags(df)
+    with stage("add_availability_flags", rows) as record:
+        add_availability_flags(df, copy=False)
+        record["rows_out"] = rows
+    return df
+
+
+def partition_facts(df: pd.DataFrame, max_rows: int) -> list[np.ndarray]:
+    """
+    Row positions of df split by platform, in order of first appearance.
+    Platforms with more than max_rows rows are split further into roughly
+    equal parts by hash of url, so one big platform doesn't leave the other
+    workers idle.
+    """
+    partitions = []
+    platforms = df["platform"].astype(object)
+    for _, positions in platforms.groupby(platforms, sort=False, dropna=False).indices.items():
+        parts = -(-len(positions) // max_rows)
+        if parts <= 1:
+            partitions.append(positions)
+            continue
+        urls = df["url"].iloc[positions] if "url" in df.columns else pd.Series(positions)
+        bucket = pd.util.hash_pandas_object(urls, index=False).to_numpy() % parts
+        partitions.extend(positions[bucket == i] for i in range(parts) if (bucket == i).any())
+    return partitions
+
+
+def _run_stages_quietly(df: pd.DataFrame, asof: datetime, leading: dict) -> tuple[pd.DataFrame, list[dict]]:
+    """run_stages in a worker process, without its progress output; returns it with its stage records."""
+    run_report.start("derived")
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_stages(df, asof, leading), run_report.collect()
+
+
+def leading_values(df: pd.DataFrame) -> dict:
+    """
+    First distinct values of each DT_FIELDS column. pd.to_datetime infers a
+    column's format from its first usable value, and these cover it, so rows
+    parsed behind them get the same result as in the whole column.
+    """
+    return {col: df[col].dropna().unique()[:LEADING_VALUES].tolist() for col in DT_FIELDS if col in df.columns}
+
+
+def derive_rows(df: pd.DataFrame, asof: datetime, leading: dict, workers: int = 1) -> pd.DataFrame:
+    """
+    run_stages on a prepare_facts() frame that may be part of the facts, in
+    platform partitions (partition_facts) across a process pool if workers > 1.
+    Results come back in df row order.
+    """
+    if workers <= 1:
+        return run_stages(df, asof, leading)
+    
+    partitions = partition_facts(df, max_rows=max(1, -(-len(df) // workers)))
+    print(f"\nRunning derivations on {len(partitions)} partitions across {workers} processes...")
+    with stage("derive_partitions", len(df)) as record:
+        with ProcessPoolExecutor(max_workers=min(workers, len(partitions))) as pool:
+            futures = [pool.submit(_run_stages_quietly, df.iloc[positions], asof, leading) for positions in partitions]
+            parts = []
+            for future in futures:
+                part, records = future.result()
+                parts.append(part)
+                run_report.merge(records)
+        out = pd.concat(parts).reindex(df.index)
+        record["rows_out"] = len(out)
+    return out
+
+
+def build_derived(facts: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
+    """
+    Run every derivation on a facts frame (see prepare_facts).
     
-    # Write output
-    df.to_csv(OUTPUT_PATH, index=False)
+    With workers > 1 the stages run on platform partitions in a process pool
+    (derive_rows), all anchored to the same asof_ts and parsing dates behind
+    the same leading_values. The partitions are concatenated back in facts
+    row order, giving the same table as a single-process build.
+    """
+    with stage("prepare_facts", len(facts)) as record:
+        df = prepare_facts(facts)
+        record["rows_out"] = len(df)
+    if workers <= 1:
+        return run_stages(df)
+    return derive_rows(df, datetime.now(timezone.utc), leading_values(df), workers)
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Per-row hash of url and the facts columns the stages read (PARSED_FIELDS)."""
+    columns = [col for col in ["url"] + PARSED_FIELDS if col in df.columns]
+    return pd.util.hash_pandas_object(df[columns].astype(object), index=False)
+
+
+def probe_derive(df: pd.DataFrame, asof: datetime, leading: dict, workers: int = 1):
+    """
+    Derive df at asof, and again at asof + ASOF_PROBE to see which values
+    come from asof_ts.
+    
+    Two points cannot show every way a value depends on asof_ts, so rows
+    taken by a "day_month" rule (year and 180-day window from the anchor)
+    are never stable.
+    
+    Returns:
+        tuple: (derived at asof; relative: bool frame over the timestamp
+        columns, True where the value moved by exactly ASOF_PROBE; stable:
+        bool Series, True for rows whose other values did not move at all,
+        which can be reused later with their relative values shifted)
+    """
+    derived = derive_rows(df.copy(), asof, leading, workers)
+    with contextlib.redirect_stdout(io.StringIO()), stage("asof_probe", len(df)) as record:
+        probe = derive_rows(df.copy(), asof + ASOF_PROBE, leading, workers)
+        record["rows_out"] = len(probe)
+    
+    day_month_rules = [rule["name"] for rule in READY_TO_LEAVE_RULES if rule.get("offset") == "day_month"]
+    stable = ~derived["ready_to_leave_rule"].isin(day_month_rules)
+    relative = {}
+    for col in derived.columns:
+        if col in df.columns or col in ASOF_COLUMNS:
+            continue
+        now, later = derived[col], probe[col]
+        same = (now == later) | (now.isna() & later.isna())
+        if pd.api.types.is_datetime64_any_dtype(now):
+            relative[col] = (later - now) == ASOF_PROBE
+            same |= relative[col]
+        stable &= same
+    return derived, pd.DataFrame(relative, index=df.index), stable
+
+
+def _row_cache_key(df: pd.DataFrame, leading: dict) -> str:
+    """What cached rows depend on besides their own facts: code, columns, leading values."""
+    code = [hashlib.sha256(Path(path).read_bytes()).hexdigest() for path in (__file__, storage.__file__)]
+    payload = {"code": code, "columns": list(df.columns), "leading": leading}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _load_row_cache(key: str):
+    """(cached rows indexed by row hash, manifest), or (None, None) if missing or stale."""
+    if not ROW_MANIFEST_PATH.exists() or not ROW_CACHE_PATH.exists():
+        return None, None
+    manifest = json.loads(ROW_MANIFEST_PATH.read_text())
+    if manifest.get("key") != key:
+        return None, None
+    return pd.read_pickle(ROW_CACHE_PATH), manifest
+
+
+def build_derived_incremental(facts: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
+    """
+    build_derived, deriving only rows that are new or changed since the last
+    incremental run.
+    
+    Rows are matched to the previous run by row_hashes (url plus the facts
+    columns the stages read); other facts columns are taken from facts as
+    is. Timestamps that were computed from asof_ts (relative dates, "now",
+    "in N weeks", ...; found by probe_derive) are shifted by the time since
+    the previous run, and the ASOF_COLUMNS are recomputed for every row.
+    Rows whose values depend on asof_ts in any other way (e.g. freeads
+    "7th February" dates) are derived on every run. Year-less dates that
+    only dateutil parses keep the year of the run that first derived them.
+    The cache is rebuilt
+    from scratch when this code, storage.py, the facts columns or the
+    leading_values of a date column change.
+    """
+    with stage("prepare_facts", len(facts)) as record:
+        df = prepare_facts(facts)
+        record["rows_out"] = len(df)
+    asof = datetime.now(timezone.utc)
+    leading = leading_values(df)
+    with stage("row_hashes", len(df)) as record:
+        key = _row_cache_key(df, leading)
+        hashes = row_hashes(df)
+        record["rows_out"] = len(hashes)
+    with stage("load_row_cache") as record:
+        cache, manifest = _load_row_cache(key)
+        record["rows_out"] = len(cache) if cache is not None else 0
+    
+    reused = hashes.isin(cache.index).to_numpy() if cache is not None else np.zeros(len(df), dtype=bool)
+    print(f"\nIncremental: deriving {int((~reused).sum())} new or changed rows, reusing {int(reused.sum())} cached")
+    
+    parts = []
+    new_cache = []
+    relative_prefix = "relative:"
+    if reused.any():
+        with stage("reuse_cached_rows", int(reused.sum())) as record:
+            old = cache.loc[hashes[reused]].set_axis(df.index[reused])
+            shift = pd.Timestamp(asof) - pd.Timestamp(manifest["asof"])
+            for flag in [col for col in old.columns if col.startswith(relative_prefix)]:
+                col = flag[len(relative_prefix):]
+                old.loc[old[flag], col] = old.loc[old[flag], col] + shift
+            new_cache.append(old.set_axis(hashes[reused].to_numpy()))
+            parts.append(pd.concat([df[reused], old.drop(columns=[c for c in old.columns if c.startswith(relative_prefix)])], axis=1))
+            record["rows_out"] = len(parts[-1])
+        columns = manifest["columns"]
+    if not reused.all():
+        with stage("probe_derive", int((~reused).sum())) as record:
+            derived, relative, stable = probe_derive(df[~reused], asof, leading, workers)
+            record["rows_out"] = len(derived)
+        parts.append(derived)
+        columns = list(derived.columns)
+        kept = derived.loc[stable, [col for col in derived.columns if col not in df.columns and col not in ASOF_COLUMNS]]
+        kept = kept.join(relative[stable].add_prefix(relative_prefix))
+        new_cache.append(kept.set_axis(hashes[~reused][stable.to_numpy()].to_numpy()))
+        print(f"  {int((~stable).sum())} rows depend on asof_ts beyond a shift and are not cached")
+    
+    # ASOF_COLUMNS are missing from cached rows; they are recomputed below
+    with stage("recompute_asof_columns", len(df)) as record:
+        out = pd.concat(parts).reindex(index=df.index, columns=columns)
+        out["asof_ts"] = asof
+        add_age_days(out, copy=False)
+        add_availability_flags(out, copy=False)
+        record["rows_out"] = len(out)
+    
+    with stage("write_row_cache") as record:
+        cached = pd.concat(new_cache)
+        cached = cached[~cached.index.duplicated()]
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cached.to_pickle(ROW_CACHE_PATH)
+        ROW_MANIFEST_PATH.write_text(json.dumps({"key": key, "asof": asof.isoformat(), "columns": columns}, indent=2))
+        record["rows_out"] = len(cached)
+    return out
+
+
+def write_derived(df: pd.DataFrame, facts_columns: list[str], fmt: str = DEFAULT_FORMAT,
+                  memory_report: bool = False) -> list[Path]:
+    """Write derived and print the run report."""
+    plan = derived_dtypes(df.columns, facts_columns)
+    if memory_report:
+        passthrough = [col for col in facts_columns if col not in PARSED_FIELDS]
+        print_memory_report(df.astype({col: object for col in passthrough}), apply_dtypes(df, plan))
+    with stage("write", len(df)) as record:
+        outputs = write_table(df, OUTPUT_PATH, fmt, plan)
+        record["rows_out"] = len(df)
     
     print("\n" + "=" * 60)
     print(f"Total rows: {len(df)}")
     print(f"Columns: {len(df.columns)}")
-    print(f"Output: {OUTPUT_PATH}")
+    for path in outputs:
+        print(f"Output: {path}")
     
     # Summary stats
     print("\n=== Puppy Count Validation ===")
@@ -484,6 +802,9 @@ def main():
     print("\n=== Parse Mode Distribution ===")
     print(df["ready_to_leave_parse_mode"].value_counts(dropna=False).to_string())
     
+    print("\n=== ready_to_leave Rule Hits ===")
+    print(df["ready_to_leave_rule"].value_counts(dropna=False).to_string())
+    
     print("\n=== Availability by Platform ===")
     summary = df.groupby("platform").agg({
         "availability_known": "mean",
@@ -492,6 +813,45 @@ def main():
     }).round(3)
     summary.columns = ["pct_availability_known", "pct_ready_now", "pct_waiting_list"]
     print(summary.to_string())
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build derived views from the facts table.")
+    parser.add_argument(
+        "--format", choices=FORMATS, default=DEFAULT_FORMAT,
+        help="Output format: typed Parquet, CSV, or both (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--memory-report", action="store_true",
+        help="Print per-column memory before/after the dtype plan",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Derive platform partitions in parallel across this many processes (output order unchanged)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only derive rows that are new or changed since the last --incremental run",
+    )
+    args = parser.parse_args(argv)
+    
+    print("=" * 60)
+    print("Pipeline Step 2: Build Derived Views")
+    print("=" * 60)
+    
+    run_report.start("derived")
+    with stage("load_facts") as record:
+        facts = load_facts()
+        record["rows_out"] = len(facts)
+    facts_columns = list(facts.columns)
+    if args.incremental:
+        df = build_derived_incremental(facts, args.workers)
+    else:
+        df = build_derived(facts, args.workers)
+    del facts
+    write_derived(df, facts_columns, args.format, args.memory_report)
+    run_report.finish(run_report.report_path(OUTPUT_PATH))
 
 
 if __name__ == "__main__":
@@ -2,7 +2,10 @@
 """
 Pipeline Step 3: Build Platform Supply Summary
 
-Reads derived.csv and produces platform_supply_summary.csv.
+Reads derived (Parquet if present, else CSV) and produces platform_supply_summary.csv.
+Only SUMMARY_COLUMNS are read, and every metric comes from one grouped
+aggregation over them, so the step stays a single scan of the rows however
+many platforms there are.
 
 This is the final analytical output showing:
 - Total listings per platform
@@ -17,6 +20,10 @@ from pathlib import Path
 import pandas as pd
 import numpy as np
 
+import run_report
+from run_report import stage
+from storage import parquet_path, read_table, table_header
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DERIVED_PATH = REPO_ROOT / "output" / "views" / "derived.csv"
 OUTPUT_PATH = REPO_ROOT / "output" / "views" / "platform_supply_summary.csv"
@@ -34,80 +41,99 @@ CONFIDENCE_NOTES = {
     "champdogs": "Medium - DOB available; estimated ready_to_leave = DOB + 8 weeks",
 }
 
+# The derived columns the summary reads
+BOOL_COLUMNS = ["availability_known", "is_ready_now", "is_waiting_list"]
+NUMERIC_COLUMNS = ["price_num", "age_days"]
+SUMMARY_COLUMNS = ["platform"] + BOOL_COLUMNS + NUMERIC_COLUMNS
 
-def main():
-    print("=" * 60)
-    print("Pipeline Step 3: Build Platform Supply Summary")
-    print("=" * 60)
-    
-    if not DERIVED_PATH.exists():
+
+def load_derived(columns: list[str] | None = SUMMARY_COLUMNS) -> pd.DataFrame:
+    """
+    Read derived (Parquet if present, else CSV); only columns (None: all).
+    Columns the file lacks are skipped (build_summary handles them).
+    """
+    if not DERIVED_PATH.exists() and not parquet_path(DERIVED_PATH).exists():
         raise FileNotFoundError(f"Derived file not found: {DERIVED_PATH}\nRun pipeline_02_build_derived.py first.")
     
-    df = pd.read_csv(DERIVED_PATH, low_memory=False)
+    if columns is not None:
+        header = table_header(DERIVED_PATH)
+        columns = [col for col in columns if col in header]
+    df = read_table(DERIVED_PATH, columns, low_memory=False)
     print(f"Loaded derived: {len(df)} rows")
+    return df
+
+
+def build_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-platform supply summary of a derived frame (from disk or step 2 in memory).
+    
+    One groupby over SUMMARY_COLUMNS gives every per-platform count, sum,
+    non-null count and median; the percentages are then sums over counts.
+    Metrics whose column is missing from df are 0 (NaN for medians).
+    """
+    frame = pd.DataFrame({"platform": df["platform"].astype(object)}, index=df.index)
+    aggs = {"total_listings": ("platform", "size")}
     
     # Ensure boolean columns are boolean
-    for col in ["availability_known", "is_ready_now", "is_waiting_list"]:
+    for col in BOOL_COLUMNS:
         if col in df.columns:
-            df[col] = df[col].astype(bool)
+            frame[col] = df[col].astype(bool)
+            aggs[f"{col}_sum"] = (col, "sum")
     
     # Ensure numeric columns
-    for col in ["price_num", "age_days", "days_until_ready"]:
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-    
-    # Group by platform
-    summary_rows = []
-    
-    for platform in sorted(df["platform"].unique()):
-        p = df[df["platform"] == platform]
-        n = len(p)
-        
-        # Availability metrics
-        availability_known_pct = p["availability_known"].mean() if "availability_known" in p.columns else 0
-        ready_now_count = p["is_ready_now"].sum() if "is_ready_now" in p.columns else 0
-        waiting_list_count = p["is_waiting_list"].sum() if "is_waiting_list" in p.columns else 0
-        unknown_count = n - ready_now_count - waiting_list_count
-        
-        pct_ready_now = ready_now_count / n if n > 0 else 0
-        pct_waiting_list = waiting_list_count / n if n > 0 else 0
-        pct_unknown = unknown_count / n if n > 0 else 0
-        
-        # Price metrics
-        price_coverage_pct = p["price_num"].notna().mean() if "price_num" in p.columns else 0
-        median_price = p["price_num"].median() if "price_num" in p.columns else np.nan
-        
-        # Age metrics
-        age_coverage_pct = p["age_days"].notna().mean() if "age_days" in p.columns else 0
-        median_age_days = p["age_days"].median() if "age_days" in p.columns else np.nan
-        
-        # Parse mode breakdown
-        parse_modes = p["ready_to_leave_parse_mode"].value_counts(dropna=False).to_dict() if "ready_to_leave_parse_mode" in p.columns else {}
-        
-        summary_rows.append({
-            "platform": platform,
-            "total_listings": n,
-            "availability_known_pct": round(availability_known_pct, 3),
-            "ready_now_count": int(ready_now_count),
-            "waiting_list_count": int(waiting_list_count),
-            "unknown_count": int(unknown_count),
-            "pct_ready_now": round(pct_ready_now, 3),
-            "pct_waiting_list": round(pct_waiting_list, 3),
-            "pct_unknown": round(pct_unknown, 3),
-            "price_coverage_pct": round(price_coverage_pct, 3),
-            "median_price": round(median_price, 0) if pd.notna(median_price) else None,
-            "age_coverage_pct": round(age_coverage_pct, 3),
-            "median_age_days": round(median_age_days, 0) if pd.notna(median_age_days) else None,
-            "confidence_note": CONFIDENCE_NOTES.get(platform, "Unknown"),
-        })
-    
-    summary_df = pd.DataFrame(summary_rows)
+            frame[col] = pd.to_numeric(df[col], errors="coerce")
+            aggs[f"{col}_count"] = (col, "count")
+            aggs[f"{col}_median"] = (col, "median")
+    
+    # Group by platform, in name order (the order rows had before the sort below)
+    g = frame.groupby("platform", sort=True).agg(**aggs)
+    n = g["total_listings"]
+    
+    def column(name, default=0):
+        return g[name] if name in g.columns else pd.Series(default, index=g.index)
+    
+    def share(name):
+        """Rounded fraction of listings, 0 if its column is missing."""
+        return (g[name] / n).round(3) if name in g.columns else 0
+    
+    # Availability metrics
+    ready_now_count = column("is_ready_now_sum")
+    waiting_list_count = column("is_waiting_list_sum")
+    unknown_count = n - ready_now_count - waiting_list_count
+    
+    # Price and age metrics
+    median_price = column("price_num_median", np.nan)
+    median_age_days = column("age_days_median", np.nan)
+    
+    summary_df = pd.DataFrame({
+        "platform": g.index,
+        "total_listings": n,
+        "availability_known_pct": share("availability_known_sum"),
+        "ready_now_count": ready_now_count.astype(int),
+        "waiting_list_count": waiting_list_count.astype(int),
+        "unknown_count": unknown_count.astype(int),
+        "pct_ready_now": (ready_now_count / n).round(3),
+        "pct_waiting_list": (waiting_list_count / n).round(3),
+        "pct_unknown": (unknown_count / n).round(3),
+        "price_coverage_pct": share("price_num_count"),
+        "median_price": median_price.round(0).astype(object).where(median_price.notna(), None),
+        "age_coverage_pct": share("age_days_count"),
+        "median_age_days": median_age_days.round(0).astype(object).where(median_age_days.notna(), None),
+        "confidence_note": [CONFIDENCE_NOTES.get(platform, "Unknown") for platform in g.index],
+    }).reset_index(drop=True)
     
     # Sort by total_listings descending
     summary_df = summary_df.sort_values("total_listings", ascending=False)
-    
-    # Write output
-    summary_df.to_csv(OUTPUT_PATH, index=False)
+    return summary_df
+
+
+def write_summary(summary_df: pd.DataFrame) -> Path:
+    """Write the summary CSV and print it."""
+    with stage("write", len(summary_df)) as record:
+        summary_df.to_csv(OUTPUT_PATH, index=False)
+        record["rows_out"] = len(summary_df)
     
     print("\n" + "=" * 60)
     print(f"Output: {OUTPUT_PATH}")
@@ -129,6 +155,23 @@ def main():
     print(f"Ready now: {total_ready_now:,} ({total_ready_now/total_listings*100:.1f}%)")
     print(f"Waiting list: {total_waiting_list:,} ({total_waiting_list/total_listings*100:.1f}%)")
     print(f"Unknown: {total_unknown:,} ({total_unknown/total_listings*100:.1f}%)")
+    return OUTPUT_PATH
+
+
+def main():
+    print("=" * 60)
+    print("Pipeline Step 3: Build Platform Supply Summary")
+    print("=" * 60)
+    
+    run_report.start("summary")
+    with stage("load_derived") as record:
+        derived = load_derived()
+        record["rows_out"] = len(derived)
+    with stage("build_summary", len(derived)) as record:
+        summary_df = build_summary(derived)
+        record["rows_out"] = len(summary_df)
+    write_summary(summary_df)
+    run_report.finish(run_report.report_path(OUTPUT_PATH))
 
 
 if __name__ == "__main__":
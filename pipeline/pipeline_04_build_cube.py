@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Pipeline Step 4: Build Market Cube
+
+Reads derived (Parquet if present, else CSV) and materializes an aggregate
+cube at platform × breed × region × published-week grain, so dashboard and
+slide queries roll up cube cells instead of scanning every listing:
+
+- market_cube: per cell, listing and puppy counts, price count/sum/sum of
+  squares/min/max and ready-now/waiting-list/availability-known counts
+- market_cube_sketches: per cell, mergeable quantile sketches (see
+  sketch.py) of price, age_days and days_until_ready, which add up across
+  cells like the other measures
+
+rollup() and sketch_quantiles() answer grouped queries from the cube (query()
+joins them). Counts, sums, means and standard deviations are exact;
+quantiles are within sketch.ACCURACY (1%) of the exact value. Cubes built
+from separate batches of listings (e.g. each day's new ones) combine with
+merge_cubes() into the cube of all of them.
+
+days_until_ready is relative to the asof date derived was built at, so its
+sketches are only as fresh as derived.
+
+region is the county part of location (see region_of): raw locations are
+close to one per listing, so they would not aggregate.
+
+Output: output/views/market_cube.csv and market_cube_sketches.csv and/or
+.parquet (see storage.py)
+
+Usage:
+    python pipeline_04_build_cube.py                                    # build the cube
+    python pipeline_04_build_cube.py --rollup breed --where platform=gumtree
+    python pipeline_04_build_cube.py --rollup platform,week --quantiles 0.25,0.5,0.75
+"""
+
+from pathlib import Path
+import argparse
+import re
+import numpy as np
+import pandas as pd
+
+import run_report
+import sketch
+from run_report import stage
+from storage import (
+    DEFAULT_FORMAT,
+    FORMATS,
+    apply_dtypes,
+    cube_dtypes,
+    parquet_path,
+    read_table,
+    write_table,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DERIVED_PATH = REPO_ROOT / "output" / "views" / "derived.csv"
+CUBE_PATH = REPO_ROOT / "output" / "views" / "market_cube.csv"
+SKETCHES_PATH = REPO_ROOT / "output" / "views" / "market_cube_sketches.csv"
+
+# The derived columns the cube reads
+CUBE_COLUMNS = [
+    "platform", "breed", "location", "published_at_ts", "price_num", "total_available_num",
+    "is_ready_now", "is_waiting_list", "availability_known", "age_days", "days_until_ready",
+]
+CUBE_DIMENSIONS = ["platform", "breed", "region", "week"]
+# Measures that roll up by summing
+SUM_MEASURES = [
+    "listings", "puppies_known", "puppies", "price_count", "price_sum", "price_sumsq",
+    "ready_now", "waiting_list", "availability_known",
+]
+# Quantile sketches kept per cell. Key: measure name, Value: derived column
+SKETCH_MEASURES = {
+    "price": "price_num",
+    "age_days": "age_days",
+    "days_until_ready": "days_until_ready",
+}
+
+
+def region_of(location: pd.Series, known=()) -> pd.Series:
+    """
+    County or region of each location: the text after the last comma
+    ("Acton, London" -> London), else a known region ending the text
+    ("Walsall West Midlands" -> West Midlands, "Kent" -> Kent). Known regions
+    are known plus the after-comma parts seen in location itself; NaN if none
+    matches (e.g. a bare town name).
+    """
+    text = location.astype(object).where(location.notna())
+    values = pd.Series(text.dropna().unique(), dtype=object)
+    stripped = values.str.strip()
+    after_comma = stripped.str.rsplit(",", n=1).str[-1].str.strip().where(stripped.str.contains(","))
+    known = sorted((set(after_comma.dropna()) | set(known)) - {""}, key=len, reverse=True)
+
+    regions = after_comma.where(after_comma != "")
+    if known:
+        ending = re.compile(r"(?:^|\s)(" + "|".join(map(re.escape, known)) + r")$")
+        regions = regions.fillna(stripped.str.extract(ending, expand=False))
+    return text.map(dict(zip(values, regions)))
+
+
+def week_of(ts: pd.Series) -> pd.Series:
+    """Start (Monday 00:00 UTC) of each timestamp's week; NaT stays NaT."""
+    ts = pd.to_datetime(ts, errors="coerce", utc=True)
+    return ts.dt.floor("D") - pd.to_timedelta(ts.dt.weekday, unit="D")
+
+
+def load_derived() -> pd.DataFrame:
+    """Read the CUBE_COLUMNS of derived (Parquet if present, else CSV)."""
+    if not DERIVED_PATH.exists() and not parquet_path(DERIVED_PATH).exists():
+        raise FileNotFoundError(f"Derived file not found: {DERIVED_PATH}\nRun pipeline_02_build_derived.py first.")
+
+    df = read_table(DERIVED_PATH, CUBE_COLUMNS, low_memory=False)
+    print(f"Loaded derived: {len(df)} rows")
+    return df
+
+
+def build_cube(df: pd.DataFrame, regions=()) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Aggregate a derived frame (from disk or step 2 in memory) to the cube.
+
+    regions: known regions besides those seen in df (see region_of); pass
+    an existing cube's regions when building a batch to merge into it.
+
+    Returns:
+        tuple: (market_cube, market_cube_sketches), one row per non-empty
+        cell (and measure and sketch bucket), sorted by CUBE_DIMENSIONS;
+        missing dimension values form their own cells
+    """
+    price = pd.to_numeric(df["price_num"], errors="coerce")
+    puppies = pd.to_numeric(df["total_available_num"], errors="coerce")
+    frame = pd.DataFrame({
+        "platform": df["platform"].astype(object),
+        "breed": df["breed"].astype(object).where(df["breed"].notna()),
+        "region": region_of(df["location"], regions),
+        "week": week_of(df["published_at_ts"]),
+        "listings": 1,
+        "puppies_known": puppies.notna(),
+        "puppies": puppies,
+        "price_count": price.notna(),
+        "price_sum": price,
+        "price_sumsq": price ** 2,
+        "ready_now": df["is_ready_now"].fillna(False).astype(bool),
+        "waiting_list": df["is_waiting_list"].fillna(False).astype(bool),
+        "availability_known": df["availability_known"].fillna(False).astype(bool),
+    }, index=df.index)
+    frame["price_min"] = price
+    frame["price_max"] = price
+
+    cells = frame.groupby(CUBE_DIMENSIONS, dropna=False, sort=True)
+    cube = cells[SUM_MEASURES].sum()
+    cube["price_min"] = cells["price_min"].min()
+    cube["price_max"] = cells["price_max"].max()
+    cube = cube.reset_index()
+
+    sketches = sketch.merge([
+        sketch.build(frame, CUBE_DIMENSIONS, pd.to_numeric(df[col], errors="coerce")).assign(measure=measure)
+        for measure, col in SKETCH_MEASURES.items()
+    ], CUBE_DIMENSIONS + ["measure"])
+    return cube, sketches
+
+
+def merge_cubes(parts: list[tuple[pd.DataFrame, pd.DataFrame]]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Merge (market_cube, market_cube_sketches) pairs built from separate
+    batches of listings into the pair build_cube() gives for all of them,
+    as long as every batch was built with the same known regions.
+    """
+    cubes = pd.concat([cube for cube, _ in parts], ignore_index=True)
+    cells = cubes.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=True)
+    cube = cells[SUM_MEASURES].sum()
+    cube["price_min"] = cells["price_min"].min()
+    cube["price_max"] = cells["price_max"].max()
+    sketches = sketch.merge([sketches for _, sketches in parts], CUBE_DIMENSIONS + ["measure"])
+    return cube.reset_index(), sketches
+
+
+def write_cube(cube: pd.DataFrame, sketches: pd.DataFrame, fmt: str = DEFAULT_FORMAT) -> list[Path]:
+    """Write both cube tables and print the run report."""
+    with stage("write", len(cube) + len(sketches)) as record:
+        outputs = write_table(cube, CUBE_PATH, fmt, cube_dtypes(cube.columns))
+        outputs += write_table(sketches, SKETCHES_PATH, fmt, cube_dtypes(sketches.columns))
+        record["rows_out"] = len(cube) + len(sketches)
+
+    print("\n" + "=" * 60)
+    print(f"Cube cells: {len(cube):,} ({int(cube['listings'].sum()):,} listings)")
+    print(f"Sketch rows: {len(sketches):,} ({', '.join(SKETCH_MEASURES)})")
+    for path in outputs:
+        print(f"Output: {path}")
+
+    print("\n=== Distinct values per dimension ===")
+    for col in CUBE_DIMENSIONS:
+        print(f"  {col}: {cube[col].nunique():,} (+ missing: {int(cube.loc[cube[col].isna(), 'listings'].sum()):,} listings)")
+    return outputs
+
+
+def load_cube() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Read both cube tables (Parquet if present, else CSV) in their dtype plan."""
+    if not CUBE_PATH.exists() and not parquet_path(CUBE_PATH).exists():
+        raise FileNotFoundError(f"Market cube not found: {CUBE_PATH}\nRun pipeline_04_build_cube.py first.")
+
+    tables = []
+    for path in [CUBE_PATH, SKETCHES_PATH]:
+        df = read_table(path, low_memory=False)
+        tables.append(apply_dtypes(df, cube_dtypes(df.columns)))
+    return tables[0], tables[1]
+
+
+def _select(df: pd.DataFrame, where: dict | None) -> pd.DataFrame:
+    """Rows of df matching where: {column: value or list of values}."""
+    for col, values in (where or {}).items():
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        df = df[df[col].isin(values)]
+    return df
+
+
+def _groups(df: pd.DataFrame, by: list[str]):
+    return df.groupby(by, observed=True, dropna=False, sort=True)
+
+
+def rollup(cube: pd.DataFrame, by=(), where: dict | None = None) -> pd.DataFrame:
+    """
+    Cube measures rolled up to the by dimensions (none: one total row),
+    over the cells matching where ({dimension: value or list}).
+
+    Adds price_mean, price_std (sample) and pct_ready_now /
+    pct_waiting_list / pct_availability_known (of listings).
+    """
+    by = list(by)
+    cells = _select(cube, where)
+    if by:
+        groups = _groups(cells, by)
+        out = groups[SUM_MEASURES].sum()
+        out["price_min"] = groups["price_min"].min()
+        out["price_max"] = groups["price_max"].max()
+        out = out.reset_index()
+    else:
+        out = pd.DataFrame({col: [cells[col].sum()] for col in SUM_MEASURES})
+        out["price_min"] = cells["price_min"].min()
+        out["price_max"] = cells["price_max"].max()
+
+    count = out["price_count"].astype(float)
+    out["price_mean"] = out["price_sum"] / count.where(count > 0)
+    variance = (out["price_sumsq"] - out["price_sum"] ** 2 / count.where(count > 0)) / (count - 1).where(count > 1)
+    out["price_std"] = np.sqrt(variance.clip(lower=0))
+    listings = out["listings"].astype(float).where(out["listings"] > 0)
+    for col in ["ready_now", "waiting_list", "availability_known"]:
+        out[f"pct_{col}"] = out[col] / listings
+    return out
+
+
+def sketch_quantiles(sketches: pd.DataFrame, by=(), q=(0.5,), where: dict | None = None,
+                     measures=tuple(SKETCH_MEASURES)) -> pd.DataFrame:
+    """
+    Quantiles of each sketched measure per by group, merged from the cube's
+    sketches: one <measure>_pNN column per measure and q (price_p50,
+    price_p99.9, ...; see sketch.quantile_name), within sketch.ACCURACY of
+    the exact quantile at rank floor(q * (n - 1)) (the np.quantile "lower"
+    method).
+    """
+    by = list(by)
+    rows = _select(sketches, where)
+    found = sketch.quantiles(rows[rows["measure"].isin(measures)], by + ["measure"], q).drop(columns="n")
+    out = _groups(rows, by).size().index.to_frame(index=False) if by else pd.DataFrame(index=[0])
+    for measure in measures:
+        part = found[found["measure"] == measure].drop(columns="measure")
+        part = part.rename(columns={col: f"{measure}_{col}" for col in part.columns if col not in by})
+        if by:
+            out = out.merge(part, on=by, how="left")
+        else:
+            out = out.join(part.reset_index(drop=True)).reindex([0])
+    return out
+
+
+def query(cube: pd.DataFrame, sketches: pd.DataFrame, by=(), where: dict | None = None, q=(0.5,)) -> pd.DataFrame:
+    """rollup() joined with sketch_quantiles() for the same groups."""
+    by = list(by)
+    out = rollup(cube, by, where)
+    quantiles = sketch_quantiles(sketches, by, q, where)
+    if by:
+        return out.merge(quantiles, on=by, how="left")
+    return pd.concat([out, quantiles], axis=1)
+
+
+def _parse_where(items: list[str]) -> dict:
+    """--where col=value[,value...] arguments as a rollup where dict."""
+    where = {}
+    for item in items:
+        col, _, values = item.partition("=")
+        where[col] = values.split(",")
+    return where
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the market cube from derived, or query it.")
+    parser.add_argument(
+        "--format", choices=FORMATS, default=DEFAULT_FORMAT,
+        help="Output format: typed Parquet, CSV, or both (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rollup", metavar="DIMS",
+        help=f"Query the built cube instead: roll up to these comma-separated dimensions ({', '.join(CUBE_DIMENSIONS)})",
+    )
+    parser.add_argument(
+        "--where", action="append", default=[], metavar="DIM=VALUE[,VALUE]",
+        help="With --rollup: only cells with these dimension values (repeatable)",
+    )
+    parser.add_argument(
+        "--quantiles", default="0.5",
+        help=f"With --rollup: comma-separated quantiles of {', '.join(SKETCH_MEASURES)} (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.rollup is not None:
+        by = [col for col in args.rollup.split(",") if col]
+        unknown = [col for col in by + list(_parse_where(args.where)) if col not in CUBE_DIMENSIONS]
+        if unknown:
+            parser.error(f"unknown dimension(s): {', '.join(unknown)}")
+        cube, sketches = load_cube()
+        q = [float(value) for value in args.quantiles.split(",")]
+        result = query(cube, sketches, by, _parse_where(args.where), q)
+        print(result.sort_values("listings", ascending=False).to_string(index=False))
+        return
+
+    print("=" * 60)
+    print("Pipeline Step 4: Build Market Cube")
+    print("=" * 60)
+
+    run_report.start("market_cube")
+    with stage("load_derived") as record:
+        df = load_derived()
+        record["rows_out"] = len(df)
+    with stage("build_cube", len(df)) as record:
+        cube, sketches = build_cube(df)
+        record["rows_out"] = len(cube) + len(sketches)
+    write_cube(cube, sketches, args.format)
+    run_report.finish(run_report.report_path(CUBE_PATH))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,61 +6,197 @@ Runs all pipeline steps in sequence:
 1. Build Facts (raw CSVs → facts.csv)
 2. Build Derived (facts.csv → derived.csv)
 3. Build Summary (derived.csv → platform_supply_summary.csv)
+4. Build Market Cube (derived.csv → market_cube.csv, market_cube_sketches.csv)
+
+By default the steps run in this process and hand facts and derived to the
+next step as DataFrames: each table is written once as a final artifact but
+never read back and re-parsed. --subprocess runs each step script on its own
+instead (one interpreter per step, each reading the previous step's file).
+Either way each step writes its run report (per-stage timings, see
+run_report.py) next to its output.
 
 Usage:
-    python run_pipeline.py
+    python run_pipeline.py                  # in-process, writes all outputs
+    python run_pipeline.py --summary-only   # in-process, skip facts/derived files
+    python run_pipeline.py --subprocess     # one process per step script
+    python run_pipeline.py --dag --jobs 4   # only rerun what changed (see dag.py)
 """
 
+import argparse
+import contextlib
 import subprocess
 import sys
+import traceback
 from pathlib import Path
 
+import run_report
+from run_report import stage
+from storage import DEFAULT_FORMAT, FORMATS
+
 PIPELINE_DIR = Path(__file__).resolve().parent
 
 STEPS = [
     ("Step 1: Build Facts", "pipeline_01_build_facts.py"),
     ("Step 2: Build Derived Views", "pipeline_02_build_derived.py"),
     ("Step 3: Build Summary", "pipeline_03_build_summary.py"),
+    ("Step 4: Build Market Cube", "pipeline_04_build_cube.py"),
 ]
 
 
-def run_step(name: str, script: str) -> bool:
-    """Run a pipeline step and return success status."""
+def print_step_header(name: str):
     print("\n" + "=" * 70)
     print(f"RUNNING: {name}")
     print("=" * 70 + "\n")
-    
+
+
+def run_step(name: str, script: str) -> bool:
+    """Run a pipeline step and return success status."""
+    print_step_header(name)
+
     script_path = PIPELINE_DIR / script
     result = subprocess.run(
         [sys.executable, str(script_path)],
         cwd=str(PIPELINE_DIR.parent),  # Run from repo root
     )
-    
+
     if result.returncode != 0:
         print(f"\n❌ FAILED: {name}")
         return False
-    
+
     print(f"\n✓ Completed: {name}")
     return True
 
 
-def main():
-    print("=" * 70)
-    print("DOG MARKET PIPELINE - CLEAN REBUILD")
-    print("=" * 70)
-    
+@contextlib.contextmanager
+def in_process_step(name: str):
+    """Run the block as a pipeline step, reporting and exiting like run_subprocess on failure."""
+    print_step_header(name)
+    try:
+        yield
+    except Exception:
+        traceback.print_exc()
+        print(f"\n❌ FAILED: {name}")
+        print(f"\n⚠️  Pipeline stopped at: {name}")
+        sys.exit(1)
+    print(f"\n✓ Completed: {name}")
+
+
+def run_subprocess():
+    """Run each step script in its own interpreter."""
     for name, script in STEPS:
         if not run_step(name, script):
             print(f"\n⚠️  Pipeline stopped at: {name}")
             sys.exit(1)
-    
+
+
+def run_in_process(workers: int = 1, fmt: str = DEFAULT_FORMAT, write_intermediate: bool = True,
+                   all_snapshots: bool = False):
+    """
+    Run the steps as functions, passing DataFrames between them.
+
+    Args:
+        workers: Process-pool size for step 1 (per platform) and step 2 (per partition)
+        fmt: facts/derived output format (one of storage.FORMATS)
+        write_intermediate: Write facts and derived (False: summary only)
+        all_snapshots: Ingest every raw snapshot file (step 1 --all-snapshots)
+    """
+    import pipeline_01_build_facts as step1
+    import pipeline_02_build_derived as step2
+    import pipeline_03_build_summary as step3
+    import pipeline_04_build_cube as step4
+
+    with in_process_step(STEPS[0][0]):
+        run_report.start("facts")
+        schema_fields = step1.load_schema()
+        print(f"Schema fields: {len(schema_fields)}")
+        facts = step1.build_facts_table(schema_fields, workers, all_snapshots)
+        if write_intermediate:
+            step1.write_facts(facts, fmt)
+        run_report.finish(run_report.report_path(step1.OUTPUT_PATH))
+
+    with in_process_step(STEPS[1][0]):
+        run_report.start("derived")
+        facts_columns = list(facts.columns)
+        derived = step2.build_derived(facts, workers)
+        del facts
+        if write_intermediate:
+            step2.write_derived(derived, facts_columns, fmt)
+        run_report.finish(run_report.report_path(step2.OUTPUT_PATH))
+
+    with in_process_step(STEPS[2][0]):
+        run_report.start("summary")
+        with stage("build_summary", len(derived)) as record:
+            summary_df = step3.build_summary(derived)
+            record["rows_out"] = len(summary_df)
+        step3.write_summary(summary_df)
+        run_report.finish(run_report.report_path(step3.OUTPUT_PATH))
+
+    with in_process_step(STEPS[3][0]):
+        run_report.start("market_cube")
+        with stage("build_cube", len(derived)) as record:
+            cube, sketches = step4.build_cube(derived)
+            record["rows_out"] = len(cube) + len(sketches)
+        step4.write_cube(cube, sketches, fmt)
+        run_report.finish(run_report.report_path(step4.CUBE_PATH))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the full dog market pipeline.")
+    parser.add_argument(
+        "--subprocess", action="store_true",
+        help="Run each step script in its own process, hand-off via files (previous behaviour)",
+    )
+    parser.add_argument(
+        "--dag", action="store_true",
+        help="Bring every pipeline and analysis output up to date, skipping unchanged nodes (dag.py)",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1,
+        help="With --dag: run up to this many independent nodes at once",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Steps 1 and 2: build platforms in parallel across this many processes",
+    )
+    parser.add_argument(
+        "--all-snapshots", action="store_true",
+        help="Step 1: ingest every raw snapshot file per platform, deduplicated",
+    )
+    parser.add_argument(
+        "--format", choices=FORMATS, default=DEFAULT_FORMAT,
+        help="Format for facts and derived (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--summary-only", action="store_true",
+        help="Don't write facts/derived; only platform_supply_summary.csv and the market cube",
+    )
+    args = parser.parse_args(argv)
+    if args.dag and (args.subprocess or args.workers != 1 or args.all_snapshots or args.format != DEFAULT_FORMAT or args.summary_only):
+        parser.error("--dag runs each node with the arguments dag.py registers; only --jobs applies")
+    if args.dag:
+        import dag
+        sys.exit(0 if dag.run_dag(jobs=args.jobs) else 1)
+    if args.subprocess and (args.workers != 1 or args.all_snapshots or args.format != DEFAULT_FORMAT or args.summary_only):
+        parser.error("--subprocess runs each step with its defaults; other options apply in-process only")
+
+    print("=" * 70)
+    print("DOG MARKET PIPELINE - CLEAN REBUILD")
+    print("=" * 70)
+
+    if args.subprocess:
+        run_subprocess()
+    else:
+        run_in_process(args.workers, args.format, not args.summary_only, args.all_snapshots)
+
     print("\n" + "=" * 70)
     print("✓ PIPELINE COMPLETE")
     print("=" * 70)
     print("\nOutputs:")
-    print("  - output/facts/facts.csv")
-    print("  - output/views/derived.csv")
+    if not args.summary_only:
+        print("  - output/facts/facts.csv")
+        print("  - output/views/derived.csv")
     print("  - output/views/platform_supply_summary.csv")
+    print("  - output/views/market_cube.csv, market_cube_sketches.csv")
 
 
 if __name__ == "__main__":
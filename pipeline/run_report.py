@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Per-stage run reports shared by the pipeline steps.
+
+Each step wraps its stages in stage(); every stage records wall time, CPU
+time (this process plus reaped child processes), rows in/out, rows/sec and
+how much it raised the process's peak RSS. finish() prints a short table
+and writes the report as JSON next to the step's output (e.g.
+output/views/derived_run_report.json), with the previous run's wall times
+alongside so regressions show up without a profiler.
+
+Stages nest: a stage opened inside another is reported under it (its path
+is "outer/inner"). A worker process calls start() (forked workers inherit
+the parent's open stages), returns its stages with collect(), and the
+parent adds them under its open stage with merge(); the same stage run on
+several partitions or platforms is summed into one row.
+
+Usage:
+    run_report.start("derived")
+    with run_report.stage("parse", rows_in=len(df)) as record:
+        out = parse(df)
+        record["rows_out"] = len(out)
+    run_report.finish(run_report.report_path(OUTPUT_PATH))
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+# The run being recorded in this process (see start)
+_RUN = {"step": None, "started_at": None, "wall": 0.0, "cpu": 0.0, "records": [], "stack": []}
+
+
+def peak_rss_bytes() -> int | None:
+    """Process peak RSS (ru_maxrss is KiB on Linux, bytes on macOS); None without resource."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cpu_seconds() -> float:
+    """CPU time of this process and its reaped children (e.g. a finished process pool)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def report_path(output_path: Path) -> Path:
+    """Run report for a step writing output_path (facts.csv -> facts_run_report.json)."""
+    return output_path.with_name(f"{output_path.stem}_run_report.json")
+
+
+def start(step: str):
+    """Start recording a run of step, dropping any stages recorded so far."""
+    _RUN.update(
+        step=step, started_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        wall=time.perf_counter(), cpu=cpu_seconds(), records=[], stack=[],
+    )
+
+
+@contextmanager
+def stage(name: str, rows_in: int | None = None):
+    """
+    Time the enclosed block as stage name.
+
+    Yields the stage's record (a dict); set record["rows_out"] before the
+    block ends. Stages are recorded in the order they start.
+    """
+    path = "/".join(_RUN["stack"] + [name])
+    record = {"stage": path, "calls": 1, "wall_s": 0.0, "cpu_s": 0.0,
+              "rows_in": rows_in, "rows_out": None, "peak_rss_delta_bytes": None}
+    _RUN["records"].append(record)
+    _RUN["stack"].append(name)
+    rss = peak_rss_bytes()
+    wall, cpu = time.perf_counter(), cpu_seconds()
+    try:
+        yield record
+    finally:
+        record["wall_s"] = time.perf_counter() - wall
+        record["cpu_s"] = cpu_seconds() - cpu
+        if rss is not None:
+            record["peak_rss_delta_bytes"] = peak_rss_bytes() - rss
+        _RUN["stack"].pop()
+
+
+def collect() -> list[dict]:
+    """Return and clear the stages recorded in this process (in a worker: for merge)."""
+    records, _RUN["records"] = _RUN["records"], []
+    return records
+
+
+def merge(records: list[dict]):
+    """Add stages recorded in a worker process under the currently open stage."""
+    prefix = "/".join(_RUN["stack"])
+    for record in records:
+        _RUN["records"].append({**record, "stage": f"{prefix}/{record['stage']}" if prefix else record["stage"]})
+
+
+def _add(total, value):
+    return value if total is None else total if value is None else total + value
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    """
+    One row per stage path, in first-start order: times, rows and calls
+    summed, peak RSS delta the largest seen, plus rows_per_s (rows in,
+    else rows out, over wall time).
+    """
+    stages = {}
+    for record in records:
+        total = stages.get(record["stage"])
+        if total is None:
+            stages[record["stage"]] = dict(record)
+            continue
+        for key in ["calls", "wall_s", "cpu_s", "rows_in", "rows_out"]:
+            total[key] = _add(total[key], record[key])
+        if record["peak_rss_delta_bytes"] is not None:
+            total["peak_rss_delta_bytes"] = max(total["peak_rss_delta_bytes"] or 0, record["peak_rss_delta_bytes"])
+    for total in stages.values():
+        rows = total["rows_in"] if total["rows_in"] is not None else total["rows_out"]
+        total["rows_per_s"] = round(rows / total["wall_s"]) if rows is not None and total["wall_s"] > 0 else None
+        total["wall_s"] = round(total["wall_s"], 4)
+        total["cpu_s"] = round(total["cpu_s"], 4)
+    return list(stages.values())
+
+
+def _fmt(value, width: int, spec: str = "") -> str:
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}{spec}}"
+
+
+def print_report(report: dict, previous: dict | None = None):
+    """Print the stage table (stage names indented by nesting; prev = last run's wall time)."""
+    prev = {s["stage"]: s["wall_s"] for s in (previous or {}).get("stages", [])}
+    mb = 1024 * 1024
+    print("\n" + "=" * 60)
+    print(f"Run report: {report['step']}")
+    print("=" * 60)
+    print(f"  {'stage':<40} {'wall s':>8} {'prev s':>8} {'cpu s':>8} {'rows in':>9} {'rows out':>9} "
+          f"{'rows/s':>10} {'+rss MB':>8}")
+    for s in report["stages"]:
+        depth = s["stage"].count("/")
+        name = "  " * depth + s["stage"].rsplit("/", 1)[-1]
+        if s["calls"] > 1:
+            name += f" (x{s['calls']})"
+        rss = s["peak_rss_delta_bytes"] / mb if s["peak_rss_delta_bytes"] is not None else None
+        print(f"  {name:<40} {s['wall_s']:>8.3f} {_fmt(prev.get(s['stage']), 8, '.3f')} {s['cpu_s']:>8.3f} "
+              f"{_fmt(s['rows_in'], 9, ',')} {_fmt(s['rows_out'], 9, ',')} {_fmt(s['rows_per_s'], 10, ',')} "
+              f"{_fmt(rss, 8, '.1f')}")
+    peak = f"{report['peak_rss_bytes'] / mb:.0f}MB" if report["peak_rss_bytes"] is not None else "n/a"
+    print(f"  Total: {report['wall_s']:.3f}s wall, {report['cpu_s']:.3f}s CPU, peak RSS {peak}")
+
+
+def finish(path: Path) -> Path:
+    """Print this run's stage table and write its JSON report to path."""
+    report = {
+        "step": _RUN["step"],
+        "started_at": _RUN["started_at"],
+        "argv": sys.argv[1:],
+        "wall_s": round(time.perf_counter() - _RUN["wall"], 4),
+        "cpu_s": round(cpu_seconds() - _RUN["cpu"], 4),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": summarize(collect()),
+    }
+    previous = json.loads(path.read_text()) if path.exists() else None
+    print_report(report, previous)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    print(f"  Report: {path}")
+    return path
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Mergeable quantile sketches shared by the steps.
+
+A sketch is a table of value counts per log-spaced bucket (DDSketch style):
+bucket k > 0 holds values in (GAMMA ** (k - 2), GAMMA ** (k - 1)], bucket -k
+the same values negated, and bucket 0 values in (-1, 1). Each bucket stands
+for one value (bucket_value) within ACCURACY of every value in it, and 0 for
+bucket 0.
+
+Sketches merge by adding counts per bucket, so sketches kept per partition
+(platform, breed, week, a day of new listings, ...) combine into any rollup
+without rescanning rows, and a merged sketch is exactly the sketch of all
+their rows.
+
+Accuracy: quantiles() returns the value of the bucket holding the row at
+rank floor(q * (n - 1)), the np.quantile "lower" method. Where that row's
+value x has |x| >= 1 the answer is within ACCURACY * |x| of it; values in
+(-1, 1) come back as 0. Pandas' default median/quantile interpolate between
+two neighbouring rows instead, so they can differ by more when those rows
+are far apart.
+
+Usage:
+    counts = build(df, ["platform"], df["price_num"])
+    counts = merge([counts, new_counts], ["platform"])
+    quantiles(counts, ["platform"], q=(0.25, 0.5, 0.75))
+"""
+
+import numpy as np
+import pandas as pd
+
+ACCURACY = 0.01
+GAMMA = (1 + ACCURACY) / (1 - ACCURACY)
+
+
+def bucket_of(values) -> np.ndarray:
+    """Sketch bucket of each value (float array; NaN where the value is missing)."""
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    magnitude = np.abs(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bucket = np.ceil(np.log(np.maximum(magnitude, 1)) / np.log(GAMMA)) + 1
+    return np.where(magnitude < 1, 0, np.sign(values) * bucket)
+
+
+def bucket_value(bucket) -> np.ndarray:
+    """The value each sketch bucket stands for."""
+    bucket = np.asarray(bucket, dtype=float)
+    value = 2 * GAMMA ** (np.abs(bucket) - 1) / (GAMMA + 1)
+    return np.where(bucket == 0, 0.0, np.sign(bucket) * value)
+
+
+def build(df: pd.DataFrame, by: list[str], values: pd.Series) -> pd.DataFrame:
+    """
+    Sketch of values (aligned with df) per by group.
+
+    Returns:
+        DataFrame: by columns + bucket + count, one row per non-empty bucket,
+        sorted; missing group values form their own groups
+    """
+    present = values.notna()
+    rows = df.loc[present, list(by)].assign(bucket=bucket_of(values[present]).astype(int))
+    counts = rows.groupby(list(by) + ["bucket"], observed=True, dropna=False, sort=True).size()
+    return counts.rename("count").reset_index()
+
+
+def merge(sketches: list[pd.DataFrame], by: list[str]) -> pd.DataFrame:
+    """Merge sketches (e.g. yesterday's and today's) into one per by group."""
+    rows = pd.concat(sketches, ignore_index=True)
+    counts = rows.groupby(list(by) + ["bucket"], observed=True, dropna=False, sort=True)["count"].sum()
+    return counts[counts > 0].reset_index()
+
+
+def quantile_name(quantile: float) -> str:
+    """Column name of a quantile: p05, p50, p100 for whole percents, else p99.9."""
+    percent = round(quantile * 100, 6)
+    if percent == int(percent):
+        return f"p{int(percent):02d}"
+    return f"p{percent:g}"
+
+
+def quantiles(sketch: pd.DataFrame, by: list[str], q=(0.5,)) -> pd.DataFrame:
+    """
+    Quantiles per by group (none: one row for everything) from a sketch.
+
+    Returns:
+        DataFrame: by columns + n (values sketched) + one column per q named
+        by quantile_name (p50 for q=0.5, p99.9 for 0.999), within ACCURACY
+        of the exact "lower" quantile
+    """
+    names = [quantile_name(quantile) for quantile in q]
+    if len(set(names)) < len(names):
+        raise ValueError(f"Quantiles {list(q)} give duplicate column names {names}")
+    by = list(by)
+    rows = sketch if by else sketch.assign(_all=0)
+    keys = by or ["_all"]
+    counts = rows.groupby(keys + ["bucket"], observed=True, dropna=False, sort=True)["count"].sum()
+    counts = counts[counts > 0].reset_index()
+    groups = counts.groupby(keys, observed=True, dropna=False, sort=True)["count"]
+    cumulative, total = groups.cumsum(), groups.transform("sum")
+
+    out = groups.sum().rename("n").reset_index()
+    for quantile, column in zip(q, names):
+        # First bucket whose cumulative count passes the target rank
+        hit = counts[cumulative > np.floor(quantile * (total - 1))]
+        first = hit.groupby(keys, observed=True, dropna=False, sort=True)["bucket"].first().rename(column)
+        out = out.merge(first.reset_index(), on=keys, how="left")
+        out[column] = bucket_value(out[column])
+    if not by:
+        # One row even when nothing was sketched
+        out = out.drop(columns="_all").reindex([0])
+        out["n"] = out["n"].fillna(0).astype(int)
+    return out
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Table storage shared by the pipeline steps.
+
+facts and derived are written as typed, columnar Parquet next to the CSV
+(e.g. output/views/derived.parquet beside derived.csv). Readers prefer the
+Parquet file and fall back to CSV, so downstream code keeps working with
+either. Parquet needs pyarrow; without it everything stays CSV. The schema
+field list and the file content hash live here too, so dag.py and
+dogmarket.data can use them without importing a pipeline step.
+
+Dtype plan (memory-optimized; see FACTS_CATEGORY_COLUMNS etc. below):
+- low-cardinality text (platform, breed, location, user_type, sex, yes/no
+  health flags, parse modes) -> category
+- other text -> Arrow-backed string (plain nullable string without pyarrow)
+- *_ts -> datetime64[ns, UTC]
+- small counts (*_available_num, age_days, ...) -> smallest nullable int
+  that fits (Int8/Int16/...), float64 if a value is not whole
+- price_num -> float64 (money stays exact); rating/response hours -> float32
+- availability flags -> nullable boolean
+
+The market cube (step 4) has its own plan (cube_dtypes): dimensions and
+sketch measure names -> category, week -> datetime64[ns, UTC], price
+sums/min/max -> float64, counts and sketch buckets -> Int32.
+"""
+
+from pathlib import Path
+import hashlib
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_PATH = Path(__file__).resolve().parents[1] / "schema" / "pets4homes_master_schema.csv"
+
+FORMATS = ["both", "parquet", "csv"]
+DEFAULT_FORMAT = "both"
+
+UTC_TS = "datetime64[ns, UTC]"
+TEXT = "string[pyarrow]" if importlib.util.find_spec("pyarrow") is not None else "string"
+
+FACTS_CATEGORY_COLUMNS = [
+    "platform", "breed", "location", "user_type", "sex", "color", "age",
+    "is_breeder", "license_auth", "license_status", "kc_license",
+    "microchipped", "vaccinated", "wormed", "flea_treated", "health_checked",
+    "vet_checked", "health_tested", "kc_registered",
+    "sire_health_tested", "dam_health_tested", "champion_bloodline", "pedigree",
+    "dna_tested", "home_reared", "family_reared",
+    "breeder_verified", "five_star_breeder", "assured_breeder", "licensed_breeder",
+    "delivery_available", "puppy_contract", "insurance_available",
+]
+DERIVED_CATEGORY_COLUMNS = ["ready_to_leave_parse_mode", "ready_to_leave_rule", "total_available_flag"]
+# Narrowest nullable int to try first; widened automatically if values don't fit
+DERIVED_INT_COLUMNS = {
+    "males_available_num": "Int8",
+    "females_available_num": "Int8",
+    "total_available_num": "Int8",
+    "age_days": "Int16",
+    "days_until_ready": "Int16",
+    "reviews_num": "Int32",
+    "views_count_num": "Int32",
+    "active_listings_num": "Int32",
+    "active_pets_num": "Int32",
+}
+DERIVED_FLOAT32_COLUMNS = ["rating_num", "response_hours_num"]
+DERIVED_BOOL_COLUMNS = ["is_ready_now", "is_waiting_list", "availability_known"]
+# Derived columns that depend on asof_ts directly, recomputed for every row on
+# every run (step 2 incremental builds, the SQLite export's change detection)
+ASOF_COLUMNS = ["asof_ts", "age_days", "days_until_ready", "is_ready_now", "is_waiting_list", "availability_known"]
+INT_LADDER = ["Int8", "Int16", "Int32", "Int64"]
+CUBE_CATEGORY_COLUMNS = ["platform", "breed", "region", "measure"]
+CUBE_FLOAT_COLUMNS = ["price_sum", "price_sumsq", "price_min", "price_max"]
+
+
+def load_schema() -> list[str]:
+    """Load schema field names from master schema CSV."""
+    df = pd.read_csv(SCHEMA_PATH)
+    fields = df['field_name'].str.strip().tolist()
+    return fields
+
+
+def file_sha256(path: Path) -> str:
+    """Content hash of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parquet_available() -> bool:
+    """True if pyarrow is installed (needed for Parquet read/write)."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_path(csv_path: Path) -> Path:
+    """Parquet sibling of a CSV output path."""
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def facts_dtypes(schema_fields: list[str]) -> dict:
+    """Dtype plan for facts: platform + schema fields (all text)."""
+    return {
+        col: "category" if col in FACTS_CATEGORY_COLUMNS else TEXT
+        for col in ["platform"] + schema_fields
+    }
+
+
+def derived_dtypes(columns, facts_columns=()) -> dict:
+    """
+    Dtype plan for derived, by column name.
+
+    facts_columns are planned as facts text, so a schema field such as
+    license_num is not mistaken for a parsed *_num column.
+    """
+    plan = {}
+    for col in columns:
+        if col in facts_columns:
+            plan[col] = "category" if col in FACTS_CATEGORY_COLUMNS else TEXT
+        elif col.endswith("_ts"):
+            plan[col] = UTC_TS
+        elif col in DERIVED_INT_COLUMNS:
+            plan[col] = DERIVED_INT_COLUMNS[col]
+        elif col in DERIVED_FLOAT32_COLUMNS:
+            plan[col] = "float32"
+        elif col.endswith("_num"):
+            plan[col] = "float64"
+        elif col in DERIVED_BOOL_COLUMNS:
+            plan[col] = "boolean"
+        elif col in FACTS_CATEGORY_COLUMNS or col in DERIVED_CATEGORY_COLUMNS:
+            plan[col] = "category"
+        else:
+            plan[col] = TEXT
+    return plan
+
+
+def cube_dtypes(columns) -> dict:
+    """
+    Dtype plan for the market cube tables (pipeline_04): dimensions and
+    sketch measure names -> category, week -> UTC timestamp, price
+    sums/extremes -> float64, counts and sketch buckets -> Int32.
+    """
+    plan = {}
+    for col in columns:
+        if col == "week":
+            plan[col] = UTC_TS
+        elif col in CUBE_FLOAT_COLUMNS:
+            plan[col] = "float64"
+        elif col in CUBE_CATEGORY_COLUMNS:
+            plan[col] = "category"
+        else:
+            plan[col] = "Int32"
+    return plan
+
+
+def _fit_int(num: pd.Series, dtype: str) -> pd.Series:
+    """Cast to dtype, or the next wider nullable int (float64 if not whole)."""
+    valid = num.dropna()
+    if not (valid == valid.round()).all():
+        return num.astype("float64")
+    for candidate in INT_LADDER[INT_LADDER.index(dtype):]:
+        info = np.iinfo(candidate.lower())
+        if valid.empty or (valid.min() >= info.min and valid.max() <= info.max):
+            return num.astype(candidate)
+    return num.astype("float64")
+
+
+def apply_dtypes(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Return a copy of df with each planned column coerced to its dtype."""
+    out = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = dtypes.get(col)
+        if dtype == UTC_TS:
+            # ISO8601: text read back from CSV mixes whole and fractional seconds
+            series = pd.to_datetime(series, errors="coerce", utc=True, format="ISO8601").astype(UTC_TS)
+        elif dtype in INT_LADDER:
+            series = _fit_int(pd.to_numeric(series, errors="coerce"), dtype)
+        elif dtype in ("float64", "float32"):
+            series = pd.to_numeric(series, errors="coerce").astype(dtype)
+        elif dtype == "boolean" and series.dtype == object:
+            # Flags read back from CSV as text
+            series = series.map({"True": True, "False": False, True: True, False: False}).astype("boolean")
+        elif dtype == "category":
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(TEXT).astype("category")
+        elif dtype is not None:
+            series = series.astype(dtype)
+        out[col] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column deep memory (bytes) of two versions of the same table."""
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+        "bytes_before": before.memory_usage(index=False, deep=True),
+        "bytes_after": after.memory_usage(index=False, deep=True),
+    })
+    report["ratio"] = (report["bytes_before"] / report["bytes_after"].clip(lower=1)).round(1)
+    return report.sort_values("bytes_before", ascending=False)
+
+
+def print_memory_report(before: pd.DataFrame, after: pd.DataFrame, top: int = 20):
+    """Print the largest columns and the table total from memory_report."""
+    report = memory_report(before, after)
+    print(f"\n=== Memory by column (top {top}, before -> after dtype plan) ===")
+    shown = report.head(top).copy()
+    shown["bytes_before"] = (shown["bytes_before"] / 1024).round(1)
+    shown["bytes_after"] = (shown["bytes_after"] / 1024).round(1)
+    print(shown.rename(columns={"bytes_before": "kb_before", "bytes_after": "kb_after"}).to_string())
+    total_before = report["bytes_before"].sum()
+    total_after = report["bytes_after"].sum()
+    print(f"Total: {total_before / 1024 ** 2:.2f} MB -> {total_after / 1024 ** 2:.2f} MB "
+          f"({total_before / max(total_after, 1):.1f}x smaller)")
+
+
+def resolve_format(fmt: str) -> str:
+    """Downgrade to CSV (with a warning) when Parquet was asked for but pyarrow is missing."""
+    if fmt != "csv" and not parquet_available():
+        print("  WARNING: pyarrow not installed - writing CSV only")
+        return "csv"
+    return fmt
+
+
+def remove_stale(csv_path: Path, fmt: str):
+    """Delete the format not written this run, so readers never see an old copy."""
+    if fmt == "csv":
+        parquet_path(csv_path).unlink(missing_ok=True)
+    elif fmt == "parquet":
+        Path(csv_path).unlink(missing_ok=True)
+
+
+def write_table(df: pd.DataFrame, csv_path: Path, fmt: str, dtypes: dict) -> list[Path]:
+    """
+    Write df as CSV and/or typed Parquet.
+
+    The CSV is written from df as-is (unchanged from earlier runs); the
+    Parquet copy is coerced to dtypes first.
+
+    Returns:
+        list[Path]: Files written
+    """
+    fmt = resolve_format(fmt)
+    written = []
+    if fmt in ("csv", "both"):
+        df.to_csv(csv_path, index=False)
+        written.append(Path(csv_path))
+    if fmt in ("parquet", "both"):
+        path = parquet_path(csv_path)
+        apply_dtypes(df, dtypes).to_parquet(path, index=False)
+        written.append(path)
+    remove_stale(csv_path, fmt)
+    return written
+
+
+def csv_to_parquet(csv_path: Path, dtypes: dict, chunksize: int = 100_000) -> Path:
+    """
+    Convert a pipeline CSV to typed Parquet one chunk (row group) at a time,
+    for outputs that were streamed to CSV.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = parquet_path(csv_path)
+    writer = None
+    schema = None
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=True, chunksize=chunksize):
+            table = pa.Table.from_pandas(apply_dtypes(chunk, dtypes), preserve_index=False)
+            if writer is None:
+                # Category index width depends on each chunk's cardinality; fix it
+                # so every row group shares one schema
+                schema = pa.schema(
+                    [
+                        field.with_type(pa.dictionary(pa.int32(), pa.string()))
+                        if pa.types.is_dictionary(field.type) else field
+                        for field in table.schema
+                    ],
+                    metadata=table.schema.metadata,
+                )
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table.cast(schema))
+        if writer is None:
+            empty = pd.read_csv(csv_path, dtype=str, nrows=0)
+            apply_dtypes(empty, dtypes).to_parquet(path, index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def read_parquet(path: Path, columns: list[str] | None = None, filters=None) -> pd.DataFrame:
+    """
+    Read Parquet keeping text Arrow-backed (pd.read_parquet would box it into
+    Python str). filters are pyarrow row filters, e.g. [("platform", "in", [...])].
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_text = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas(types_mapper=arrow_text.get)
+
+
+def as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    df as a read_csv(dtype=str) frame would look: object strings, NaN for
+    missing. Frames already in that form are returned unchanged.
+    """
+    if (df.dtypes == object).all():
+        return df
+    return df.astype(object).where(df.notna(), np.nan)
+
+
+def table_header(csv_path: Path) -> list[str]:
+    """Column names of the table read_table would read (Parquet schema or CSV header)."""
+    path = parquet_path(csv_path)
+    if path.exists() and parquet_available():
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def read_table(csv_path: Path, columns: list[str] | None = None, **csv_kwargs) -> pd.DataFrame:
+    """
+    Read a pipeline table, preferring its Parquet copy.
+
+    csv_kwargs are passed to pd.read_csv on the CSV fallback. If they ask
+    for dtype=str, Parquet data is returned the same way (object strings,
+    NaN for missing) so callers see an identical frame from either source.
+    """
+    path = parquet_path(csv_path)
+    if path.exists() and parquet_available():
+        df = read_parquet(path, columns)
+        if csv_kwargs.get("dtype") is str:
+            df = as_text(df)
+        return df
+    return pd.read_csv(csv_path, usecols=columns, **csv_kwargs)
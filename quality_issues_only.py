@@ -1,7 +1,9 @@
 import pandas as pd
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived, load_facts
+
+facts = load_facts(columns=['platform', 'url', 'price', 'location', 'seller_name', 'published_at', 'total_available'])
+derived = load_derived(columns=['platform', 'breed', 'price_num', 'age_days', 'total_available_num'])
 
 print("DATA QUALITY ANALYSIS - ACTIONABLE ISSUES ONLY\n")
 print("=" * 80)
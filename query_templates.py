@@ -8,9 +8,14 @@ Copy and modify these as starting points for your analysis
 import pandas as pd
 import numpy as np
 
+from dogmarket.data import load_derived, load_facts
+
 # Load data
-df = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+df = load_facts(columns=['seller_name', 'location'])
+derived = load_derived(columns=[
+    'url', 'platform', 'breed', 'location', 'price_num', 'age_days', 'published_at_ts',
+    'microchipped', 'vaccinated', 'health_checked', 'ready_to_leave_parse_mode',
+])
 
 print("=" * 80)
 print("COMMON QUERY TEMPLATES")
@@ -21,7 +26,7 @@ print("=" * 80)
 # ============================================================================
 print("\n1. TOP BREEDS AND PRICING\n")
 
-breed_stats = derived.groupby('breed').agg({
+breed_stats = derived.groupby('breed', observed=True).agg({
     'price_num': ['count', 'mean', 'median', 'std'],
     'url': 'count'
 }).round(2)
@@ -32,7 +37,7 @@ breed_stats = breed_stats[breed_stats['listings'] > 10].sort_values('listings',
 print(breed_stats.head(10))
 print("\nCode:")
 print("""
-breed_stats = derived.groupby('breed').agg({
+breed_stats = derived.groupby('breed', observed=True).agg({
     'price_num': ['count', 'mean', 'median'],
 }).round(2)
 breed_stats = breed_stats[breed_stats['price_num']['count'] > 10]
@@ -45,7 +50,7 @@ breed_stats.sort_values(('price_num', 'mean'), ascending=False).head(10)
 print("\n" + "=" * 80)
 print("\n2. PLATFORM PRICE COMPARISON\n")
 
-platform_price = derived.groupby('platform').agg({
+platform_price = derived.groupby('platform', observed=True).agg({
     'price_num': ['count', 'mean', 'median'],
 }).round(0)
 
@@ -55,7 +60,7 @@ platform_price = platform_price.sort_values('listings', ascending=False)
 print(platform_price)
 print("\nCode:")
 print("""
-platform_price = derived.groupby('platform').agg({
+platform_price = derived.groupby('platform', observed=True).agg({
     'price_num': ['count', 'mean', 'median']
 }).round(0)
 """)
@@ -66,7 +71,7 @@ platform_price = derived.groupby('platform').agg({
 print("\n" + "=" * 80)
 print("\n3. PRICE BY LOCATION (TOP 10)\n")
 
-location_price = derived.groupby('location').agg({
+location_price = derived.groupby('location', observed=True).agg({
     'price_num': ['count', 'mean', 'median'],
 }).round(0)
 
@@ -76,7 +81,7 @@ location_price = location_price[location_price['listings'] > 5].sort_values('lis
 print(location_price.head(10))
 print("\nCode:")
 print("""
-location_price = derived.groupby('location').agg({
+location_price = derived.groupby('location', observed=True).agg({
     'price_num': ['count', 'mean', 'median']
 }).round(0)
 location_price = location_price[location_price['listings'] > 5]
@@ -88,7 +93,7 @@ location_price = location_price[location_price['listings'] > 5]
 print("\n" + "=" * 80)
 print("\n4. HEALTH DATA BY PLATFORM\n")
 
-health_coverage = derived.groupby('platform').agg({
+health_coverage = derived.groupby('platform', observed=True).agg({
     'microchipped': lambda x: (x.notna().sum() / len(x) * 100).round(1),
     'vaccinated': lambda x: (x.notna().sum() / len(x) * 100).round(1),
     'health_checked': lambda x: (x.notna().sum() / len(x) * 100).round(1),
@@ -99,7 +104,7 @@ health_coverage.columns = ['% Microchipped', '% Vaccinated', '% Health Checked']
 print(health_coverage.sort_values('% Microchipped', ascending=False))
 print("\nCode:")
 print("""
-health_coverage = derived.groupby('platform').agg({
+health_coverage = derived.groupby('platform', observed=True).agg({
     'microchipped': lambda x: (x.notna().sum() / len(x) * 100).round(1),
     'vaccinated': lambda x: (x.notna().sum() / len(x) * 100).round(1),
 })
@@ -111,15 +116,15 @@ health_coverage = derived.groupby('platform').agg({
 print("\n" + "=" * 80)
 print("\n5. AVAILABILITY BY PLATFORM\n")
 
-avail = df.groupby('platform').agg({
-    'ready_to_leave_parse_mode': 'value_counts'
-})
+avail_modes = derived.groupby('platform', observed=True)['ready_to_leave_parse_mode'].value_counts()
 
 print("Ready-to-leave parse modes:")
 print(derived['ready_to_leave_parse_mode'].value_counts())
+print("\nBy platform:")
+print(avail_modes.unstack(fill_value=0))
 print("\nCode:")
 print("""
-avail_modes = derived.groupby('platform')['ready_to_leave_parse_mode'].value_counts()
+avail_modes = derived.groupby('platform', observed=True)['ready_to_leave_parse_mode'].value_counts()
 avail_modes.unstack(fill_value=0)
 """)
 
@@ -173,11 +178,11 @@ print("\n" + "=" * 80)
 print("\n8. DOES MICROCHIPPING CORRELATE WITH PRICE?\n")
 
 # Health status vs price
-microchip_price = derived[derived['microchipped'].notna()].groupby('microchipped')['price_num'].agg(['count', 'mean', 'median'])
+microchip_price = derived[derived['microchipped'].notna()].groupby('microchipped', observed=True)['price_num'].agg(['count', 'mean', 'median'])
 print(microchip_price.round(0))
 print("\nCode:")
 print("""
-microchip_price = derived[derived['microchipped'].notna()].groupby('microchipped')['price_num'].agg(['count', 'mean'])
+microchip_price = derived[derived['microchipped'].notna()].groupby('microchipped', observed=True)['price_num'].agg(['count', 'mean'])
 microchip_price.round(0)
 """)
 
@@ -12,12 +12,14 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).resolve().parent
+
 def run_command(cmd, desc):
     """Run a command and report status"""
     print(f"\n{'='*60}")
     print(f"  {desc}")
     print(f"{'='*60}")
-    result = subprocess.run(cmd, shell=True, cwd='/Users/kimfaura/Desktop/Dog_Market_Clean')
+    result = subprocess.run(cmd, shell=True, cwd=REPO_ROOT)
     if result.returncode != 0:
         print(f"❌ FAILED: {desc}")
         sys.exit(1)
@@ -30,7 +32,7 @@ if __name__ == '__main__':
     git_status = subprocess.run(
         "git status --porcelain",
         shell=True,
-        cwd='/Users/kimfaura/Desktop/Dog_Market_Clean',
+        cwd=REPO_ROOT,
         capture_output=True,
         text=True,
     )
@@ -42,8 +44,8 @@ if __name__ == '__main__':
         sys.exit(1)
     
     # Always snapshot the current slide before regenerating
-    slide_path = Path('/Users/kimfaura/Desktop/Dog_Market_Clean/uk_dog_market_slide.html')
-    backup_dir = Path('/Users/kimfaura/Desktop/Dog_Market_Clean/.backups')
+    slide_path = REPO_ROOT / 'uk_dog_market_slide.html'
+    backup_dir = REPO_ROOT / '.backups'
     backup_dir.mkdir(exist_ok=True)
     if slide_path.exists():
         ts = datetime.now().strftime('%Y%m%d-%H%M%S')
@@ -1,6 +1,8 @@
 import pandas as pd
 
-df = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived
+
+df = load_derived(columns=['platform', 'breed', 'location', 'price_num', 'title', 'total_available_num'])
 df_unique = df.drop_duplicates(subset=['breed', 'location', 'price_num'], keep='first')
 
 print("PUPPY COUNT - REVISED:\n")
@@ -6,8 +6,10 @@ Quick sanity checks before analysis - verify data makes intuitive sense
 import pandas as pd
 import numpy as np
 
-facts = pd.read_csv('output/facts/facts.csv', low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived, load_facts
+
+facts = load_facts(columns=['platform', 'breed', 'location', 'microchipped', 'vaccinated', 'health_checked'])
+derived = load_derived(columns=['price_num', 'age_days'])
 
 print("PRE-ANALYSIS SANITY CHECKS\n")
 print("=" * 80)
@@ -1,7 +1,6 @@
-import pandas as pd
+from dogmarket.data import load_facts
 
-facts = pd.read_csv('output/facts/facts.csv', dtype={'seller_name': 'str'}, low_memory=False)
-derived = pd.read_csv('output/views/derived.csv', dtype={'seller_name': 'str'}, low_memory=False)
+facts = load_facts(columns=['platform', 'breed', 'seller_name'])
 
 top_sellers = facts['seller_name'].value_counts().head(15)
 
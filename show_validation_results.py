@@ -1,6 +1,9 @@
 import pandas as pd
 
-df = pd.read_csv('output/views/derived.csv', low_memory=False)
+from dogmarket.data import load_derived
+
+df = load_derived(columns=['platform', 'breed', 'location', 'price_num', 'title',
+                           'total_available_num', 'males_available_num', 'females_available_num', 'total_available_flag'])
 
 print("="*80)
 print("VALIDATION RESULTS: Suspicious Puppy Counts Flagged & Corrected")